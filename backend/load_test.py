@@ -6,15 +6,26 @@ import asyncio
 import websockets
 import orjson
 import time
-import random
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
 import psutil
-import threading
 import statistics
-import requests
+import httpx
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import Deque, List, Dict, Any, Tuple
+from collections import deque
+import numpy as np
+
+COMMAND_POOL_SIZE = 8192  # Power of two so pool indices wrap with a mask
+COMMAND_POOL_MASK = COMMAND_POOL_SIZE - 1
+_now = time.perf_counter  # Monotonic clock for latency and duration measurements
+RESPONSE_TIMEOUT = 1.0  # Seconds before an unanswered batch counts as failed
+BATCH_PREFIX = b'{"type":"cmd_batch","cmds":['
+BATCH_SUFFIX = b']}'
+
+TILE_TYPES = ("city", "field", "monastery", "barracks")
+UNIT_TYPES = ("infantry", "archer", "knight", "siege")
+WORKER_TYPES = ("magistrate", "farmer", "monk", "scout")
 
 @dataclass
 class PerformanceMetrics:
@@ -49,20 +60,42 @@ class LoadTester:
         self.running = False
         self.process = psutil.Process()
         
-    def monitor_system_resources(self):
-        """Monitor system resources during the test."""
+        # One shared pool of serialized commands, reused by every player session
+        self.payloads: List[bytes] = [orjson.dumps(command) for command in self.generate_random_commands()]
+        
+    async def _monitor(self, interval: float = 0.5):
+        """Monitor system resources during the test without leaving the event loop."""
         while self.running:
             try:
-                cpu_percent = self.process.cpu_percent()
-                memory_info = self.process.memory_info()
-                memory_mb = memory_info.rss / 1024 / 1024
+                # interval=None is non-blocking: it reports usage since the previous call
+                cpu_percent = self.process.cpu_percent(interval=None)
+                memory_mb = self.process.memory_info().rss / 1024 / 1024
                 
                 self.metrics.cpu_usage.append(cpu_percent)
                 self.metrics.memory_usage.append(memory_mb)
-                
-                time.sleep(0.1)  # Check every 100ms
             except Exception as e:
                 self.metrics.errors.append(f"Resource monitoring error: {e}")
+            
+            await asyncio.sleep(interval)
+    
+    async def _reader(self, websocket, pending: Deque[Tuple[float, int]]):
+        """Read server messages and match each one to the oldest outstanding batch."""
+        metrics = self.metrics
+        try:
+            async for _ in websocket:
+                if not pending:
+                    continue
+                
+                sent_at, count = pending.popleft()
+                response_time = _now() - sent_at
+                if response_time > RESPONSE_TIMEOUT:
+                    metrics.response_times.append(RESPONSE_TIMEOUT)
+                    metrics.failed_commands += count
+                else:
+                    metrics.response_times.append(response_time / count)
+                    metrics.successful_commands += count
+        except websockets.ConnectionClosed:
+            pass
     
     async def create_player_connection(self, player_id: str, room_id: str):
         """Create a WebSocket connection for a player."""
@@ -74,103 +107,90 @@ class LoadTester:
             self.metrics.errors.append(f"Connection error for {player_id}: {e}")
             return None
     
-    def generate_random_commands(self, player_id: str, num_commands: int = 50):
-        """Generate random game commands for testing."""
-        commands = []
+    def generate_random_commands(self, num_commands: int = COMMAND_POOL_SIZE) -> List[Dict[str, Any]]:
+        """Generate random game commands for testing, drawing all random values in bulk."""
+        rng = np.random.default_rng()
+        command_types = rng.integers(0, 4, size=num_commands).tolist()
+        xs = rng.integers(15, 26, size=num_commands).tolist()
+        ys = rng.integers(15, 26, size=num_commands).tolist()
+        choices = rng.integers(0, 4, size=num_commands).tolist()
+        unit_numbers = rng.integers(1, 101, size=num_commands).tolist()
         
-        for i in range(num_commands):
-            command_type = random.choice(["placeTile", "moveUnit", "trainUnit", "placeWorker"])
-            
-            if command_type == "placeTile":
-                command = {
-                    "type": "cmd",
-                    "payload": {
-                        "action": "placeTile",
-                        "data": {
-                            "x": random.randint(15, 25),
-                            "y": random.randint(15, 25),
-                            "tile_type": random.choice(["city", "field", "monastery", "barracks"])
-                        }
-                    }
-                }
-            elif command_type == "moveUnit":
-                command = {
-                    "type": "cmd",
-                    "payload": {
-                        "action": "moveUnit",
-                        "data": {
-                            "unit_id": f"unit_{random.randint(1, 100)}",
-                            "target_x": random.randint(15, 25),
-                            "target_y": random.randint(15, 25)
-                        }
-                    }
-                }
-            elif command_type == "trainUnit":
-                command = {
-                    "type": "cmd",
-                    "payload": {
-                        "action": "trainUnit",
-                        "data": {
-                            "unit_type": random.choice(["infantry", "archer", "knight", "siege"]),
-                            "tile_id": f"{random.randint(15, 25)},{random.randint(15, 25)}"
-                        }
-                    }
-                }
+        commands = []
+        for command_type, x, y, choice, unit_number in zip(command_types, xs, ys, choices, unit_numbers):
+            if command_type == 0:  # placeTile
+                action = "placeTile"
+                data = {"x": x, "y": y, "tile_type": TILE_TYPES[choice]}
+            elif command_type == 1:  # moveUnit
+                action = "moveUnit"
+                data = {"unit_id": f"unit_{unit_number}", "target_x": x, "target_y": y}
+            elif command_type == 2:  # trainUnit
+                action = "trainUnit"
+                data = {"unit_type": UNIT_TYPES[choice], "tile_id": f"{x},{y}"}
             else:  # placeWorker
-                command = {
-                    "type": "cmd",
-                    "payload": {
-                        "action": "placeWorker",
-                        "data": {
-                            "worker_type": random.choice(["magistrate", "farmer", "monk", "scout"]),
-                            "tile_id": f"{random.randint(15, 25)},{random.randint(15, 25)}"
-                        }
-                    }
-                }
+                action = "placeWorker"
+                data = {"worker_type": WORKER_TYPES[choice], "tile_id": f"{x},{y}"}
             
-            commands.append(command)
+            commands.append({"type": "cmd", "payload": {"action": action, "data": data}})
         
         return commands
     
-    async def run_player_session(self, player_id: str, room_id: str, commands_per_second: int, duration: int):
-        """Run a player session with specified command rate."""
+    async def run_player_session(self, player_id: str, room_id: str, commands_per_second: int, duration: int,
+                                 batch_size: int = 5, player_offset: int = 0):
+        """Run a player session with specified command rate, sending commands in batches."""
         websocket = await self.create_player_connection(player_id, room_id)
         if not websocket:
             return
         
-        commands = self.generate_random_commands(player_id, commands_per_second * duration)
+        total_commands = commands_per_second * duration
         command_interval = 1.0 / commands_per_second
+        payloads = self.payloads
+        
+        # Batches awaiting a server response, oldest first, matched by the reader task
+        pending: Deque[Tuple[float, int]] = deque()
+        reader = asyncio.create_task(self._reader(websocket, pending))
         
         try:
-            for i, command in enumerate(commands):
+            for start in range(0, total_commands, batch_size):
                 if not self.running:
                     break
                 
-                start_time = time.time()
-                
-                # Send command
-                await websocket.send(orjson.dumps(command).decode())
-                self.metrics.total_messages += 1
+                # Splice pre-encoded commands from the shared pool into one cmd_batch frame
+                count = min(batch_size, total_commands - start)
+                first = player_offset + start
+                frame = b"".join((
+                    BATCH_PREFIX,
+                    b",".join([payloads[(first + j) & COMMAND_POOL_MASK] for j in range(count)]),
+                    BATCH_SUFFIX,
+                ))
                 
-                # Wait for response (optional)
-                try:
-                    response = await asyncio.wait_for(websocket.recv(), timeout=1.0)
-                    response_time = time.time() - start_time
-                    self.metrics.response_times.append(response_time)
-                    self.metrics.successful_commands += 1
-                except asyncio.TimeoutError:
-                    self.metrics.response_times.append(1.0)
-                    self.metrics.failed_commands += 1
-                except Exception as e:
-                    self.metrics.errors.append(f"Command error for {player_id}: {e}")
-                    self.metrics.failed_commands += 1
+                # Send batch without waiting for its response
+                pending.append((_now(), count))
+                await websocket.send(frame)
+                self.metrics.total_messages += count
                 
                 # Control command rate
-                await asyncio.sleep(command_interval)
+                await asyncio.sleep(command_interval * count)
+            
+            # Give in-flight batches a last chance to be answered
+            deadline = _now() + RESPONSE_TIMEOUT
+            while pending and not reader.done() and _now() < deadline:
+                await asyncio.sleep(0.05)
                 
         except Exception as e:
             self.metrics.errors.append(f"Session error for {player_id}: {e}")
         finally:
+            reader.cancel()
+            try:
+                await reader
+            except asyncio.CancelledError:
+                pass
+            
+            # Anything still unanswered timed out
+            for _, count in pending:
+                self.metrics.response_times.append(RESPONSE_TIMEOUT)
+                self.metrics.failed_commands += count
+            
             await websocket.close()
     
     async def run_load_test(self, num_players: int = 4, commands_per_second: int = 50, duration: int = 60):
@@ -180,7 +200,8 @@ class LoadTester:
         
         # Create room for testing
         try:
-            response = requests.post(f"{self.base_url}/match", json={"player_id": "load_test_player"})
+            async with httpx.AsyncClient(base_url=self.base_url) as client:
+                response = await client.post("/match", json={"player_id": "load_test_player"})
             if response.status_code != 200:
                 print(f"Failed to create room: {response.status_code}")
                 return
@@ -190,32 +211,37 @@ class LoadTester:
             print(f"Failed to create room: {e}")
             return
         
-        # Start monitoring
+        # Start monitoring; the first cpu_percent() call only primes psutil's baseline
+        self.process.cpu_percent(interval=None)
         self.running = True
-        self.metrics.start_time = time.time()
+        self.metrics.start_time = _now()
         
-        monitor_thread = threading.Thread(target=self.monitor_system_resources)
-        monitor_thread.daemon = True
-        monitor_thread.start()
+        monitor_task = asyncio.create_task(self._monitor())
         
-        # Create player sessions
-        tasks = []
-        for i in range(num_players):
-            player_id = f"load_test_player_{i}"
-            task = asyncio.create_task(
-                self.run_player_session(player_id, room_id, commands_per_second, duration)
-            )
-            tasks.append(task)
-        
-        # Wait for all sessions to complete
-        await asyncio.gather(*tasks)
-        
-        # Stop monitoring
-        self.running = False
-        self.metrics.end_time = time.time()
-        
-        # Wait a bit for monitoring to finish
-        await asyncio.sleep(1)
+        try:
+            # Create player sessions
+            tasks = []
+            for i in range(num_players):
+                player_id = f"load_test_player_{i}"
+                task = asyncio.create_task(
+                    self.run_player_session(
+                        player_id, room_id, commands_per_second, duration,
+                        player_offset=i * (COMMAND_POOL_SIZE // num_players)
+                    )
+                )
+                tasks.append(task)
+            
+            # Wait for all sessions to complete
+            await asyncio.gather(*tasks)
+        finally:
+            # Stop monitoring
+            self.running = False
+            self.metrics.end_time = _now()
+            monitor_task.cancel()
+            try:
+                await monitor_task
+            except asyncio.CancelledError:
+                pass
         
         self.print_results()
     
@@ -281,4 +307,10 @@ async def main():
     )
 
 if __name__ == "__main__":
+    try:
+        import uvloop  # Installed with uvicorn[standard] on Linux/macOS
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    
     asyncio.run(main()) 
\ No newline at end of file
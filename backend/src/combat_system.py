@@ -2,14 +2,53 @@
 Combat system with spatial hashing for Carcassonne: War of Ages.
 """
 
-from typing import Dict, List, Set, Tuple, Optional
+from typing import Deque, Dict, List, Set, Tuple, Optional
+from collections import deque
 from dataclasses import dataclass, field
-from src.models.unit import Unit, UnitStatus, Position
+from itertools import chain
+from src.models.unit import Unit, UnitType, UnitStatus, Position, UNIT_STATS
+from src.models.tile import TileType
+import numpy as np
 import time
-import math
 
+# Most recent combat events kept for statistics
+COMBAT_EVENT_HISTORY = 256
 
-@dataclass
+# Ticks between sweeps of attack cooldowns belonging to removed units
+COOLDOWN_SWEEP_INTERVAL = 100
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; the NumPy fallback below is used instead
+    njit = None
+
+
+def _first_enemy_in_range_numpy(rows: np.ndarray, start: int, xs: np.ndarray, ys: np.ndarray,
+                                owners: np.ndarray, x: int, y: int, radius: int, owner: int) -> int:
+    """Return the index into rows of the first enemy within radius at or after start, or -1."""
+    rows = rows[start:]
+    hits = np.flatnonzero(
+        (owners[rows] != owner) & ((np.abs(xs[rows] - x) + np.abs(ys[rows] - y)) <= radius)
+    )
+    return start + int(hits[0]) if len(hits) else -1
+
+
+def _first_enemy_in_range_loop(rows, start, xs, ys, owners, x, y, radius, owner):
+    """Scalar version of _first_enemy_in_range_numpy, compiled with Numba when available."""
+    for i in range(start, len(rows)):
+        row = rows[i]
+        if owners[row] != owner and abs(xs[row] - x) + abs(ys[row] - y) <= radius:
+            return i
+    return -1
+
+
+if njit is not None:
+    first_enemy_in_range = njit(cache=True, nogil=True)(_first_enemy_in_range_loop)
+else:
+    first_enemy_in_range = _first_enemy_in_range_numpy
+
+
+@dataclass(slots=True)
 class CombatEvent:
     """Event representing a combat action."""
     type: str  # "attack", "death", "damage", "raid"
@@ -23,74 +62,274 @@ class CombatEvent:
 
 
 class SpatialHash:
-    """Spatial hash for efficient unit lookups by position."""
+    """Spatial hash for efficient unit lookups by position.
+
+    Unit coordinates and owners are stored as parallel NumPy arrays (one row
+    per unit) so radius queries run as a single vectorized distance check
+    over the candidate rows instead of a Python loop per unit.
+    """
     
-    def __init__(self, cell_size: int = 4):
+    def __init__(self, cell_size: int = 4, capacity: int = 1024):
         self.cell_size = cell_size
-        self.grid: Dict[Tuple[int, int], Set[str]] = {}
+        self.grid: Dict[int, List[int]] = {}  # packed cell key -> row indices
+        self.cell_owner_counts: Dict[int, Dict[int, int]] = {}  # packed cell key -> owner -> unit count
         self.unit_positions: Dict[str, Position] = {}
+        
+        # Structure-of-arrays storage, indexed by row
+        self.xs = np.empty(capacity, np.int32)
+        self.ys = np.empty(capacity, np.int32)
+        self.owners = np.full(capacity, -1, np.int32)
+        self.cells = np.empty(capacity, np.int64)  # packed cell key of each row
+        self._slot = np.empty(capacity, np.int32)  # index of each row within its bucket
+        self.ids: List[Optional[str]] = [None] * capacity
+        self._row: Dict[str, int] = {}  # unit_id -> row index
+        self._free: List[int] = []
+        self._n = 0
+        
+        # radius -> neighbor cell offsets, primed with every unit range
+        self._offset_cache: Dict[int, Tuple[Tuple[int, int], ...]] = {}
+        for stats in UNIT_STATS.values():
+            self._get_cell_offsets(stats["range"])
+    
+    def _get_cell_offsets(self, radius: int) -> Tuple[Tuple[int, int], ...]:
+        """Get the (dx, dy) cell offsets that may hold units within a Manhattan radius.
+        
+        A point in cell 0 is at least (|d| - 1) * cell_size + 1 tiles away from
+        any point in cell d along each axis, so corner cells that cannot reach
+        the radius are dropped from the scan.
+        """
+        offsets = self._offset_cache.get(radius)
+        if offsets is None:
+            cell_size = self.cell_size
+            cell_radius = -(-radius // cell_size)
+            
+            def min_gap(d: int) -> int:
+                return (abs(d) - 1) * cell_size + 1 if d else 0
+            
+            offsets = self._offset_cache[radius] = tuple(
+                (dx, dy)
+                for dx in range(-cell_radius, cell_radius + 1)
+                for dy in range(-cell_radius, cell_radius + 1)
+                if min_gap(dx) + min_gap(dy) <= radius
+            )
+        return offsets
+    
+    @staticmethod
+    def _pack_cell(cell_x: int, cell_y: int) -> int:
+        """Pack a cell coordinate pair into a single integer key."""
+        return (cell_x << 32) | (cell_y & 0xFFFFFFFF)
     
-    def _get_cell_key(self, position: Position) -> Tuple[int, int]:
+    def _get_cell_key(self, position: Position) -> int:
         """Get cell key for a position."""
-        return (position.x // self.cell_size, position.y // self.cell_size)
+        return self._pack_cell(position.x // self.cell_size, position.y // self.cell_size)
+    
+    def _grow(self) -> None:
+        """Double the capacity of the row arrays."""
+        capacity = len(self.xs) * 2
+        self.xs = np.resize(self.xs, capacity)
+        self.ys = np.resize(self.ys, capacity)
+        self.owners = np.resize(self.owners, capacity)
+        self.cells = np.resize(self.cells, capacity)
+        self._slot = np.resize(self._slot, capacity)
+        self.ids.extend([None] * (capacity - len(self.ids)))
+    
+    def _bucket_add(self, row: int, cell_key: int) -> None:
+        """Append a row to the bucket for cell_key."""
+        bucket = self.grid.get(cell_key)
+        if bucket is None:
+            bucket = self.grid[cell_key] = []
+        
+        self.cells[row] = cell_key
+        self._slot[row] = len(bucket)
+        bucket.append(row)
+        
+        counts = self.cell_owner_counts.setdefault(cell_key, {})
+        owner = int(self.owners[row])
+        counts[owner] = counts.get(owner, 0) + 1
+    
+    def _bucket_remove(self, row: int) -> None:
+        """Swap-remove a row from its bucket in O(1)."""
+        cell_key = int(self.cells[row])
+        bucket = self.grid[cell_key]
+        last = bucket.pop()
+        
+        if last != row:
+            slot = self._slot[row]
+            bucket[slot] = last
+            self._slot[last] = slot
+        elif not bucket:
+            del self.grid[cell_key]
+        
+        counts = self.cell_owner_counts[cell_key]
+        owner = int(self.owners[row])
+        if counts[owner] > 1:
+            counts[owner] -= 1
+        else:
+            del counts[owner]
+            if not counts:
+                del self.cell_owner_counts[cell_key]
     
-    def add_unit(self, unit_id: str, position: Position) -> None:
+    def add_unit(self, unit_id: str, position: Position, owner: int = -1) -> None:
         """Add unit to spatial hash."""
-        cell_key = self._get_cell_key(position)
+        if unit_id in self._row:
+            self.remove_unit(unit_id)
+        
+        if self._free:
+            row = self._free.pop()
+        else:
+            row = self._n
+            self._n += 1
+            if row >= len(self.xs):
+                self._grow()
         
-        if cell_key not in self.grid:
-            self.grid[cell_key] = set()
+        self.xs[row] = position.x
+        self.ys[row] = position.y
+        self.owners[row] = owner
+        self.ids[row] = unit_id
+        self._row[unit_id] = row
         
-        self.grid[cell_key].add(unit_id)
+        self._bucket_add(row, self._get_cell_key(position))
         self.unit_positions[unit_id] = position
     
     def remove_unit(self, unit_id: str) -> None:
         """Remove unit from spatial hash."""
-        if unit_id not in self.unit_positions:
+        row = self._row.pop(unit_id, None)
+        if row is None:
             return
         
-        position = self.unit_positions[unit_id]
-        cell_key = self._get_cell_key(position)
-        
-        if cell_key in self.grid:
-            self.grid[cell_key].discard(unit_id)
-            if not self.grid[cell_key]:
-                del self.grid[cell_key]
-        
         del self.unit_positions[unit_id]
+        self._bucket_remove(row)
+        
+        self.ids[row] = None
+        self.owners[row] = -1
+        self._free.append(row)
     
     def update_unit_position(self, unit_id: str, new_position: Position) -> None:
         """Update unit position in spatial hash."""
-        if unit_id in self.unit_positions:
-            self.remove_unit(unit_id)
-        self.add_unit(unit_id, new_position)
+        row = self._row.get(unit_id)
+        if row is None:
+            self.add_unit(unit_id, new_position)
+            return
+        
+        self.xs[row] = new_position.x
+        self.ys[row] = new_position.y
+        self.unit_positions[unit_id] = new_position
+        
+        # Units usually stay inside their cell between ticks; no bucket work then
+        cell_key = self._get_cell_key(new_position)
+        if cell_key != self.cells[row]:
+            self._bucket_remove(row)
+            self._bucket_add(row, cell_key)
     
-    def get_units_in_radius(self, center: Position, radius: int) -> Set[str]:
-        """Get all unit IDs within radius of center position."""
-        units_in_range = set()
+    def _get_nearby_cells(self, center: Position, radius: int) -> List[int]:
+        """Get the packed keys of every cell that may hold units within radius of center."""
+        # Calculate cells to check
+        offsets = self._offset_cache.get(radius)
+        if offsets is None:
+            offsets = self._get_cell_offsets(radius)
+        center_x = center.x // self.cell_size
+        center_y = center.y // self.cell_size
+        pack = self._pack_cell
         
-        # Calculate cell range to check
-        cell_radius = math.ceil(radius / self.cell_size)
-        center_cell = self._get_cell_key(center)
+        return [pack(center_x + dx, center_y + dy) for dx, dy in offsets]
+    
+    def has_enemies_near(self, center: Position, radius: int, owner: int) -> bool:
+        """Check whether any cell around center holds a unit not owned by owner.
         
-        for dx in range(-cell_radius, cell_radius + 1):
-            for dy in range(-cell_radius, cell_radius + 1):
-                cell_key = (center_cell[0] + dx, center_cell[1] + dy)
-                
-                if cell_key in self.grid:
-                    for unit_id in self.grid[cell_key]:
-                        if unit_id in self.unit_positions:
-                            unit_pos = self.unit_positions[unit_id]
-                            distance = abs(unit_pos.x - center.x) + abs(unit_pos.y - center.y)
-                            if distance <= radius:
-                                units_in_range.add(unit_id)
+        This is a cheap cell-level pre-filter: a True result may still find no
+        enemy within the exact radius, but False guarantees there is none.
+        """
+        cell_owner_counts = self.cell_owner_counts
+        for cell_key in self._get_nearby_cells(center, radius):
+            counts = cell_owner_counts.get(cell_key)
+            if counts and (len(counts) > 1 or owner not in counts):
+                return True
+        return False
+    
+    def get_candidate_rows(self, center: Position, radius: int) -> np.ndarray:
+        """Get the row indices of all units in cells that may lie within radius of center."""
+        grid = self.grid
+        
+        buckets = []
+        for cell_key in self._get_nearby_cells(center, radius):
+            bucket = grid.get(cell_key)
+            if bucket:
+                buckets.append(bucket)
         
-        return units_in_range
+        if not buckets:
+            return np.empty(0, np.intp)
+        
+        return np.fromiter(chain.from_iterable(buckets), dtype=np.intp)
+    
+    def get_rows_in_radius(self, center: Position, radius: int) -> np.ndarray:
+        """Get the row indices of all units within radius of center position."""
+        idx = self.get_candidate_rows(center, radius)
+        mask = (np.abs(self.xs[idx] - center.x) + np.abs(self.ys[idx] - center.y)) <= radius
+        return idx[mask]
+    
+    def get_units_in_radius(self, center: Position, radius: int) -> Set[str]:
+        """Get all unit IDs within radius of center position."""
+        ids = self.ids
+        return {ids[row] for row in self.get_rows_in_radius(center, radius).tolist()}
     
     def clear(self) -> None:
         """Clear all units from spatial hash."""
         self.grid.clear()
+        self.cell_owner_counts.clear()
         self.unit_positions.clear()
+        self._row.clear()
+        self._free.clear()
+        self.ids[:self._n] = [None] * self._n
+        self.owners[:self._n] = -1
+        self._n = 0
+    
+    def rebuild(self, unit_ids: List[str], positions: List[Position], owners: List[int]) -> None:
+        """Replace the contents of the spatial hash with the given units in one bulk pass.
+        
+        Rows are bucketed by sorting their packed cell keys, so the grid is
+        built from runs of equal keys instead of one add_unit call per unit.
+        """
+        self.clear()
+        n = len(unit_ids)
+        if n == 0:
+            return
+        
+        while len(self.xs) < n:
+            self._grow()
+        
+        xs = self.xs[:n]
+        ys = self.ys[:n]
+        xs[:] = np.fromiter((position.x for position in positions), np.int32, n)
+        ys[:] = np.fromiter((position.y for position in positions), np.int32, n)
+        self.owners[:n] = owners
+        self.ids[:n] = unit_ids
+        self._row = dict(zip(unit_ids, range(n)))
+        self.unit_positions = dict(zip(unit_ids, positions))
+        self._n = n
+        
+        cell_xs = (xs // self.cell_size).astype(np.int64)
+        cell_ys = (ys // self.cell_size).astype(np.int64)
+        keys = (cell_xs << 32) | (cell_ys & 0xFFFFFFFF)
+        self.cells[:n] = keys
+        
+        # Sort rows by cell; a stable sort keeps insertion order within each bucket
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        bounds = np.concatenate(([0], np.flatnonzero(np.diff(sorted_keys)) + 1, [n]))
+        run_lengths = np.diff(bounds)
+        self._slot[order] = np.arange(n) - np.repeat(bounds[:-1], run_lengths)
+        
+        order_list = order.tolist()
+        bounds_list = bounds.tolist()
+        self.grid = {
+            key: order_list[start:end]
+            for key, start, end in zip(sorted_keys[bounds[:-1]].tolist(), bounds_list, bounds_list[1:])
+        }
+        
+        pairs, counts = np.unique(np.column_stack((keys, self.owners[:n])), axis=0, return_counts=True)
+        cell_owner_counts = self.cell_owner_counts
+        for (key, owner), count in zip(pairs.tolist(), counts.tolist()):
+            cell_owner_counts.setdefault(key, {})[owner] = count
 
 
 class CombatSystem:
@@ -100,7 +339,32 @@ class CombatSystem:
         self.spatial_hash = SpatialHash()
         self.unit_last_attack: Dict[str, float] = {}  # unit_id -> last attack timestamp
         self.attack_cooldown = 1.0  # 1 second between attacks
-        self.combat_events: List[CombatEvent] = []
+        self.combat_events: Deque[CombatEvent] = deque(maxlen=COMBAT_EVENT_HISTORY)
+        self._tick_count = 0
+        
+        # Events emitted by process_combat_tick are recycled from tick to tick
+        self._event_pool: List[CombatEvent] = []
+        self._event_count = 0
+    
+    def _emit_event(self, type: str, attacker_id: str, target_id: str, damage: int,
+                    timestamp: float, position: Position, target_died: bool) -> None:
+        """Record a combat event for this tick, reusing a pooled instance when possible."""
+        i = self._event_count
+        pool = self._event_pool
+        
+        if i < len(pool):
+            event = pool[i]
+            event.type = type
+            event.attacker_id = attacker_id
+            event.target_id = target_id
+            event.damage = damage
+            event.timestamp = timestamp
+            event.position = position
+            event.target_died = target_died
+        else:
+            pool.append(CombatEvent(type, attacker_id, target_id, damage, timestamp, position, target_died))
+        
+        self._event_count = i + 1
     
     def update_unit_position(self, unit_id: str, position: Position) -> None:
         """Update unit position in combat system."""
@@ -108,7 +372,7 @@ class CombatSystem:
     
     def add_unit(self, unit: Unit) -> None:
         """Add unit to combat system."""
-        self.spatial_hash.add_unit(unit.id, unit.position)
+        self.spatial_hash.add_unit(unit.id, unit.position, unit.owner)
     
     def remove_unit(self, unit_id: str) -> None:
         """Remove unit from combat system."""
@@ -124,22 +388,62 @@ class CombatSystem:
         """Find enemy units within attack range."""
         targets = []
         
-        # Get units in range using spatial hash
-        units_in_range = self.spatial_hash.get_units_in_radius(attacker.position, attacker.range)
+        spatial_hash = self.spatial_hash
         
-        for unit_id in units_in_range:
-            if unit_id in all_units:
-                target = all_units[unit_id]
-                
-                # Check if it's an enemy unit
-                if (target.owner != attacker.owner and 
-                    target.status not in [UnitStatus.DEAD, UnitStatus.TRAINING]):
-                    targets.append(target)
+        # Get rows in range using spatial hash, dropping friendly units in one vectorized pass
+        rows = spatial_hash.get_rows_in_radius(attacker.position, attacker.range)
+        rows = rows[spatial_hash.owners[rows] != attacker.owner]
+        
+        ids = spatial_hash.ids
+        for row in rows.tolist():
+            target = all_units.get(ids[row])
+            
+            # Check if it's an enemy unit
+            if (target is not None and
+                target.owner != attacker.owner and 
+                target.status not in [UnitStatus.DEAD, UnitStatus.TRAINING]):
+                targets.append(target)
         
         return targets
     
-    def find_enemy_tiles_in_range(self, attacker: Unit, all_tiles: List) -> List:
-        """Find enemy tiles within attack range."""
+    def find_first_target(self, attacker: Unit, all_units: Dict[str, Unit]) -> Optional[Unit]:
+        """Find the first enemy unit within attack range, in spatial hash order."""
+        spatial_hash = self.spatial_hash
+        rows = spatial_hash.get_candidate_rows(attacker.position, attacker.range)
+        ids = spatial_hash.ids
+        x, y = attacker.position.x, attacker.position.y
+        
+        i = first_enemy_in_range(rows, 0, spatial_hash.xs, spatial_hash.ys, spatial_hash.owners,
+                                 x, y, attacker.range, attacker.owner)
+        while i >= 0:
+            target = all_units.get(ids[rows[i]])
+            # The hash stores owner -1 for units entered without one, so confirm on the unit itself
+            if (target is not None and
+                target.owner != attacker.owner and
+                target.status not in [UnitStatus.DEAD, UnitStatus.TRAINING]):
+                return target
+            
+            i = first_enemy_in_range(rows, i + 1, spatial_hash.xs, spatial_hash.ys, spatial_hash.owners,
+                                     x, y, attacker.range, attacker.owner)
+        
+        return None
+    
+    def find_enemy_tiles_in_range(self, attacker: Unit, all_tiles: List,
+                                  tile_columns: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None) -> List:
+        """Find enemy tiles within attack range.
+        
+        When the tiles' x, y and owner (-1 for neutral) columns are given, the
+        range check runs as one vectorized pass instead of a loop over tiles.
+        """
+        if tile_columns is not None:
+            xs, ys, owners = tile_columns
+            position = attacker.position
+            hits = np.flatnonzero(
+                (owners >= 0) & (owners != attacker.owner)
+                & ((np.abs(xs - position.x) + np.abs(ys - position.y)) <= attacker.range)
+            )
+            return [all_tiles[i] for i in hits]
+        
         enemy_tiles = []
         
         for tile in all_tiles:
@@ -180,29 +484,51 @@ class CombatSystem:
         
         return raid_event
     
-    def process_combat_tick(self, all_units: Dict[str, Unit], current_time: float, all_tiles: List = None, conquest_system=None) -> List[CombatEvent]:
-        """Process one combat tick for all units."""
-        events = []
+    def process_combat_tick(self, all_units: Dict[str, Unit], current_time: float, all_tiles: List = None, conquest_system=None,
+                            tile_columns: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None) -> List[CombatEvent]:
+        """Process one combat tick for all units.
+        
+        The returned events are pooled and overwritten by the next tick, so
+        callers must consume them before ticking again.
+        """
+        self._event_count = 0
+        
+        # Periodically forget cooldowns of units that no longer exist
+        self._tick_count += 1
+        if self._tick_count % COOLDOWN_SWEEP_INTERVAL == 0:
+            self.unit_last_attack = {
+                unit_id: last_attack
+                for unit_id, last_attack in self.unit_last_attack.items()
+                if unit_id in all_units
+            }
+        
+        # Bind hot-loop lookups to locals once per tick
+        emit = self._emit_event
+        can_attack = self.can_attack
+        has_enemies_near = self.spatial_hash.has_enemies_near
+        find_first_target = self.find_first_target
+        calculate_damage = DamageCalculator.calculate_damage
+        combat_ready = (UnitStatus.IDLE, UnitStatus.ATTACKING)
         
         for unit in all_units.values():
-            if unit.status == UnitStatus.DEAD:
-                continue
-            
             # Only units that are idle or attacking can engage in combat
-            if unit.status not in [UnitStatus.IDLE, UnitStatus.ATTACKING]:
+            if unit.status not in combat_ready:
                 continue
             
             # Check if unit can attack
-            if not self.can_attack(unit.id, current_time):
+            if not can_attack(unit.id, current_time):
                 continue
             
-            # First priority: Find enemy units in range
-            targets = self.find_targets_in_range(unit, all_units)
+            # First priority: Find enemy units in range, skipping the search
+            # entirely when no nearby cell holds another player's unit
+            if has_enemies_near(unit.position, unit.range, unit.owner):
+                target = find_first_target(unit, all_units)
+            else:
+                target = None
             
-            if targets:
-                # Attack the first target (closest or first found)
-                target = targets[0]
-                damage = unit.calculate_damage(target)
+            if target is not None:
+                # Attack the first target found
+                damage = calculate_damage(unit, target.type)
                 
                 # Apply aura defense multiplier if conquest system is available
                 if conquest_system:
@@ -220,7 +546,7 @@ class CombatSystem:
                 self.unit_last_attack[unit.id] = current_time
                 
                 # Create combat event
-                event = CombatEvent(
+                emit(
                     type="attack",
                     attacker_id=unit.id,
                     target_id=target.id,
@@ -229,11 +555,10 @@ class CombatSystem:
                     position=unit.position,
                     target_died=target_died
                 )
-                events.append(event)
                 
                 # If target died, create death event
                 if target_died:
-                    death_event = CombatEvent(
+                    emit(
                         type="death",
                         attacker_id=unit.id,
                         target_id=target.id,
@@ -242,19 +567,18 @@ class CombatSystem:
                         position=target.position,
                         target_died=True
                     )
-                    events.append(death_event)
                     
                     # Remove dead unit from spatial hash
                     self.remove_unit(target.id)
             
             elif all_tiles is not None:
                 # Second priority: Find enemy tiles in range if no enemy units found
-                enemy_tiles = self.find_enemy_tiles_in_range(unit, all_tiles)
+                enemy_tiles = self.find_enemy_tiles_in_range(unit, all_tiles, tile_columns)
                 
                 if enemy_tiles:
                     # Attack the first enemy tile found
                     target_tile = enemy_tiles[0]
-                    damage = unit.calculate_building_damage()
+                    damage = calculate_damage(unit, "building")
                     
                     # Apply damage to tile
                     original_hp = target_tile.hp
@@ -271,7 +595,7 @@ class CombatSystem:
                     # Create tile attack event
                     tile_pos = Position(x=target_tile.x, y=target_tile.y)
                     
-                    event = CombatEvent(
+                    emit(
                         type="tile_attack",
                         attacker_id=unit.id,
                         target_id=target_tile.id,
@@ -280,11 +604,10 @@ class CombatSystem:
                         position=unit.position,
                         target_died=tile_destroyed
                     )
-                    events.append(event)
                     
                     # If tile was destroyed, create destruction event
                     if tile_destroyed:
-                        destruction_event = CombatEvent(
+                        emit(
                             type="tile_destroyed",
                             attacker_id=unit.id,
                             target_id=target_tile.id,
@@ -293,10 +616,8 @@ class CombatSystem:
                             position=tile_pos,
                             target_died=True
                         )
-                        events.append(destruction_event)
                         
                         # If it was a capital city, trigger elimination check
-                        from src.models.tile import TileType
                         if target_tile.type == TileType.CAPITAL_CITY and conquest_system:
                             # Note: Capital HP synchronization should be handled by the caller
                             pass
@@ -309,24 +630,25 @@ class CombatSystem:
                 if unit.status == UnitStatus.ATTACKING:
                     unit.status = UnitStatus.IDLE
         
-        return events
+        return self._event_pool[:self._event_count]
     
     def get_combat_stats(self) -> Dict[str, int]:
         """Get combat statistics."""
         return {
             "total_units": len(self.spatial_hash.unit_positions),
             "spatial_cells": len(self.spatial_hash.grid),
-            "recent_events": len(self.combat_events[-10:])  # Last 10 events
+            "recent_events": min(len(self.combat_events), 10)  # Last 10 events
         }
     
     def update_spatial_hash(self, all_units: Dict[str, Unit]) -> None:
         """Update spatial hash with current unit positions."""
         # Clear and rebuild spatial hash
-        self.spatial_hash.clear()
-        
-        for unit in all_units.values():
-            if unit.status != UnitStatus.DEAD:
-                self.spatial_hash.add_unit(unit.id, unit.position)
+        living = [unit for unit in all_units.values() if unit.status != UnitStatus.DEAD]
+        self.spatial_hash.rebuild(
+            [unit.id for unit in living],
+            [unit.position for unit in living],
+            [unit.owner for unit in living]
+        )
     
     def get_units_in_combat_range(self, position: Position, radius: int) -> Set[str]:
         """Get units within combat range of a position."""
@@ -340,10 +662,21 @@ class CombatSystem:
 class DamageCalculator:
     """Helper class for damage calculations."""
     
+    @staticmethod
+    def calculate_damage(attacker: Unit, target_type: str) -> int:
+        """Calculate damage against a unit type or "building" from the attacker's own effectiveness.
+        
+        Same result as Unit.calculate_damage, but reads the one multiplier it
+        needs instead of dumping the whole effectiveness model.
+        """
+        if attacker.metadata is None or attacker.metadata.effectiveness is None:
+            return attacker.attack
+        return int(attacker.attack * getattr(attacker.metadata.effectiveness, target_type, 1.0))
+    
     @staticmethod
     def calculate_dps(attacker: Unit, target: Unit) -> float:
         """Calculate damage per second based on attack speed."""
-        base_damage = attacker.calculate_damage(target)
+        base_damage = DamageCalculator.calculate_damage(attacker, target.type)
         # Assume 1 attack per second for now (can be made configurable)
         return float(base_damage)
     
@@ -3,13 +3,20 @@ Conquest system for Carcassonne: War of Ages.
 Handles raiding, watchtower aura effects, and elimination mechanics.
 """
 
-from typing import Dict, List, Optional, Tuple
+from typing import Deque, Dict, List, Optional, Tuple
+from collections import deque
 from dataclasses import dataclass
 from src.models.unit import Unit, Position
-from src.models.tile import Tile, TileType
+from src.models.tile import Tile, TileType, Resources
 from src.models.game_state import Player
 import math
 
+# Resource fields on a tile, in the order raids report them
+RESOURCE_FIELDS = tuple(Resources.model_fields)
+
+# Number of most recent raids kept for statistics
+RAID_HISTORY_SIZE = 100
+
 
 @dataclass
 class RaidResult:
@@ -37,11 +44,21 @@ class ConquestSystem:
     
     def __init__(self):
         self.active_auras: List[AuraEffect] = []
-        self.raid_history: List[RaidResult] = []
+        self._aura_by_cell: Dict[Tuple[int, int, int], float] = {}  # (owner, x, y) -> best multiplier
+        self._aura_revision: Optional[int] = None  # Tile revision the auras were built from
+        self.raid_history: Deque[RaidResult] = deque(maxlen=RAID_HISTORY_SIZE)
     
-    def update_auras(self, tiles: List[Tile], units: Dict[str, Unit]) -> None:
-        """Update aura effects from watchtowers."""
+    def update_auras(self, tiles: List[Tile], units: Dict[str, Unit], revision: Optional[int] = None) -> None:
+        """Update aura effects from watchtowers.
+        
+        When the board's tile revision is given, the auras are only rebuilt
+        after tiles were added or changed owner since the last update.
+        """
+        if revision is not None and revision == self._aura_revision:
+            return
+        self._aura_revision = revision
         self.active_auras.clear()
+        self._aura_by_cell.clear()
         
         # Find all watchtower tiles
         for tile in tiles:
@@ -58,35 +75,37 @@ class ConquestSystem:
                     owner_id=tile.owner
                 )
                 self.active_auras.append(aura)
+                self._rasterize_aura(aura)
+    
+    def _rasterize_aura(self, aura: AuraEffect) -> None:
+        """Record the aura's multiplier on every tile inside its Manhattan radius."""
+        aura_by_cell = self._aura_by_cell
+        owner = aura.owner_id
+        center_x = aura.source_position.x
+        center_y = aura.source_position.y
+        multiplier = aura.defense_multiplier
+        
+        for dx in range(-aura.radius, aura.radius + 1):
+            reach = aura.radius - abs(dx)
+            for dy in range(-reach, reach + 1):
+                key = (owner, center_x + dx, center_y + dy)
+                # Overlapping auras keep the best (highest) multiplier
+                if aura_by_cell.get(key, 1.0) < multiplier:
+                    aura_by_cell[key] = multiplier
     
     def get_defense_multiplier(self, unit: Unit) -> float:
         """Get defense multiplier for a unit based on nearby friendly watchtowers."""
-        if not self.active_auras:
-            return 1.0
-        
-        best_multiplier = 1.0
-        
-        for aura in self.active_auras:
-            # Only apply aura to friendly units
-            if aura.owner_id != unit.owner:
-                continue
-            
-            # Check if unit is within aura radius
-            distance = abs(unit.position.x - aura.source_position.x) + abs(unit.position.y - aura.source_position.y)
-            if distance <= aura.radius:
-                # Apply the best (highest) multiplier
-                best_multiplier = max(best_multiplier, aura.defense_multiplier)
-        
-        return best_multiplier
+        return self._aura_by_cell.get((unit.owner, unit.position.x, unit.position.y), 1.0)
     
     def execute_raid(self, attacker_unit: Unit, target_tile: Tile, current_time: float) -> RaidResult:
         """Execute a raid operation, stealing 10% of target tile's resources."""
         resources_stolen = {}
         
         # Calculate 10% of target tile's resources
-        if target_tile.resources:
-            for resource_type, amount in target_tile.resources.model_dump().items():
-                stolen_amount = int(amount * 0.1)  # 10% of resources
+        resources = target_tile.resources
+        if resources:
+            for resource_type in RESOURCE_FIELDS:
+                stolen_amount = int(getattr(resources, resource_type) * 0.1)  # 10% of resources
                 if stolen_amount > 0:
                     resources_stolen[resource_type] = stolen_amount
         
@@ -130,14 +149,12 @@ class ConquestSystem:
             return False
         
         # Target tile must have resources to steal
-        if not target_tile.resources:
+        resources = target_tile.resources
+        if not resources:
             return False
         
         # Check if tile has any resources > 0
-        resources_dict = target_tile.resources.model_dump()
-        has_resources = any(amount > 0 for amount in resources_dict.values())
-        
-        return has_resources
+        return resources.gold > 0 or resources.food > 0 or resources.faith > 0
     
     def check_elimination(self, players: List[Player]) -> Tuple[List[int], Optional[int]]:
         """Check for eliminated players and determine winner."""
@@ -179,12 +196,6 @@ class ConquestSystem:
         """Get raid statistics."""
         return {
             "total_raids": len(self.raid_history),
-            "successful_raids": len([r for r in self.raid_history if r.success]),
-            "recent_raids": len([r for r in self.raid_history[-10:]])  # Last 10 raids
+            "successful_raids": sum(1 for r in self.raid_history if r.success),
+            "recent_raids": min(len(self.raid_history), 10)  # Last 10 raids
         }
-    
-    def clear_history(self) -> None:
-        """Clear raid history (call periodically to prevent memory buildup)."""
-        # Keep only last 100 raids
-        if len(self.raid_history) > 100:
-            self.raid_history = self.raid_history[-100:] 
\ No newline at end of file
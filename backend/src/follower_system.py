@@ -2,22 +2,176 @@
 Follower system for managing followers in Carcassonne: War of Ages.
 """
 
+import heapq
 import time
-import uuid
-from typing import Optional, List, Dict
+from collections import deque
+import numpy as np
+from typing import Optional, List, Dict, FrozenSet, Tuple
 from .models.follower import Follower, FollowerType
 from .models.tile import Tile, TileType
 from .models.game_state import GameState
 
 RECALL_DURATION = 10.0  # 10 seconds to recall a follower
+MAX_FOLLOWERS = 8  # Size of each player's follower pool
+
+# Tile and follower types are stored as plain strings (use_enum_values), so hot
+# paths compare against these values rather than looking up enum members.
+_MINE = TileType.MINE.value
+_ORCHARD = TileType.ORCHARD.value
+
+# Columns of the generation rates array
+RESOURCE_COLUMNS = ("gold", "food", "faith")
+GOLD, FOOD, FAITH = range(len(RESOURCE_COLUMNS))
+
+# Tile type -> (follower type required on the group, resource column produced per tile)
+RESOURCE_RULES: Dict[str, Tuple[str, int]] = {
+    TileType.CAPITAL_CITY.value: (FollowerType.MAGISTRATE.value, GOLD),
+    TileType.CITY.value: (FollowerType.MAGISTRATE.value, GOLD),
+    TileType.FIELD.value: (FollowerType.FARMER.value, FOOD),
+    TileType.MONASTERY.value: (FollowerType.MONK.value, FAITH),
+}
+
+# Tile types each follower type may be placed on
+_VALID_PLACEMENTS: Dict[FollowerType, FrozenSet[TileType]] = {
+    FollowerType.MAGISTRATE: frozenset({TileType.CAPITAL_CITY, TileType.CITY}),
+    FollowerType.FARMER: frozenset({TileType.FIELD}),
+    FollowerType.MONK: frozenset({TileType.MONASTERY}),
+    FollowerType.SCOUT: frozenset(TileType),  # Scout can claim any tile
+}
+
+# Stable integer code per tile type, used to rasterize a player's board
+_TILE_TYPE_CODES: Dict[str, int] = {tile_type.value: code for code, tile_type in enumerate(TileType)}
+
+# Players owning at least this many tiles are grouped on a NumPy grid; below
+# it the grid setup costs more than a plain flood fill
+VECTORIZE_MIN_TILES = 48
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; the NumPy fallback below is used instead
+    njit = None
+
+try:
+    from scipy import ndimage
+except ImportError:  # SciPy is optional too; only used when Numba is missing
+    ndimage = None
+
+# 4-connectivity structuring element for ndimage.label
+_CROSS = np.array([[0, 1, 0], [1, 1, 1], [0, 1, 0]], np.bool_)
+
+
+def _label_components_numpy(grid: np.ndarray) -> np.ndarray:
+    """Label 4-connected regions of equal value in a grid, ignoring cells below 0.
+    
+    Returns a flat array with one label per cell. Every region is labeled by
+    the smallest flat index it contains: each cell repeatedly takes the
+    smallest label across its same-valued neighbor links, with pointer
+    jumping to shorten chains, until nothing changes.
+    """
+    height, width = grid.shape
+    index = np.arange(grid.size).reshape(height, width)
+    
+    # Links between horizontally and vertically adjacent cells of the same value
+    same_right = (grid[:, :-1] >= 0) & (grid[:, :-1] == grid[:, 1:])
+    same_down = (grid[:-1, :] >= 0) & (grid[:-1, :] == grid[1:, :])
+    u = np.concatenate((index[:, :-1][same_right], index[:-1, :][same_down]))
+    v = np.concatenate((index[:, 1:][same_right], index[1:, :][same_down]))
+    
+    labels = index.ravel()
+    while True:
+        smaller = np.minimum(labels[u], labels[v])
+        new = labels.copy()
+        np.minimum.at(new, u, smaller)
+        np.minimum.at(new, v, smaller)
+        
+        # Pointer jumping: follow each label to the label of the cell it names
+        new = new[new]
+        
+        if np.array_equal(new, labels):
+            return labels
+        labels = new
+
+
+def _label_components_loop(grid):
+    """Breadth-first version of _label_components_numpy, compiled with Numba when available."""
+    height, width = grid.shape
+    flat = grid.ravel()
+    labels = np.arange(flat.size)
+    seen = np.zeros(flat.size, np.bool_)
+    queue = np.empty(flat.size, np.intp)
+    
+    for start in range(flat.size):
+        value = flat[start]
+        if value < 0 or seen[start]:
+            continue
+        
+        # Cells are visited in flat order, so start is the region's smallest index
+        seen[start] = True
+        queue[0] = start
+        head, tail = 0, 1
+        while head < tail:
+            cell = queue[head]
+            head += 1
+            labels[cell] = start
+            
+            x = cell % width
+            for neighbor, inside in ((cell - 1, x > 0), (cell + 1, x < width - 1),
+                                     (cell - width, cell >= width), (cell + width, cell < flat.size - width)):
+                if inside and not seen[neighbor] and flat[neighbor] == value:
+                    seen[neighbor] = True
+                    queue[tail] = neighbor
+                    tail += 1
+    return labels
+
+
+def _label_components_scipy(grid: np.ndarray) -> np.ndarray:
+    """Label grid regions like _label_components_numpy, using SciPy's C labeler once per cell value."""
+    flat = grid.ravel()
+    labels = np.arange(flat.size)
+    for value in np.unique(flat[flat >= 0]).tolist():
+        value_labels, count = ndimage.label(grid == value, structure=_CROSS)
+        value_labels = value_labels.ravel()
+        cells = np.flatnonzero(value_labels)
+        
+        # Relabel each region by its smallest flat index
+        smallest = np.full(count + 1, flat.size, np.intp)
+        np.minimum.at(smallest, value_labels[cells], cells)
+        labels[cells] = smallest[value_labels[cells]]
+    return labels
+
+
+if njit is not None:
+    label_components = njit(cache=True, nogil=True)(_label_components_loop)
+elif ndimage is not None:
+    label_components = _label_components_scipy
+else:
+    label_components = _label_components_numpy
+
+
+def as_dict(game_state: GameState, rates: np.ndarray) -> Dict[int, Dict[str, int]]:
+    """Convert a generation rates array to per-player resource dicts, skipping eliminated players."""
+    return {
+        player.id: dict(zip(RESOURCE_COLUMNS, row))
+        for player, row in zip(game_state.players, rates.tolist())
+        if not player.is_eliminated
+    }
+
+
+def _tick_time(game_state: GameState) -> float:
+    """Get the current tick's monotonic time, falling back to the clock outside the game loop."""
+    return game_state.tick_time or time.monotonic()
+
 
 class FollowerSystem:
-    """Manages follower placement, recall, and resource generation."""
+    """Manages follower placement, recall, and resource generation.
     
-    @staticmethod
-    def can_place_follower(game_state: GameState, player_id: int, tile: Tile, follower_type: FollowerType) -> tuple[bool, str]:
+    Each room owns an instance. Per-game indexes and caches live on the
+    GameState passed to each method, so they are reset with the state.
+    """
+    
+    def can_place_follower(self, game_state: GameState, player_id: int, tile: Tile, follower_type: FollowerType) -> tuple[bool, str]:
         """Check if a follower can be placed on a tile."""
-        player = next((p for p in game_state.players if p.id == player_id), None)
+        player = game_state.players_by_id.get(player_id)
         if not player:
             return False, "Player not found"
             
@@ -31,52 +185,48 @@ class FollowerSystem:
             return False, "You don't own this tile"
             
         # Check follower type compatibility with tile type
-        valid_combinations = {
-            FollowerType.MAGISTRATE: [TileType.CAPITAL_CITY, TileType.CITY],
-            FollowerType.FARMER: [TileType.FIELD],
-            FollowerType.MONK: [TileType.MONASTERY],
-            FollowerType.SCOUT: [t for t in TileType]  # Scout can claim any tile
-        }
-        
-        if tile.type not in valid_combinations.get(follower_type, []):
-            return False, f"{follower_type.value} cannot be placed on {tile.type.value} tiles"
+        if tile.type not in _VALID_PLACEMENTS.get(follower_type, frozenset()):
+            return False, f"{FollowerType(follower_type).value} cannot be placed on {TileType(tile.type).value} tiles"
             
         return True, "OK"
     
-    @staticmethod
-    def place_follower(game_state: GameState, player_id: int, tile_id: str, follower_type: FollowerType) -> Optional[Follower]:
+    def place_follower(self, game_state: GameState, player_id: int, tile_id: str, follower_type: FollowerType) -> Optional[Follower]:
         """Place a follower on a tile."""
-        tile = next((t for t in game_state.tiles if t.id == tile_id), None)
+        tile = game_state.tiles_by_id.get(tile_id)
         if not tile:
             return None
             
-        can_place, _ = FollowerSystem.can_place_follower(game_state, player_id, tile, follower_type)
+        can_place, _ = self.can_place_follower(game_state, player_id, tile, follower_type)
         if not can_place:
             return None
             
         # Create follower
         follower = Follower(
-            id=f"follower_{uuid.uuid4().hex[:8]}",
-            player_id=str(player_id),
+            id=game_state.next_follower_id(),
+            player_id=player_id,
             type=follower_type,
             tile_id=tile_id
         )
         
         # Update game state
-        game_state.followers.append(follower)
+        game_state.add_follower(follower)
         tile.follower_id = follower.id
         
         # Update player's available followers
-        player = next(p for p in game_state.players if p.id == player_id)
+        player = game_state.players_by_id[player_id]
         player.followers_available -= 1
         
+        game_state.mark_resources_dirty()
         return follower
     
-    @staticmethod
-    def start_recall(game_state: GameState, player_id: int, follower_id: str) -> bool:
-        """Start recalling a follower."""
-        follower = next((f for f in game_state.followers if f.id == follower_id), None)
-        if not follower or follower.player_id != str(player_id):
+    def start_recall(self, game_state: GameState, player_id: int, follower_id: str, now: Optional[float] = None) -> bool:
+        """Start recalling a follower.
+        
+        now is the monotonic time the recall is timed from, defaulting to the
+        current tick's; recall_started_at records the wall clock time for clients.
+        """
+        follower = game_state.followers_by_id.get(follower_id)
+        if not follower or follower.player_id != player_id:
             return False
             
         if follower.is_recalling:
@@ -84,103 +234,149 @@ class FollowerSystem:
             
         follower.is_recalling = True
         follower.recall_started_at = time.time()
+        if now is None:
+            now = _tick_time(game_state)
+        heapq.heappush(game_state._recall_heap, (now + RECALL_DURATION, follower.id))
         
         return True
     
-    @staticmethod
-    def complete_recalls(game_state: GameState) -> List[Follower]:
+    def complete_recalls(self, game_state: GameState) -> List[Follower]:
         """Complete any recalls that have finished."""
         completed = []
-        current_time = time.time()
-        
-        for follower in game_state.followers:
-            if follower.is_recalling and follower.recall_started_at:
-                if current_time - follower.recall_started_at >= RECALL_DURATION:
-                    # Remove follower from tile
-                    if follower.tile_id:
-                        tile = next((t for t in game_state.tiles if t.id == follower.tile_id), None)
-                        if tile:
-                            tile.follower_id = None
-                    
-                    # Return follower to player's pool
-                    player = next((p for p in game_state.players if p.id == int(follower.player_id)), None)
-                    if player:
-                        player.followers_available = min(8, player.followers_available + 1)
-                    
-                    # Remove follower from game
-                    game_state.followers.remove(follower)
-                    completed.append(follower)
+        completed_ids = set()
+        current_time = _tick_time(game_state)
+        
+        # Only recalls that have expired are popped; the rest stay queued
+        recall_heap = game_state._recall_heap
+        followers_by_id = game_state.followers_by_id
+        while recall_heap and recall_heap[0][0] <= current_time:
+            _, follower_id = heapq.heappop(recall_heap)
+            follower = followers_by_id.get(follower_id)
+            if not follower or not follower.is_recalling or follower_id in completed_ids:
+                continue
+                
+            # Remove follower from tile
+            if follower.tile_id:
+                tile = game_state.tiles_by_id.get(follower.tile_id)
+                if tile:
+                    tile.follower_id = None
+            
+            # Return follower to player's pool
+            player = game_state.players_by_id.get(follower.player_id)
+            if player and player.followers_available < MAX_FOLLOWERS:
+                player.followers_available += 1
+            
+            completed.append(follower)
+            completed_ids.add(follower_id)
         
+        if completed:
+            # Remove finished followers from the game in one pass
+            game_state.remove_followers(completed_ids)
+            game_state.mark_resources_dirty()
         return completed
     
-    @staticmethod
-    def calculate_resource_generation(game_state: GameState) -> Dict[int, Dict[str, int]]:
-        """Calculate resource generation rates for all players."""
-        generation_rates = {}
+    def calculate_resource_generation(self, game_state: GameState) -> np.ndarray:
+        """Calculate resource generation rates for all players.
+        
+        Returns a read-only (players, 3) array with one row per entry of
+        game_state.players and columns in RESOURCE_COLUMNS order; eliminated
+        players get a zero row. Use as_dict for a per-player dict view.
+        
+        The result is cached on the game state and only recalculated after a
+        follower, tile or player change marks it dirty, or a player joins.
+        """
+        cached = game_state._resource_cache
+        if not game_state._resource_dirty and cached is not None and len(cached) == len(game_state.players):
+            return cached
+        
+        generation_rates = np.zeros((len(game_state.players), len(RESOURCE_COLUMNS)), np.int64)
         
-        for player in game_state.players:
+        # Index followers by the tile they stand on
+        follower_by_tile = {f.tile_id: f for f in game_state.followers if f.tile_id}
+        
+        # Players with no follower on any of their tiles can only earn from special tiles
+        tiles_by_id = game_state.tiles_by_id
+        owners_with_followers = {
+            tiles_by_id[tile_id].owner for tile_id in follower_by_tile if tile_id in tiles_by_id
+        }
+        
+        # Count special resource tiles (mines and orchards) per player in one pass - no follower needed
+        special_by_player: Dict[int, List[int]] = {}
+        for tile in game_state.tiles:
+            if tile.owner is None:
+                continue
+            if tile.type == _MINE:
+                special_by_player.setdefault(tile.owner, [0, 0])[0] += 1
+            elif tile.type == _ORCHARD:
+                special_by_player.setdefault(tile.owner, [0, 0])[1] += 1
+        
+        for slot, player in enumerate(game_state.players):
             if player.is_eliminated:
                 continue
                 
-            rates = {"gold": 0, "food": 0, "faith": 0}
-            
-            # Get all tiles owned by this player with followers
-            player_tiles = [t for t in game_state.tiles if t.owner == player.id and t.follower_id]
+            rates = [0] * len(RESOURCE_COLUMNS)
             
             # Group connected tiles by type
-            connected_groups = FollowerSystem._find_connected_tile_groups(game_state, player.id)
+            if player.id in owners_with_followers:
+                connected_groups = self._find_connected_tile_groups(game_state, player.id)
+            else:
+                connected_groups = []
             
             for group in connected_groups:
-                # Only need one follower per connected group
-                has_follower = any(t.follower_id for t in group)
-                if has_follower:
-                    tile_type = group[0].type
-                    group_size = len(group)
-                    
-                    # Calculate base generation
-                    if tile_type in [TileType.CAPITAL_CITY, TileType.CITY]:
-                        # Check if any follower is a magistrate
-                        magistrate_present = any(
-                            f for f in game_state.followers 
-                            if f.tile_id in [t.id for t in group] and f.type == FollowerType.MAGISTRATE
-                        )
-                        if magistrate_present:
-                            rates["gold"] += group_size  # 1 gold per connected city tile
-                            
-                    elif tile_type == TileType.FIELD:
-                        # Check if any follower is a farmer
-                        farmer_present = any(
-                            f for f in game_state.followers 
-                            if f.tile_id in [t.id for t in group] and f.type == FollowerType.FARMER
-                        )
-                        if farmer_present:
-                            rates["food"] += group_size  # 1 food per connected field tile
-                            
-                    elif tile_type == TileType.MONASTERY:
-                        # Check if any follower is a monk
-                        monk_present = any(
-                            f for f in game_state.followers 
-                            if f.tile_id in [t.id for t in group] and f.type == FollowerType.MONK
-                        )
-                        if monk_present:
-                            rates["faith"] += group_size  # 1 faith per connected monastery tile
-            
-            # Add special resource tiles (mines and orchards) - no follower needed
-            for tile in game_state.tiles:
-                if tile.owner == player.id:
-                    if tile.type == TileType.MINE:
-                        rates["gold"] += 2  # 2 gold per mine
-                    elif tile.type == TileType.ORCHARD:
-                        rates["food"] += 2  # 2 food per orchard
-            
-            generation_rates[player.id] = rates
+                rule = RESOURCE_RULES.get(group[0].type)
+                if rule is None:
+                    continue
+                
+                # Only need one follower of the right type per connected group;
+                # each tile in the group then yields 1 of the resource
+                follower_type, column = rule
+                if self._group_has_follower(group, follower_by_tile, follower_type):
+                    rates[column] += len(group)
+            
+            # Add special resource tiles
+            special = special_by_player.get(player.id)
+            if special:
+                mines, orchards = special
+                rates[GOLD] += 2 * mines  # 2 gold per mine
+                rates[FOOD] += 2 * orchards  # 2 food per orchard
+            
+            generation_rates[slot] = rates
         
+        # Callers share the cached array, so it must not be modified in place
+        generation_rates.flags.writeable = False
+        game_state._resource_cache = generation_rates
+        game_state._resource_dirty = False
         return generation_rates
     
-    @staticmethod
-    def _find_connected_tile_groups(game_state: GameState, player_id: int) -> List[List[Tile]]:
-        """Find groups of connected tiles of the same type owned by a player."""
-        player_tiles = [t for t in game_state.tiles if t.owner == player_id]
+    def _group_has_follower(self, group: List[Tile], follower_by_tile: Dict[str, Follower], follower_type: str) -> bool:
+        """Check whether a follower of the given type stands on any tile of a group."""
+        for tile in group:
+            follower = follower_by_tile.get(tile.id)
+            if follower is not None and follower.type == follower_type:
+                return True
+        return False
+    
+    def _find_connected_tile_groups(self, game_state: GameState, player_id: int) -> List[List[Tile]]:
+        """Find groups of connected tiles of the same type owned by a player.
+        
+        Groups are cached on the game state until the board's tile revision changes.
+        """
+        player_tiles = game_state.tiles_by_owner.get(player_id, [])
+        revision = game_state.tile_revision
+        cached = game_state._group_cache.get(player_id)
+        if cached is not None and cached[0] == revision:
+            return cached[1]
+        
+        if len(player_tiles) >= VECTORIZE_MIN_TILES:
+            groups = self._find_connected_tile_groups_grid(player_tiles)
+        else:
+            groups = self._find_connected_tile_groups_flood(player_tiles)
+        game_state._group_cache[player_id] = (revision, groups)
+        return groups
+    
+    def _find_connected_tile_groups_flood(self, player_tiles: List[Tile]) -> List[List[Tile]]:
+        """Find connected same-type groups with a breadth-first flood fill."""
+        coord_to_tile = {(t.x, t.y): t for t in player_tiles}
         visited = set()
         groups = []
         
@@ -188,28 +384,44 @@ class FollowerSystem:
             if tile.id in visited:
                 continue
                 
-            # Start a new group
+            # Start a new group; tiles are marked visited when queued so each is queued once
             group = []
             tile_type = tile.type
-            stack = [tile]
+            visited.add(tile.id)
+            queue = deque([tile])
             
-            while stack:
-                current = stack.pop()
-                if current.id in visited:
-                    continue
-                    
-                visited.add(current.id)
+            while queue:
+                current = queue.popleft()
                 group.append(current)
                 
                 # Check adjacent tiles
-                for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                    nx, ny = current.x + dx, current.y + dy
-                    adj_tile = next((t for t in player_tiles if t.x == nx and t.y == ny), None)
-                    
+                x, y = current.x, current.y
+                for adj_tile in (coord_to_tile.get((x, y + 1)), coord_to_tile.get((x + 1, y)),
+                                 coord_to_tile.get((x, y - 1)), coord_to_tile.get((x - 1, y))):
                     if adj_tile and adj_tile.id not in visited and adj_tile.type == tile_type:
-                        stack.append(adj_tile)
+                        visited.add(adj_tile.id)
+                        queue.append(adj_tile)
             
-            if group:
-                groups.append(group)
+            groups.append(group)
+        
+        return groups
+    
+    def _find_connected_tile_groups_grid(self, player_tiles: List[Tile]) -> List[List[Tile]]:
+        """Find connected same-type groups by rasterizing tiles into a NumPy grid and labeling it."""
+        n = len(player_tiles)
+        xs = np.fromiter((t.x for t in player_tiles), np.intp, n)
+        ys = np.fromiter((t.y for t in player_tiles), np.intp, n)
+        codes = np.fromiter((_TILE_TYPE_CODES[t.type] for t in player_tiles), np.int8, n)
+        
+        # Rasterize over the bounding box of the player's tiles; -1 marks empty cells
+        xs -= xs.min()
+        ys -= ys.min()
+        grid = np.full((ys.max() + 1, xs.max() + 1), -1, np.int8)
+        grid[ys, xs] = codes
+        
+        tile_labels = label_components(grid)[ys * grid.shape[1] + xs]
         
-        return groups
\ No newline at end of file
+        groups: Dict[int, List[Tile]] = {}
+        for tile, label in zip(player_tiles, tile_labels.tolist()):
+            groups.setdefault(label, []).append(tile)
+        return list(groups.values())
@@ -2,22 +2,197 @@
 Room management for multiplayer games in Carcassonne: War of Ages
 """
 from dataclasses import dataclass, field
-from typing import Dict, Set, List, Optional
+from functools import lru_cache
+from typing import Callable, Dict, Set, List, Optional, Tuple
 from datetime import datetime
 import uuid
 import asyncio
+import heapq
 import time
 import logging
+import random
+import numpy as np
+import orjson
+import zlib
 from fastapi import WebSocket
+from pydantic import BaseModel
 
-from .models.game_state import GameState, Player, GameStatus, GameSettings, TechLevel
-from .models.unit import Unit, UnitSystem
-from .models.tile import Tile
+from .models.game_state import GameState, Player, PlayerStats, GameStatus, GameSettings, TechLevel
+from .models.unit import Unit, UnitSystem, UnitStatus, Position
+from .models.tile import Tile, TileType, Resources, TileMetadata
 from .conquest_system import ConquestSystem
-from .follower_system import FollowerSystem
+from .follower_system import FollowerSystem, RESOURCE_COLUMNS
+
+try:
+    import ormsgpack
+except ImportError:  # Without ormsgpack state frames fall back to JSON
+    ormsgpack = None
 
 logger = logging.getLogger(__name__)
 
+# Game loop tick length in seconds (10 FPS)
+TICK_INTERVAL = 0.1
+
+# Poll interval in seconds for rooms that are not being played
+IDLE_TICK_INTERVAL = 1.0
+
+# Ticks the loop may fall behind before it drops the backlog instead of catching up
+MAX_TICK_LAG = 5
+
+# Messages buffered per client before the oldest queued message is dropped
+OUTBOX_SIZE = 64
+
+# Ticks between full state broadcasts; broadcasts in between only carry changes
+KEYFRAME_INTERVAL = 100
+
+# State fields diffed entity by entity (by ID) rather than as a whole
+ENTITY_FIELDS = ("tiles", "units")
+
+# Room broadcasts at least this large are zlib-compressed once for all clients;
+# compressed frames start with the zlib header byte 0x78, which no JSON text does
+COMPRESS_MIN_BYTES = 4096
+COMPRESS_LEVEL = 1
+
+# Most of any one resource a player can stockpile
+RESOURCE_CAP = 500
+
+# Player colors, assigned in join order
+PLAYER_COLORS = ("#d62828", "#2a9d8f", "#e9c46a", "#264653")
+
+# Capital city positions matching the client layout, one per map quadrant
+CAPITAL_POSITIONS = ((5, 5), (14, 5), (5, 14), (14, 14))
+
+# Starting field offset from each capital: south for the top row, north for the bottom row
+CAPITAL_FIELD_OFFSETS = ((0, 1), (0, 1), (0, -1), (0, -1))
+
+# Tiles closer than this (Manhattan distance) to a capital count as near it
+CAPITAL_EXCLUSION_RADIUS = 3
+
+# Resource generation, HP and training ability shown on offered tiles; the
+# generation dicts are shared, so callers must not modify them
+_NO_GENERATION = {"gold": 0, "food": 0, "faith": 0}
+_TILE_RESOURCE_GENERATION = {
+    TileType.CITY: {"gold": 30, "food": 30, "faith": 0},
+    TileType.FIELD: {"gold": 10, "food": 10, "faith": 0},
+    TileType.MONASTERY: {"gold": 0, "food": 0, "faith": 50},
+    TileType.BARRACKS: _NO_GENERATION,
+    TileType.WATCHTOWER: _NO_GENERATION,
+}
+_TILE_HP = {
+    TileType.CITY: 60,
+    TileType.FIELD: 40,
+    TileType.MONASTERY: 80,
+    TileType.BARRACKS: 100,
+    TileType.WATCHTOWER: 120,
+}
+_TRAINING_TILES = frozenset({TileType.CITY, TileType.BARRACKS, TileType.CAPITAL_CITY})
+
+# Map resource tiles: tile type -> ((gold, food, faith), hp, metadata fields)
+_RESOURCE_TILE_PROPERTIES = {
+    TileType.MINE: ((2, 0, 0), 150, {"can_train": False, "worker_capacity": 0}),
+    TileType.ORCHARD: ((0, 2, 0), 150, {"can_train": False, "worker_capacity": 0}),
+    TileType.MONASTERY: ((0, 0, 50), 300, {"can_train": False, "worker_capacity": 1}),
+    TileType.MARSH: ((0, 0, 0), 30, {"can_train": False, "worker_capacity": 0, "speed_multiplier": 0.3}),
+}
+_DEFAULT_RESOURCE_TILE_PROPERTIES = ((0, 0, 0), 50, {"can_train": False, "worker_capacity": 0})
+
+# Dev mode tile properties: resource tiles as above plus the buildable tile types
+_DEV_TILE_PROPERTIES = {
+    **_RESOURCE_TILE_PROPERTIES,
+    TileType.FIELD: ((1, 1, 0), 100, {"can_train": False, "worker_capacity": 1}),
+    TileType.CITY: ((3, 1, 0), 200, {"can_train": False, "worker_capacity": 2}),
+    TileType.BARRACKS: ((0, 0, 0), 300, {"can_train": True, "worker_capacity": 0}),
+    TileType.WATCHTOWER: ((0, 0, 0), 400, {"can_train": False, "worker_capacity": 0, "aura_radius": 2}),
+}
+
+# Edge types per tile type; the default is an all-field tile
+_TILE_EDGES = {
+    tile_type: [tile_type.value] * 4
+    for tile_type in (TileType.MINE, TileType.ORCHARD, TileType.MONASTERY, TileType.MARSH,
+                      TileType.FIELD, TileType.CITY, TileType.BARRACKS, TileType.WATCHTOWER)
+}
+_DEFAULT_TILE_EDGES = [TileType.FIELD.value] * 4
+
+# Tile types that produce without a worker, as stored on tiles (string values)
+_RESOURCE_TILE_TYPES = frozenset({TileType.MINE.value, TileType.ORCHARD.value})
+
+
+def _model_json(model: BaseModel) -> bytes:
+    """Serialize a pydantic model straight to JSON bytes with its compiled serializer."""
+    return model.__pydantic_serializer__.to_json(model)
+
+
+def _encode_model(obj):
+    """orjson fallback that embeds pydantic models as JSON produced by pydantic's own serializer."""
+    if isinstance(obj, BaseModel):
+        return orjson.Fragment(_model_json(obj))
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _pack_state(message: Dict) -> bytes:
+    """Encode a state frame as MessagePack when ormsgpack is installed, otherwise as JSON.
+    
+    Clients tell the two apart by the first byte: a MessagePack map starts
+    with 0x80-0x8f, 0xde or 0xdf, JSON with '{'.
+    """
+    if ormsgpack is not None:
+        return ormsgpack.packb(message)
+    return orjson.dumps(message)
+
+
+def _compress_frame(message_bytes: bytes) -> bytes:
+    """Compress a broadcast frame once for all clients if it is large enough to be worth it."""
+    if len(message_bytes) >= COMPRESS_MIN_BYTES:
+        return zlib.compress(message_bytes, COMPRESS_LEVEL)
+    return message_bytes
+
+
+def _diff_by_id(previous: List[Dict], current: List[Dict]) -> Tuple[List[Dict], List[str]]:
+    """Find entities added or changed since the previous snapshot, and IDs of removed ones."""
+    previous_by_id = {entity["id"]: entity for entity in previous}
+    changed = [entity for entity in current if previous_by_id.pop(entity["id"], None) != entity]
+    return changed, sorted(previous_by_id)
+
+
+def _state_delta(previous: Dict, current: Dict) -> Dict:
+    """Build a state delta payload between two dumped game states.
+    
+    Top-level fields are included whole when they changed. Tiles and units
+    only list the entities that changed, plus removed_tiles/removed_units
+    with the IDs of those that are gone.
+    """
+    delta = {
+        key: value for key, value in current.items()
+        if key not in ENTITY_FIELDS and previous.get(key) != value
+    }
+    for key in ENTITY_FIELDS:
+        changed, removed = _diff_by_id(previous.get(key, []), current[key])
+        if changed:
+            delta[key] = changed
+        if removed:
+            delta[f"removed_{key}"] = removed
+    
+    # Delta units use the client's unit format with flat coordinates
+    if "units" in delta:
+        delta["units"] = [
+            {**unit, "x": unit["position"]["x"], "y": unit["position"]["y"]} for unit in delta["units"]
+        ]
+    return delta
+
+
+def _capital_distance(x: int, y: int) -> int:
+    """Get the Manhattan distance from a position to the nearest capital."""
+    return min(abs(x - cx) + abs(y - cy) for cx, cy in CAPITAL_POSITIONS)
+
+
+@lru_cache(maxsize=None)
+def _capital_distance_map(map_size: int) -> Dict[Tuple[int, int], int]:
+    """Distance to the nearest capital for every cell of a square map.
+    
+    Capitals never move, so each map size is computed once and shared by all rooms.
+    """
+    return {(x, y): _capital_distance(x, y) for x in range(map_size) for y in range(map_size)}
+
 
 @dataclass
 class Room:
@@ -34,14 +209,56 @@ class Room:
     conquest_system: ConquestSystem = field(default_factory=ConquestSystem)
     follower_system: FollowerSystem = field(default_factory=FollowerSystem)
     dev_mode: bool = False
+    # Events raised between broadcasts, delivered with the next state message
+    _pending_events: List[Dict] = field(default_factory=list, init=False, repr=False)
+    # Units and tiles changed since the last delta broadcast
+    _dirty_units: Set[str] = field(default_factory=set, init=False, repr=False)
+    _dirty_tiles: Set[str] = field(default_factory=set, init=False, repr=False)
+    # Set by anything that changes the state clients see; the loop skips clean broadcasts
+    _state_dirty: bool = field(default=False, init=False, repr=False)
+    # Cached active players and turn order; rebuilt after joins, departures and eliminations
+    _active_players: Optional[List[Player]] = field(default=None, init=False, repr=False)
+    _turn_order: Optional[List[int]] = field(default=None, init=False, repr=False)
+    # Player ID -> next player in turn order, for every player including eliminated ones
+    _next_player: Optional[Dict[int, int]] = field(default=None, init=False, repr=False)
+    # Game player ID -> key in players/connections; players are never removed, so
+    # the index is rebuilt whenever its size drifts from the players dict
+    _player_keys: Dict[int, str] = field(default_factory=dict, init=False, repr=False)
+    _rng: random.Random = field(init=False, repr=False)
+    # Units still training, and a min-heap of (completion time, unit ID) so ticks
+    # only look at units that are due instead of scanning every unit
+    _training_units: Dict[str, Unit] = field(default_factory=dict, init=False, repr=False)
+    _training_heap: List[Tuple[float, str]] = field(default_factory=list, init=False, repr=False)
+    # Per-client bounded send queues, each drained by one writer task
+    _outboxes: Dict[str, asyncio.Queue] = field(default_factory=dict, init=False, repr=False)
+    _writers: Dict[str, asyncio.Task] = field(default_factory=dict, init=False, repr=False)
+    # Latest queued snapshot per coalesce key for each client; the outbox holds the key
+    _coalesced: Dict[str, Dict[str, bytes]] = field(default_factory=dict, init=False, repr=False)
+    # Snapshot messages already encoded this tick, keyed by (tick, kind)
+    _serial_cache: Dict[Tuple[int, str], bytes] = field(default_factory=dict, init=False, repr=False)
+    # State as of the last broadcast, and the tick of the last full broadcast
+    _last_sent: Optional[Dict] = field(default=None, init=False, repr=False)
+    _last_keyframe_tick: int = field(default=0, init=False, repr=False)
+    # Resources per player ID as of the last resource update sent
+    _sent_resources: Dict[int, Tuple[int, ...]] = field(default_factory=dict, init=False, repr=False)
 
     def __post_init__(self):
         """Initialize room after creation."""
         # Initialize basic state without players (will be created when players join)
         self.state = None
+        # Per-room generator for map layout and tile offers
+        self._rng = random.Random(self.room_id)
         
     def add_player(self, player_id: str, websocket: WebSocket) -> bool:
         """Add a player to the room. Returns True if successful."""
+        if player_id in self.players:
+            # Player reconnecting; their seat is already counted, so a full room still takes them back
+            self.connections[player_id] = websocket
+            self.players[player_id].is_connected = True
+            self.last_activity = datetime.now()
+            self._state_dirty = True
+            return True
+            
         max_players = 4  # Default max players
         if self.state and self.state.game_settings:
             max_players = self.state.game_settings.max_players
@@ -49,13 +266,7 @@ class Room:
         if len(self.players) >= max_players:
             return False
             
-        if player_id in self.players:
-            # Player reconnecting
-            self.connections[player_id] = websocket
-            return True
-            
         # New player
-        from .models.game_state import PlayerStats
         
         # Set starting resources and tech level based on dev mode
         if self.dev_mode:
@@ -70,7 +281,7 @@ class Room:
         player = Player(
             id=len(self.players),
             name=player_id,
-            color=f"#{''.join([f'{i:02x}' for i in [hash(player_id) % 256, (hash(player_id) * 2) % 256, (hash(player_id) * 3) % 256]])}",
+            color=PLAYER_COLORS[len(self.players) % len(PLAYER_COLORS)],
             is_connected=True,
             is_eliminated=False,
             resources={
@@ -88,6 +299,8 @@ class Room:
         self.players[player_id] = player
         self.connections[player_id] = websocket
         self.last_activity = datetime.now()
+        self._state_dirty = True
+        self._invalidate_active_players()
         
         # Decrease reserved player count when player actually joins
         if hasattr(self, 'reserved_players') and self.reserved_players > 0:
@@ -103,17 +316,14 @@ class Room:
         # Add player to state if it exists and they're not already in it
         if self.state:
             # Check if player is already in the state (by ID)
-            player_exists = any(p.id == player.id for p in self.state.players)
-            if not player_exists:
-                logger.info(f"Adding player {player.id} ({player_id}) to game state")
+            existing = self.state.players_by_id.get(player.id)
+            if existing is None:
+                logger.info("Adding player %s (%s) to game state", player.id, player_id)
                 self.state.players.append(player)
             else:
                 # Update the existing player's connection status
-                logger.info(f"Player {player.id} ({player_id}) already exists in game state, updating connection status")
-                for p in self.state.players:
-                    if p.id == player.id:
-                        p.is_connected = True
-                        break
+                logger.info("Player %s (%s) already exists in game state, updating connection status", player.id, player_id)
+                existing.is_connected = True
             
         return True
     
@@ -122,15 +332,32 @@ class Room:
         if player_id not in self.players:
             return False
             
-        # Remove connection
+        # Remove connection and stop its writer
         if player_id in self.connections:
             del self.connections[player_id]
+        self._close_outbox(player_id)
             
         # Mark player as eliminated but keep in game state for now
         if player_id in self.players:
             self.players[player_id].is_eliminated = True
             
         self.last_activity = datetime.now()
+        self._state_dirty = True
+        self._invalidate_active_players()
+        return True
+    
+    def disconnect_player(self, player_id: str) -> bool:
+        """Drop a player's connection without eliminating them, so they can reconnect. Returns True if successful."""
+        if player_id not in self.players:
+            return False
+            
+        # Remove connection and stop its writer
+        self.connections.pop(player_id, None)
+        self._close_outbox(player_id)
+        self.players[player_id].is_connected = False
+        
+        self.last_activity = datetime.now()
+        self._state_dirty = True
         return True
     
     def _initialize_game_state(self):
@@ -140,7 +367,7 @@ class Room:
             
         # Initialize basic game state structure
         players_list = list(self.players.values())
-        logger.info(f"Initializing game state with {len(players_list)} players: {[p.id for p in players_list]}")
+        logger.info("Initializing game state with %d players: %s", len(players_list), [p.id for p in players_list])
         
         self.state = GameState(
             game_id=self.room_id,
@@ -190,12 +417,10 @@ class Room:
         # Initialize turn time remaining
         self.state.turn_time_remaining = 15.0
         
-        print(f"Game state initialized with {len(self.state.tiles)} tiles, status: {self.state.status}")
+        logger.info("Game state initialized with %d tiles, status: %s", len(self.state.tiles), self.state.status)
     
     def _give_initial_tiles_to_players(self):
         """Give each player a random starting tile in their bank."""
-        from .models.tile import TileType
-        import random
         
         # Available tile types for initial tiles
         available_types = [
@@ -209,7 +434,7 @@ class Room:
         # Send a single random tile to each player's bank
         for player_id in range(len(self.state.players)):
             # Generate one random tile
-            tile_type = random.choice(available_types)
+            tile_type = self._rng.choice(available_types)
             
             initial_tile = {
                 "id": f"initial_{player_id}_{self.state.turn_number}",
@@ -228,17 +453,13 @@ class Room:
             }
             
             # Find the player's connection and send the tile
-            for pid, connection in self.connections.items():
-                player = self.players.get(pid)
-                if player and player.id == player_id:
-                    try:
-                        import orjson
-                        message_str = orjson.dumps(message).decode()
-                        asyncio.create_task(connection.send_text(message_str))
-                        print(f"Sent initial {tile_type.value} tile to player {player_id}")
-                    except Exception as e:
-                        print(f"Failed to send initial tile to player {player_id}: {e}")
-                    break
+            pid = self._connection_key(player_id)
+            if pid is not None:
+                try:
+                    self._enqueue_message(pid, orjson.dumps(message))
+                    logger.debug("Sent initial %s tile to player %s", tile_type.value, player_id)
+                except Exception:
+                    logger.exception("Failed to send initial tile to player %s", player_id)
     
     def _sync_units_to_unit_system(self):
         """Synchronize units from game state to unit system."""
@@ -248,12 +469,13 @@ class Room:
         # Add all units from game state to unit system
         for unit in self.state.units:
             self.unit_system.add_unit(unit)
+            if unit.status == UnitStatus.TRAINING:
+                self._track_training_unit(unit)
             
-        print(f"Synchronized {len(self.state.units)} units to unit system")
+        logger.debug("Synchronized %d units to unit system", len(self.state.units))
         
     def _initialize_game_map(self):
         """Initialize the game map with capitals, resources, and initial tiles."""
-        from .models.tile import Resources, TileMetadata, TileType
         
         # Place capital cities in quadrants
         self._place_capital_cities()
@@ -272,77 +494,54 @@ class Room:
             # Place 15 marsh tiles at least 3 spaces from capitals
             self._place_marsh_tiles()
         
-        print(f"Game map initialized with {len(self.state.tiles)} tiles (dev_mode: {self.dev_mode})")
+        logger.info("Game map initialized with %d tiles (dev_mode: %s)", len(self.state.tiles), self.dev_mode)
         
     def _place_capital_cities(self):
         """Place capital cities in the four quadrants of the map."""
-        from .models.tile import Resources, TileMetadata, TileType
-        
-        # Capital positions matching client layout
-        capital_positions = [
-            {"x": 5, "y": 5},   # Top-left quadrant
-            {"x": 14, "y": 5},  # Top-right quadrant  
-            {"x": 5, "y": 14},  # Bottom-left quadrant
-            {"x": 14, "y": 14}  # Bottom-right quadrant
-        ]
         
-        for index, pos in enumerate(capital_positions):
+        placed_at = time.time()
+        for index, (x, y) in enumerate(CAPITAL_POSITIONS):
             # Only place capitals for active players
             owner_id = index if index < len(self.state.players) else None
             
             capital = Tile(
-                id=f"{pos['x']},{pos['y']}",
+                id=f"{x},{y}",
                 type=TileType.CAPITAL_CITY,
-                x=pos['x'],
-                y=pos['y'],
+                x=x,
+                y=y,
                 edges=["city", "city", "city", "city"],  # All sides are city
                 hp=1000,
                 max_hp=1000,
                 owner=owner_id,
                 resources=Resources(gold=2, food=0, faith=0),
-                placed_at=datetime.now().timestamp(),
+                placed_at=placed_at,
                 metadata=TileMetadata(can_train=True, worker_capacity=2)
             )
             
-            self.state.tiles.append(capital)
+            self.state.add_tile(capital)
             
             # Set capital position for player
             if owner_id is not None and owner_id < len(self.state.players):
-                from .models.unit import Position
-                self.state.players[owner_id].capital_city = Position(x=pos['x'], y=pos['y'])
+                self.state.players[owner_id].capital_city = Position(x=x, y=y)
                 # Sync capital HP with tile HP
                 self.state.players[owner_id].capital_hp = capital.hp
                 
-        print(f"Placed {len(capital_positions)} capital cities")
+        logger.debug("Placed %d capital cities", len(CAPITAL_POSITIONS))
         
     def _place_field_tiles_around_capitals(self):
         """Place one field tile adjacent to each capital city."""
-        from .models.tile import Resources, TileMetadata, TileType
         
-        capital_positions = [
-            {"x": 5, "y": 5},
-            {"x": 14, "y": 5},
-            {"x": 5, "y": 14},
-            {"x": 14, "y": 14}
-        ]
-        
-        # Preferred positions for field tiles (one per capital)
-        field_offsets = [
-            {"x": 0, "y": 1},   # South for top-left capital
-            {"x": 0, "y": 1},   # South for top-right capital
-            {"x": 0, "y": -1},  # North for bottom-left capital
-            {"x": 0, "y": -1}   # North for bottom-right capital
-        ]
-        
-        for capital_index, capital in enumerate(capital_positions):
+        placed_at = time.time()
+        for capital_index, ((capital_x, capital_y), (offset_x, offset_y)) in enumerate(
+            zip(CAPITAL_POSITIONS, CAPITAL_FIELD_OFFSETS)
+        ):
             # Only place field for active players
             if capital_index >= len(self.state.players):
                 continue
                 
             owner_id = capital_index
-            offset = field_offsets[capital_index]
-            field_x = capital['x'] + offset['x']
-            field_y = capital['y'] + offset['y']
+            field_x = capital_x + offset_x
+            field_y = capital_y + offset_y
             
             # Check bounds and avoid duplicates
             if (0 <= field_x < self.state.game_settings.map_size and 
@@ -359,196 +558,122 @@ class Room:
                     max_hp=30,
                     owner=owner_id,  # Field is owned by the same player as the capital
                     resources=Resources(gold=0, food=20, faith=0),
-                    placed_at=datetime.now().timestamp(),
+                    placed_at=placed_at,
                     metadata=TileMetadata(can_train=False, worker_capacity=1)
                 )
                 
-                self.state.tiles.append(field_tile)
+                self.state.add_tile(field_tile)
                     
-        print(f"Placed {len(self.state.players)} field tiles adjacent to capitals")
+        logger.debug("Placed %d field tiles adjacent to capitals", len(self.state.players))
         
     def _place_resource_tiles(self):
         """Place 20 resource tiles (mines and orchards) at least 5 spaces from capitals."""
-        from .models.tile import Resources, TileMetadata, TileType
-        import random
         
         # 10 mines and 10 orchards
         resource_configs = [
             (TileType.MINE, 10),
             (TileType.ORCHARD, 10)
         ]
+        tile_types = [tile_type for tile_type, count in resource_configs for _ in range(count)]
         
-        total_placed = 0
+        # Sample distinct valid positions up front instead of retrying random probes
+        free_cells = self._free_cells(min_capital_distance=5)
+        positions = self._rng.sample(free_cells, min(len(tile_types), len(free_cells)))
+        placed_at = time.time()
         
-        for tile_type, count in resource_configs:
-            placed = 0
-            attempts = 0
+        for tile_type, (x, y) in zip(tile_types, positions):
+            resources, hp, metadata = self._get_resource_tile_properties(tile_type)
             
-            while placed < count and attempts < 1000:
-                x = random.randint(0, self.state.game_settings.map_size - 1)
-                y = random.randint(0, self.state.game_settings.map_size - 1)
-                
-                # Check if position is valid (not occupied and at least 5 spaces from any capital)
-                if not self._is_position_occupied(x, y) and self._min_distance_from_capitals(x, y) >= 5:
-                    resources, hp, metadata = self._get_resource_tile_properties(tile_type)
-                    
-                    resource_tile = Tile(
-                        id=f"{x},{y}",
-                        type=tile_type,
-                        x=x,
-                        y=y,
-                        edges=self._get_tile_edges(tile_type),
-                        hp=hp,
-                        max_hp=hp,
-                        owner=None,
-                        resources=resources,
-                        placed_at=datetime.now().timestamp(),
-                        metadata=metadata,
-                        capturable=True
-                    )
-                    
-                    self.state.tiles.append(resource_tile)
-                    placed += 1
-                    total_placed += 1
-                    
-                attempts += 1
+            resource_tile = Tile(
+                id=f"{x},{y}",
+                type=tile_type,
+                x=x,
+                y=y,
+                edges=self._get_tile_edges(tile_type),
+                hp=hp,
+                max_hp=hp,
+                owner=None,
+                resources=resources,
+                placed_at=placed_at,
+                metadata=metadata,
+                capturable=True
+            )
+            
+            self.state.add_tile(resource_tile)
                 
-        print(f"Placed {total_placed} resource tiles (mines and orchards)")
+        logger.debug("Placed %d resource tiles (mines and orchards)", len(positions))
         
     def _place_marsh_tiles(self):
         """Place 15 marsh tiles at least 3 spaces from capitals."""
-        from .models.tile import Resources, TileMetadata, TileType
-        import random
         
-        placed = 0
-        attempts = 0
-        
-        while placed < 15 and attempts < 1000:
-            x = random.randint(0, self.state.game_settings.map_size - 1)
-            y = random.randint(0, self.state.game_settings.map_size - 1)
-            
-            # Check if position is valid (not occupied and at least 3 spaces from any capital)
-            if not self._is_position_occupied(x, y) and self._min_distance_from_capitals(x, y) >= 3:
-                marsh_tile = Tile(
-                    id=f"{x},{y}",
-                    type=TileType.MARSH,
-                    x=x,
-                    y=y,
-                    edges=["marsh", "marsh", "marsh", "marsh"],
-                    hp=25,
-                    max_hp=25,
-                    owner=None,
-                    resources=Resources(gold=0, food=0, faith=0),
-                    placed_at=datetime.now().timestamp(),
-                    metadata=TileMetadata(
-                        can_train=False, 
-                        worker_capacity=0,
-                        speed_multiplier=0.5  # Marshes slow down units
-                    )
+        free_cells = self._free_cells(min_capital_distance=3)
+        positions = self._rng.sample(free_cells, min(15, len(free_cells)))
+        placed_at = time.time()
+        
+        for x, y in positions:
+            marsh_tile = Tile(
+                id=f"{x},{y}",
+                type=TileType.MARSH,
+                x=x,
+                y=y,
+                edges=["marsh", "marsh", "marsh", "marsh"],
+                hp=25,
+                max_hp=25,
+                owner=None,
+                resources=Resources(gold=0, food=0, faith=0),
+                placed_at=placed_at,
+                metadata=TileMetadata(
+                    can_train=False, 
+                    worker_capacity=0,
+                    speed_multiplier=0.5  # Marshes slow down units
                 )
-                
-                self.state.tiles.append(marsh_tile)
-                placed += 1
-                
-            attempts += 1
+            )
+            
+            self.state.add_tile(marsh_tile)
                     
-        print(f"Placed {placed} marsh tiles")
+        logger.debug("Placed %d marsh tiles", len(positions))
+        
+    def _free_cells(self, min_capital_distance: int) -> List[Tuple[int, int]]:
+        """List unoccupied map positions at least min_capital_distance from every capital."""
+        tiles_by_coord = self.state.tiles_by_coord
+        distances = _capital_distance_map(self.state.game_settings.map_size)
+        return [
+            cell for cell, distance in distances.items()
+            if distance >= min_capital_distance and cell not in tiles_by_coord
+        ]
         
     def _is_position_occupied(self, x: int, y: int) -> bool:
         """Check if a position is already occupied by a tile."""
-        for tile in self.state.tiles:
-            if tile.x == x and tile.y == y:
-                return True
-        return False
+        return (x, y) in self.state.tiles_by_coord
         
     def _is_near_capital(self, x: int, y: int) -> bool:
         """Check if position is too close to a capital city."""
-        min_distance = 3
-        capital_positions = [
-            {"x": 5, "y": 5},
-            {"x": 14, "y": 5},
-            {"x": 5, "y": 14},
-            {"x": 14, "y": 14}
-        ]
-        
-        for capital in capital_positions:
-            distance = abs(x - capital['x']) + abs(y - capital['y'])
-            if distance < min_distance:
-                return True
-        return False
+        return self._min_distance_from_capitals(x, y) < CAPITAL_EXCLUSION_RADIUS
     
     def _min_distance_from_capitals(self, x: int, y: int) -> int:
         """Get minimum Manhattan distance from position to any capital."""
-        capital_positions = [
-            {"x": 5, "y": 5},
-            {"x": 14, "y": 5},
-            {"x": 5, "y": 14},
-            {"x": 14, "y": 14}
-        ]
-        
-        min_dist = float('inf')
-        for capital in capital_positions:
-            distance = abs(x - capital['x']) + abs(y - capital['y'])
-            min_dist = min(min_dist, distance)
-        
-        return min_dist
+        distance = _capital_distance_map(self.state.game_settings.map_size).get((x, y))
+        if distance is None:
+            # Off the map; not covered by the precomputed distances
+            distance = _capital_distance(x, y)
+        return distance
         
     def _get_resource_tile_properties(self, tile_type):
         """Get properties for resource tiles."""
-        from .models.tile import Resources, TileMetadata, TileType
         
-        properties = {
-            TileType.MINE: {
-                "resources": Resources(gold=2, food=0, faith=0),  # Changed from 50 to 2 as per GDD
-                "hp": 150,
-                "metadata": TileMetadata(can_train=False, worker_capacity=0)
-            },
-            TileType.ORCHARD: {
-                "resources": Resources(gold=0, food=2, faith=0),  # Changed from 50 to 2 as per GDD
-                "hp": 150,
-                "metadata": TileMetadata(can_train=False, worker_capacity=0)
-            },
-            TileType.MONASTERY: {
-                "resources": Resources(gold=0, food=0, faith=50),
-                "hp": 300,
-                "metadata": TileMetadata(can_train=False, worker_capacity=1)
-            },
-            TileType.MARSH: {
-                "resources": Resources(gold=0, food=0, faith=0),
-                "hp": 30,
-                "metadata": TileMetadata(can_train=False, worker_capacity=0, speed_multiplier=0.3)
-            }
-        }
-        
-        props = properties.get(tile_type, {
-            "resources": Resources(gold=0, food=0, faith=0),
-            "hp": 50,
-            "metadata": TileMetadata(can_train=False, worker_capacity=0)
-        })
+        (gold, food, faith), hp, metadata = _RESOURCE_TILE_PROPERTIES.get(
+            tile_type, _DEFAULT_RESOURCE_TILE_PROPERTIES
+        )
         
-        return props["resources"], props["hp"], props["metadata"]
+        # Each tile gets its own models so later changes to one tile don't leak into others
+        return Resources(gold=gold, food=food, faith=faith), hp, TileMetadata(**metadata)
         
     def _get_tile_edges(self, tile_type):
         """Get appropriate edges for tile type."""
-        from .models.tile import TileType
-        
-        edge_mappings = {
-            TileType.MINE: ["mine", "mine", "mine", "mine"],
-            TileType.ORCHARD: ["orchard", "orchard", "orchard", "orchard"],
-            TileType.MONASTERY: ["monastery", "monastery", "monastery", "monastery"],
-            TileType.MARSH: ["marsh", "marsh", "marsh", "marsh"],
-            TileType.FIELD: ["field", "field", "field", "field"],
-            TileType.CITY: ["city", "city", "city", "city"],
-            TileType.BARRACKS: ["barracks", "barracks", "barracks", "barracks"],
-            TileType.WATCHTOWER: ["watchtower", "watchtower", "watchtower", "watchtower"]
-        }
-        
-        return edge_mappings.get(tile_type, ["field", "field", "field", "field"])
+        return _TILE_EDGES.get(tile_type, _DEFAULT_TILE_EDGES)
         
     def _place_dev_mode_tiles(self):
         """Place 800 tiles for dev mode testing - includes variety of all tile types."""
-        from .models.tile import Resources, TileMetadata, TileType
-        import random
         
         # Define tile distribution for dev mode (aiming for ~800 tiles total)
         tile_distribution = {
@@ -562,64 +687,38 @@ class Room:
             TileType.MARSH: 325          # Terrain obstacles
         }
         
+        # Shuffle the free cells once and hand them out in order; once they run
+        # out the remaining types get no tiles, as with the old random probing
+        free_cells = self._free_cells(0)
+        self._rng.shuffle(free_cells)
+        
+        placed_at = time.time()
         for tile_type, count in tile_distribution.items():
-            placed = 0
-            attempts = 0
-            max_attempts = count * 20  # Give plenty of attempts to place tiles
+            cells, free_cells = free_cells[:count], free_cells[count:]
             
-            while placed < count and attempts < max_attempts:
-                x = random.randint(0, self.state.game_settings.map_size - 1)
-                y = random.randint(0, self.state.game_settings.map_size - 1)
-                
-                # Don't place tiles too close to capitals or on existing tiles
-                if not self._is_position_occupied(x, y):
-                    # Get appropriate properties for this tile type
-                    resources, hp, metadata = self._get_resource_tile_properties(tile_type)
-                    
-                    # For non-resource tiles, use different properties
-                    if tile_type not in [TileType.MINE, TileType.ORCHARD, TileType.MONASTERY, TileType.MARSH]:
-                        if tile_type == TileType.FIELD:
-                            resources = Resources(gold=1, food=1, faith=0)
-                            hp = 100
-                            metadata = TileMetadata(can_train=False, worker_capacity=1)
-                        elif tile_type == TileType.CITY:
-                            resources = Resources(gold=3, food=1, faith=0)
-                            hp = 200
-                            metadata = TileMetadata(can_train=False, worker_capacity=2)
-                        elif tile_type == TileType.BARRACKS:
-                            resources = Resources(gold=0, food=0, faith=0)
-                            hp = 300
-                            metadata = TileMetadata(can_train=True, worker_capacity=0)
-                        elif tile_type == TileType.WATCHTOWER:
-                            resources = Resources(gold=0, food=0, faith=0)
-                            hp = 400
-                            metadata = TileMetadata(can_train=False, worker_capacity=0, aura_radius=2)
-                    
-                    dev_tile = Tile(
-                        id=f"{x},{y}",
-                        type=tile_type,
-                        x=x,
-                        y=y,
-                        edges=self._get_tile_edges(tile_type),
-                        hp=hp,
-                        max_hp=hp,
-                        owner=None,
-                        resources=resources,
-                        placed_at=datetime.now().timestamp(),
-                        metadata=metadata
-                    )
-                    
-                    self.state.tiles.append(dev_tile)
-                    placed += 1
-                
-                attempts += 1
+            # Look up this type's properties once; each tile still gets its own models
+            (gold, food, faith), hp, metadata = _DEV_TILE_PROPERTIES[tile_type]
+            edges = self._get_tile_edges(tile_type)
+            
+            for x, y in cells:
+                self.state.add_tile(Tile(
+                    id=f"{x},{y}",
+                    type=tile_type,
+                    x=x,
+                    y=y,
+                    edges=edges,
+                    hp=hp,
+                    max_hp=hp,
+                    owner=None,
+                    resources=Resources(gold=gold, food=food, faith=faith),
+                    placed_at=placed_at,
+                    metadata=TileMetadata(**metadata)
+                ))
         
-        print(f"Dev mode: placed {len(self.state.tiles) - 4} tiles (~800 target) (excluding capitals)")
+        logger.info("Dev mode: placed %d tiles (~800 target) (excluding capitals)", len(self.state.tiles) - 4)
         
     def _generate_tile_options(self):
         """Generate 3 random tile options for the current player."""
-        from .models.tile import TileType
-        import random
         
         # Available tile types for placement (excluding capitals)
         available_types = [
@@ -631,12 +730,60 @@ class Room:
         ]
         
         # Return 3 random options as string values (for validation consistency)
-        selected_types = random.sample(available_types, min(3, len(available_types)))
+        selected_types = self._rng.sample(available_types, min(3, len(available_types)))
         return [tile_type.value for tile_type in selected_types]
     
+    def _connection_key(self, player_index: int) -> Optional[str]:
+        """Get the connection key of the player with a game player ID, or None if they are not connected."""
+        if len(self._player_keys) != len(self.players):
+            self._player_keys = {player.id: key for key, player in self.players.items()}
+        key = self._player_keys.get(player_index)
+        return key if key in self.connections else None
+    
+    def _invalidate_active_players(self):
+        """Drop the cached active players and turn order after a join, departure or elimination."""
+        self._active_players = None
+        self._turn_order = None
+        self._next_player = None
+    
+    def _get_turn_order(self) -> List[int]:
+        """Get the IDs of non-eliminated players in turn order, without duplicates."""
+        if self._turn_order is None:
+            seen_ids = set()
+            turn_order = []
+            for p in self.state.players:
+                if not p.is_eliminated and p.id not in seen_ids:
+                    turn_order.append(p.id)
+                    seen_ids.add(p.id)
+            self._turn_order = turn_order
+        return self._turn_order
+    
+    def _get_next_players(self) -> Dict[int, int]:
+        """Map each player ID to the first non-eliminated player after it in seating order.
+        
+        Eliminated players are included so a turn can pass on from a player
+        who was knocked out while it was theirs.
+        """
+        if self._next_player is None:
+            seating = list(dict.fromkeys(p.id for p in self.state.players))
+            active = set(self._get_turn_order())
+            next_player = {}
+            # Walk the seating twice backwards so the last seats wrap around to the first;
+            # the second pass overwrites the first with the wrapped answers
+            upcoming = None
+            for player_id in reversed(seating * 2):
+                if upcoming is not None:
+                    next_player[player_id] = upcoming
+                if player_id in active:
+                    upcoming = player_id
+            self._next_player = next_player
+        return self._next_player
+    
     def get_active_players(self) -> List[Player]:
         """Get all non-eliminated players."""
-        return [player for player in self.players.values() if not player.is_eliminated]
+        if self._active_players is None:
+            self._active_players = [player for player in self.players.values() if not player.is_eliminated]
+        return self._active_players
     
     def get_player_connections(self) -> List[WebSocket]:
         """Get all active WebSocket connections."""
@@ -667,62 +814,104 @@ class Room:
     async def _game_loop(self):
         """Internal game loop running at 10 FPS."""
         try:
+            loop = asyncio.get_running_loop()
+            next_deadline = loop.time()
             last_broadcast_tick = 0
             while not self.is_empty():
+                # Rooms that are not being played have no tick work; poll slowly
+                # and without advancing the tick until the game starts or
+                # something needs broadcasting
+                state = self.state
+                if not self._state_dirty and (state is None or state.status != GameStatus.PLAYING):
+                    await asyncio.sleep(IDLE_TICK_INTERVAL)
+                    next_deadline = loop.time()
+                    continue
+                
                 # Update game state
                 await self._update_game_state()
                 
                 # Increment tick
                 self.tick += 1
                 
-                # Only broadcast state when necessary (performance optimization)
-                # Broadcast every 3 ticks (0.3 seconds) instead of every tick
-                if self.tick - last_broadcast_tick >= 3:
+                # Only broadcast state when something changed, and at most
+                # every 3 ticks (0.3 seconds). A tick that overran its slot puts
+                # the broadcast off, up to twice as long, so the simulation
+                # catches up on the missed ticks first
+                since_broadcast = self.tick - last_broadcast_tick
+                behind = loop.time() - next_deadline > TICK_INTERVAL
+                if self._state_dirty and since_broadcast >= 3 and (not behind or since_broadcast >= 6):
                     await self._broadcast_state()
                     last_broadcast_tick = self.tick
                 
-                # Wait for next tick (10 FPS = 100ms)
-                await asyncio.sleep(0.1)
+                # Wait for the next tick's deadline; time spent on this tick
+                # counts against it, so slow ticks do not push the schedule back
+                next_deadline += TICK_INTERVAL
+                now = loop.time()
+                if now - next_deadline > MAX_TICK_LAG * TICK_INTERVAL:
+                    logger.warning(
+                        "Room %s fell %.2fs behind at tick %d, skipping missed ticks",
+                        self.room_id, now - next_deadline, self.tick
+                    )
+                    next_deadline = now + TICK_INTERVAL
+                await asyncio.sleep(max(0.0, next_deadline - now))
                 
         except asyncio.CancelledError:
             pass
-        except Exception as e:
-            print(f"Error in game loop for room {self.room_id}: {e}")
+        except Exception:
+            logger.exception("Error in game loop for room %s", self.room_id)
     
     async def _update_game_state(self):
         """Update the game state for one tick."""
-        if self.state is None:
+        state = self.state
+        if state is None:
             return
             
-        now = datetime.now().timestamp()
-        self.state.last_update = now
+        # Encoded snapshots from the previous tick are stale now
+        self._serial_cache.clear()
+        
+        # Durations (training, recalls) are measured on the monotonic clock so
+        # wall clock adjustments cannot stretch or skip them
+        now = time.monotonic()
+        state.last_update = time.time()
+        state.tick_time = now
+        
+        # Nothing advances until the game is being played
+        if state.status != GameStatus.PLAYING:
+            if self.tick % 50 == 0:  # Log every 5 seconds
+                logger.debug("Game status is %s, not advancing turns", state.status)
+            return
         
         # Check for tile selection rotation every 150 ticks (15 seconds at 10 FPS)
-        if self.state.status == GameStatus.PLAYING:
-            # Special case: send initial tile offers at tick 1 to ensure all players are connected
-            if self.tick == 1:
-                logger.info(f"Tick 1: Sending initial tile offers to player {self.state.current_player}")
-                self._generate_tile_offers_for_player(self.state.current_player)
-            elif self.tick > 0 and self.tick % 150 == 0:
-                logger.info(f"Tick {self.tick}: Advancing to next player's tile selection turn")
-                self._advance_turn()
-            
-            # Update turn time remaining for UI display (counts down from 15 to 0)
-            ticks_in_current_turn = self.tick % 150
-            self.state.turn_time_remaining = max(0, 15.0 - (ticks_in_current_turn * 0.1))
-        elif self.tick % 50 == 0:  # Log every 5 seconds
-            logger.info(f"Game status is {self.state.status}, not advancing turns")
+        # Special case: send initial tile offers at tick 1 to ensure all players are connected
+        tick = self.tick
+        if tick == 1:
+            logger.info("Tick 1: Sending initial tile offers to player %s", state.current_player)
+            self._generate_tile_offers_for_player(state.current_player)
+        elif tick > 0 and tick % 150 == 0:
+            logger.info("Tick %d: Advancing to next player's tile selection turn", tick)
+            self._advance_turn()
+        
+        # Update turn time remaining for UI display (counts down from 15 to 0)
+        ticks_in_current_turn = tick % 150
+        state.turn_time_remaining = max(0, 15.0 - (ticks_in_current_turn * 0.1))
         
         # Update unit training
-        self._update_unit_training(now)
+        if self._training_heap:
+            self._update_unit_training(now)
         
-        # Update unit movements and combat
-        if self.state.units:
+        # Update unit movements and combat; units still training or dead can neither move nor fight
+        if self._has_active_units():
             # Update conquest system auras based on current tiles
-            self.conquest_system.update_auras(self.state.tiles, self.unit_system.units)
+            conquest_system = self.conquest_system
+            tile_columns = state.tile_columns  # Also brings the tile revision up to date
+            conquest_system.update_auras(state.tiles, self.unit_system.units, state.tile_revision)
             
             # Pass tiles to unit system for tile targeting in combat
-            events = self.unit_system.update_units(0.1, self.state.tiles, self.conquest_system)
+            events = self.unit_system.update_units(
+                0.1, state.tiles, conquest_system, tile_columns
+            )
+            if events and (events.get('combat_events') or events.get('movement_events')):
+                self._state_dirty = True
             
             # Handle combat events - especially tile attacks
             if events and events.get('combat_events'):
@@ -730,8 +919,10 @@ class Room:
                     if combat_event['type'] == 'tile_attack':
                         await self._handle_tile_attack_event(combat_event)
             
-            # Process movement events to sync unit system state back to game state
+            # Process movement events to sync unit system state back to game state;
+            # clients receive the moved units with the next state broadcast
             if events and events.get('movement_events'):
+                units_by_id = {unit.id: unit for unit in state.units}
                 for event in events['movement_events']:
                     # Update the unit position in game state
                     unit_id = event['unit_id']
@@ -745,205 +936,162 @@ class Room:
                         continue  # Skip unknown event types
                     
                     # Find the unit in game state and update its position
-                    for unit in self.state.units:
-                        if unit.id == unit_id:
-                            unit.position.x = new_position['x']
-                            unit.position.y = new_position['y']
-                            break
-                
-                # Broadcast unit updates if there were movement events
-                if events['movement_events']:
-                    self._broadcast_unit_update()
+                    unit = units_by_id.get(unit_id)
+                    if unit is not None:
+                        position = unit.position
+                        position.x = new_position['x']
+                        position.y = new_position['y']
         
         # Check for player elimination and victory conditions
-        eliminated_players, winner = self.conquest_system.check_elimination(list(self.state.players))
+        eliminated_players, winner = self.conquest_system.check_elimination(list(state.players))
         
         # Handle player eliminations
         for player_id in eliminated_players:
             await self._handle_player_elimination(player_id)
+        if eliminated_players:
+            self._state_dirty = True
         
         # Handle victory condition
         if winner is not None:
             await self._handle_victory(winner)
         
         # Update resource generation (every second)
-        if self.tick % 10 == 0:  # 10 ticks = 1 second at 10 FPS
+        if tick % 10 == 0:  # 10 ticks = 1 second at 10 FPS
             self._update_resources()
             
+    def _has_active_units(self) -> bool:
+        """Check whether any unit in the unit system is able to move or fight.
+        
+        Units killed in combat leave the combat system's spatial hash and
+        training units are registered in _training_units, so this only walks
+        the training registry rather than every unit.
+        """
+        positions = self.unit_system.combat_system.spatial_hash.unit_positions
+        training = sum(1 for unit_id in self._training_units if unit_id in positions)
+        return len(positions) > training
+    
+    def add_training_unit(self, unit: Unit) -> None:
+        """Add a unit that has started training to the state and track it until it is ready."""
+        self.state.units.append(unit)
+        self._track_training_unit(unit)
+    
+    def _track_training_unit(self, unit: Unit) -> None:
+        """Schedule a training unit's completion by the time its training runs out."""
+        if not unit.metadata.training_started:
+            return
+        self._training_units[unit.id] = unit
+        # training_started is a wall clock timestamp sent to clients; the
+        # deadline is kept on the monotonic clock the game loop ticks on
+        remaining = unit.metadata.training_started + unit.metadata.training_time - time.time()
+        heapq.heappush(self._training_heap, (time.monotonic() + remaining, unit.id))
+    
     def _update_unit_training(self, current_time: float):
         """Update unit training progress and complete training when ready."""
-        from .models.unit import UnitStatus
         
         units_completed = []
         
-        for unit in self.state.units:
-            if unit.status == UnitStatus.TRAINING:
-                # Check if training is complete
-                if (unit.metadata.training_started and 
-                    current_time - unit.metadata.training_started >= unit.metadata.training_time):
-                    
-                    # Complete training
-                    unit.status = UnitStatus.IDLE
-                    unit.metadata.training_started = None
-                    unit.metadata.training_time = None
-                    units_completed.append(unit)
+        # Pop only the units whose training has run out, earliest first
+        training_heap = self._training_heap
+        while training_heap and training_heap[0][0] <= current_time:
+            _, unit_id = heapq.heappop(training_heap)
+            unit = self._training_units.pop(unit_id, None)
+            if unit is None or unit.status != UnitStatus.TRAINING:
+                continue
+            
+            # Complete training
+            unit.status = UnitStatus.IDLE
+            unit.metadata.training_started = None
+            unit.metadata.training_time = None
+            units_completed.append(unit)
                     
-        # Broadcast unit training completions
+
+        # Queue training completions; they and the updated units go out with the next state broadcast
         if units_completed:
-            for unit in units_completed:
-                asyncio.create_task(self._broadcast_unit_training_complete(unit))
-            
-            # Also broadcast updated unit list to all clients
-            self._broadcast_unit_update()
-                
-    async def _broadcast_unit_training_complete(self, unit):
-        """Broadcast unit training completion to all players."""
-        import orjson
-        
-        message = {
-            "type": "unit_training_complete",
-            "payload": {
-                "unit_id": unit.id,
-                "unit_type": unit.type,
-                "position": {"x": unit.position.x, "y": unit.position.y},
-                "owner": unit.owner
-            },
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        message_str = orjson.dumps(message).decode()
-        
-        # Send to all connected players
-        disconnected = []
-        for player_id, connection in self.connections.items():
-            if connection.client_state.name != "CONNECTED":
-                disconnected.append(player_id)
-                continue
-                
-            try:
-                await connection.send_text(message_str)
-            except Exception as e:
-                print(f"Failed to send unit training complete to {player_id}: {e}")
-                disconnected.append(player_id)
+            self._state_dirty = True
+        for unit in units_completed:
+            self._pending_events.append({
+                "type": "unit_training_complete",
+                "payload": {
+                    "unit_id": unit.id,
+                    "unit_type": unit.type,
+                    "position": {"x": unit.position.x, "y": unit.position.y},
+                    "owner": unit.owner
+                }
+            })
+    
+    def mark_state_dirty(self) -> None:
+        """Flag the state as changed so the game loop sends it with the next broadcast."""
+        self._state_dirty = True
+        # Snapshots encoded earlier this tick may no longer match the state
+        self._serial_cache.clear()
+
+    def mark_unit_dirty(self, unit_id: str) -> None:
+        """Include a unit in the next unit delta broadcast."""
+        self._dirty_units.add(unit_id)
         
-        # Remove disconnected players
-        for player_id in disconnected:
-            self.remove_player(player_id)
+    def mark_tile_dirty(self, tile_id: str) -> None:
+        """Include a tile in the next tile delta broadcast."""
+        self._dirty_tiles.add(tile_id)
+    
+    def _serialize_unit(self, unit) -> Dict:
+        """Convert a unit to the client's unit format: the model fields plus flat coordinates."""
+        data = unit.model_dump()
+        data["x"] = unit.position.x
+        data["y"] = unit.position.y
+        return data
     
     def _broadcast_unit_update(self):
-        """Broadcast updated unit list to all connected clients."""
-        if not self.state or not self.state.units:
-            print(f"DEBUG: No units to broadcast. State exists: {self.state is not None}, Units count: {len(self.state.units) if self.state else 0}")
+        """Broadcast units marked dirty since the last update to all connected clients."""
+        if not self.state or not self._dirty_units:
             return
             
-        print(f"DEBUG: Broadcasting {len(self.state.units)} units")
-        
-        # Convert units to serializable format
-        units_data = []
-        for unit in self.state.units:
-            unit_data = {
-                "id": unit.id,
-                "type": unit.type.value if hasattr(unit.type, 'value') else str(unit.type),
-                "owner": unit.owner,
-                "x": unit.position.x,
-                "y": unit.position.y,
-                "position": {"x": unit.position.x, "y": unit.position.y},
-                "status": unit.status.value if hasattr(unit.status, 'value') else str(unit.status),
-                "hp": unit.hp,
-                "max_hp": unit.max_hp,
-                "attack": unit.attack,
-                "defense": unit.defense,
-                "speed": unit.speed,
-                "range": unit.range
-            }
-            units_data.append(unit_data)
+        dirty, self._dirty_units = self._dirty_units, set()
+        units_data = [self._serialize_unit(unit) for unit in self.state.units if unit.id in dirty]
+        removed = dirty.difference(unit["id"] for unit in units_data)
         
-        print(f"DEBUG: Serialized {len(units_data)} units for broadcast")
-        if units_data:
-            print(f"DEBUG: First unit data being sent: {units_data[0]}")
-        
-        # Create message payload
+        # Create message payload with only the changed units
         message = {
-            "type": "state",
+            "type": "state_delta",
             "payload": {
-                "units": units_data
+                "units": units_data,
+                "removed_units": sorted(removed)
             }
         }
         
+        message_bytes = orjson.dumps(message)
+        
         # Broadcast to all clients
-        for player_id, connection in self.connections.items():
-            try:
-                import orjson
-                message_str = orjson.dumps(message).decode()
-                asyncio.create_task(connection.send_text(message_str))
-            except Exception as e:
-                print(f"Failed to send unit update to {player_id}: {e}")
+        self._enqueue_to_all(message_bytes)
         
-        print(f"Broadcast unit update to {len(self.connections)} clients")
+        logger.debug("Broadcast %d unit changes to %d clients", len(units_data), len(self.connections))
         
     def _broadcast_tiles_update(self):
-        """Broadcast updated tiles list to all connected clients."""
-        if not self.state or not self.state.tiles:
+        """Broadcast tiles marked dirty since the last update to all connected clients."""
+        if not self.state or not self._dirty_tiles:
             return
             
-        # Convert tiles to serializable format
-        tiles_data = []
-        for tile in self.state.tiles:
-            tile_data = {
-                "id": tile.id,
-                "type": tile.type.value,
-                "x": tile.x,
-                "y": tile.y,
-                "edges": tile.edges,
-                "hp": tile.hp,
-                "max_hp": tile.max_hp,
-                "owner": tile.owner,
-                "resources": {
-                    "gold": tile.resources.gold,
-                    "food": tile.resources.food,
-                    "faith": tile.resources.faith
-                },
-                "placed_at": tile.placed_at,
-                "metadata": {
-                    "can_train": tile.metadata.can_train if tile.metadata else False,
-                    "worker_capacity": tile.metadata.worker_capacity if tile.metadata else 0
-                }
-            }
-            
-            # Add worker info if present
-            if tile.worker:
-                tile_data["worker"] = {
-                    "id": tile.worker.id,
-                    "type": tile.worker.type.value,
-                    "owner": tile.worker.owner
-                }
-            else:
-                tile_data["worker"] = None
-                
-            tiles_data.append(tile_data)
+        dirty, self._dirty_tiles = self._dirty_tiles, set()
+        tiles_by_id = self.state.tiles_by_id
+        tiles_data = [tiles_by_id[tile_id] for tile_id in dirty if tile_id in tiles_by_id]
         
-        # Create message payload
+        # Create message payload with only the changed tiles
         message = {
-            "type": "state",
+            "type": "state_delta",
             "payload": {
                 "tiles": tiles_data
             }
         }
         
+        # Tile models are handed to orjson as-is and dumped by pydantic's serializer
+        message_bytes = orjson.dumps(message, default=_encode_model)
+        
         # Broadcast to all clients
-        for player_id, connection in self.connections.items():
-            try:
-                import orjson
-                message_str = orjson.dumps(message).decode()
-                asyncio.create_task(connection.send_text(message_str))
-            except Exception as e:
-                print(f"Failed to send tiles update to {player_id}: {e}")
+        self._enqueue_to_all(message_bytes)
         
-        print(f"Broadcast tiles update to {len(self.connections)} clients")
+        logger.debug("Broadcast %d tile changes to %d clients", len(tiles_data), len(self.connections))
     
     async def _handle_tile_attack_event(self, combat_event: Dict):
         """Handle tile attack events from the combat system."""
-        from .models.tile import TileType
         
         target_tile_id = combat_event['target_id']
         damage = combat_event['damage']
@@ -951,11 +1099,7 @@ class Room:
         tile_destroyed = combat_event.get('target_died', False)
         
         # Find the target tile
-        target_tile = None
-        for tile in self.state.tiles:
-            if tile.id == target_tile_id:
-                target_tile = tile
-                break
+        target_tile = self.state.tiles_by_id.get(target_tile_id)
         
         if not target_tile:
             return
@@ -963,11 +1107,7 @@ class Room:
         # If this is a capital city, update player's capital HP BEFORE setting owner to None
         if target_tile.type == TileType.CAPITAL_CITY and target_tile.owner is not None:
             # Find the player who owns this capital
-            target_player = None
-            for player in self.state.players:
-                if player.id == target_tile.owner:
-                    target_player = player
-                    break
+            target_player = self.state.players_by_id.get(target_tile.owner)
             
             if target_player:
                 # Calculate capital HP ratio and apply to player
@@ -979,7 +1119,7 @@ class Room:
         
         # If tile is destroyed, make it neutral (no owner)
         if tile_destroyed:
-            target_tile.owner = None
+            self.state.set_tile_owner(target_tile, None)
         
         # Broadcast tile attack event to all players
         await self._broadcast_message({
@@ -997,18 +1137,12 @@ class Room:
             }
         })
         
-        logger.info(f"Automatic tile attack: unit {attacker_id} attacked tile {target_tile_id} for {damage} damage")
+        logger.debug("Automatic tile attack: unit %s attacked tile %s for %s damage", attacker_id, target_tile_id, damage)
     
     async def _handle_player_elimination(self, player_id: int):
         """Handle player elimination from the game."""
-        import orjson
-        
         # Find the player
-        player = None
-        for p in self.state.players:
-            if p.id == player_id:
-                player = p
-                break
+        player = self.state.players_by_id.get(player_id)
         
         if not player:
             return
@@ -1016,12 +1150,11 @@ class Room:
         # Mark player as eliminated
         player.is_eliminated = True
         player.capital_city = None  # Remove capital city
+        self._invalidate_active_players()
         
-        # Remove player from turn order if they're in it
-        if player_id in [p.id for p in self.state.players if not p.is_eliminated]:
-            # Update current player if eliminated player was current
-            if self.state.current_player == player_id:
-                self._advance_turn()
+        # Pass the turn on if the eliminated player had it
+        if self.state.current_player == player_id:
+            self._advance_turn()
         
         # Broadcast elimination event
         await self._broadcast_message({
@@ -1033,18 +1166,12 @@ class Room:
             }
         })
         
-        logger.info(f"Player {player_id} ({player.name}) eliminated from room {self.room_id}")
+        logger.info("Player %s (%s) eliminated from room %s", player_id, player.name, self.room_id)
     
     async def _handle_victory(self, winner_id: int):
         """Handle victory condition when only one player remains."""
-        import orjson
-        
         # Find the winner
-        winner = None
-        for player in self.state.players:
-            if player.id == winner_id:
-                winner = player
-                break
+        winner = self.state.players_by_id.get(winner_id)
         
         if not winner:
             return
@@ -1067,52 +1194,41 @@ class Room:
         if self.loop_task:
             self.loop_task.cancel()
         
-        logger.info(f"Game finished in room {self.room_id}. Winner: {winner_id} ({winner.name})")
+        logger.info("Game finished in room %s. Winner: %s (%s)", self.room_id, winner_id, winner.name)
         
     def _advance_turn(self, tile_placed=False):
         """Advance to the next player's turn, skipping eliminated players."""
         if not self.state.players:
             return
         
-        logger.info(f"Advancing turn from player {self.state.current_player}")
+        logger.debug("Advancing turn from player %s", self.state.current_player)
         
-        # Get active (non-eliminated) players - ensure no duplicates by ID
-        seen_ids = set()
-        active_players = []
-        for p in self.state.players:
-            if not p.is_eliminated and p.id not in seen_ids:
-                active_players.append(p)
-                seen_ids.add(p.id)
+        turn_order = self._get_turn_order()
         
-        if len(active_players) <= 1:
+        if len(turn_order) <= 1:
             # Only one or no players left, game should end
             return
         
-        # Find current player
-        current_player = None
-        current_player_index = -1
-        for i, player in enumerate(active_players):
-            if player.id == self.state.current_player:
-                current_player = player
-                current_player_index = i
-                break
+        # Look up the next active player after the current one
+        previous_player = self.state.current_player
+        next_players = self._get_next_players()
         
         # Log current state for debugging
-        logger.info(f"Current player index: {current_player_index}, Active players: {[p.id for p in active_players]}")
+        logger.debug("Current player: %s, Active players: %s", previous_player, turn_order)
         
-        # If current player not found (shouldn't happen), default to 0
-        if current_player_index == -1:
-            logger.warning(f"Current player {self.state.current_player} not found in active players, defaulting to first player")
-            current_player_index = 0
+        # If current player not found (shouldn't happen), default to the first player
+        if previous_player not in next_players:
+            logger.warning("Current player %s not found in players, defaulting to first player", previous_player)
+            previous_player = turn_order[0]
         
         # Move to next active player
-        next_player_index = (current_player_index + 1) % len(active_players)
-        self.state.current_player = active_players[next_player_index].id
+        self.state.current_player = next_players[previous_player]
         
-        logger.info(f"Turn advanced from player index {current_player_index} to {next_player_index} (player {self.state.current_player})")
+        logger.info("Turn advanced from player %s to player %s", previous_player, self.state.current_player)
         
         # Increment turn number
         self.state.turn_number += 1
+        self._state_dirty = True
         
         # Generate new tile offers for the next player
         self._generate_tile_offers_for_player(self.state.current_player)
@@ -1122,8 +1238,6 @@ class Room:
         
     def _generate_tile_offers_for_player(self, player_id: int):
         """Generate 3 tile offers for the specified player."""
-        from .models.tile import TileType
-        import random
         
         # Available tile types for placement
         available_types = [
@@ -1139,7 +1253,7 @@ class Room:
         tile_types_for_validation = []
         
         for i in range(3):
-            tile_type = random.choice(available_types)
+            tile_type = self._rng.choice(available_types)
             tile_offer = {
                 "id": f"offer_{self.state.turn_number}_{i}",
                 "type": tile_type.value,
@@ -1156,7 +1270,7 @@ class Room:
         # Send tile offers to the active player
         self._send_tile_offers_to_player(player_id, tile_offers)
         
-        print(f"Generated tile offers for player {player_id}: {tile_types_for_validation}")
+        logger.debug("Generated tile offers for player %s: %s", player_id, tile_types_for_validation)
         
     def _send_tile_offers_to_player(self, player_id: int, tile_offers: list):
         """Send tile offers only to the active player."""
@@ -1173,82 +1287,45 @@ class Room:
         }
         
         # Send only to the active player
-        logger.info(f"Sending tile offers to player {player_id}. Connections: {list(self.connections.keys())}")
+        pid = self._connection_key(player_id)
+        if pid is None:
+            logger.warning("Could not find connection for player %s", player_id)
+            return
         
-        for pid, connection in self.connections.items():
-            player = self.players.get(pid)
-            logger.info(f"Checking connection {pid}: player exists={player is not None}, player.id={player.id if player else 'None'}")
-            
-            if player and player.id == player_id:
-                # This is the active player - send tile offers
-                try:
-                    import orjson
-                    message_str = orjson.dumps(message).decode()
-                    asyncio.create_task(connection.send_text(message_str))
-                    logger.info(f"Successfully sent tile offers to player {player_id} (connection {pid})")
-                except Exception as e:
-                    logger.error(f"Failed to send tile offers to {pid}: {e}")
-                break
-        else:
-            logger.warning(f"Could not find connection for player {player_id}")
+        try:
+            self._enqueue_message(pid, orjson.dumps(message))
+            logger.debug("Sent tile offers to player %s (connection %s)", player_id, pid)
+        except Exception:
+            logger.exception("Failed to send tile offers to %s", pid)
             
     def _broadcast_turn_change(self):
         """Broadcast turn change to all players."""
         if not self.state:
             return
             
-        message = {
+        message_bytes = self._tick_message("turn", lambda: {
             "type": "state",
             "payload": {
                 "current_player": self.state.current_player,
                 "turn_number": self.state.turn_number,
                 "turn_time_remaining": self.state.turn_time_remaining
             }
-        }
+        })
         
         # Broadcast to all clients
-        for player_id, connection in self.connections.items():
-            try:
-                import orjson
-                message_str = orjson.dumps(message).decode()
-                asyncio.create_task(connection.send_text(message_str))
-            except Exception as e:
-                print(f"Failed to broadcast turn change to {player_id}: {e}")
+        self._enqueue_to_all(message_bytes, coalesce_key="turn")
                 
     def _get_tile_resource_generation(self, tile_type):
         """Get resource generation for a tile type."""
-        from .models.tile import TileType
-        
-        resource_generation = {
-            TileType.CITY: {"gold": 30, "food": 30, "faith": 0},
-            TileType.FIELD: {"gold": 10, "food": 10, "faith": 0},
-            TileType.MONASTERY: {"gold": 0, "food": 0, "faith": 50},
-            TileType.BARRACKS: {"gold": 0, "food": 0, "faith": 0},
-            TileType.WATCHTOWER: {"gold": 0, "food": 0, "faith": 0}
-        }
-        
-        return resource_generation.get(tile_type, {"gold": 0, "food": 0, "faith": 0})
+        return _TILE_RESOURCE_GENERATION.get(tile_type, _NO_GENERATION)
         
     def _get_tile_hp(self, tile_type):
         """Get HP for a tile type."""
-        from .models.tile import TileType
-        
-        tile_hp = {
-            TileType.CITY: 60,
-            TileType.FIELD: 40,
-            TileType.MONASTERY: 80,
-            TileType.BARRACKS: 100,
-            TileType.WATCHTOWER: 120
-        }
-        
-        return tile_hp.get(tile_type, 40)
+        return _TILE_HP.get(tile_type, 40)
         
     def _can_tile_train(self, tile_type):
         """Check if a tile type can train units."""
-        from .models.tile import TileType
-        
-        training_tiles = [TileType.CITY, TileType.BARRACKS, TileType.CAPITAL_CITY]
-        return tile_type in training_tiles
+        return tile_type in _TRAINING_TILES
     
     def _update_resources(self):
         """Update resources for all players based on tiles and workers."""
@@ -1264,21 +1341,25 @@ class Room:
         # Calculate resource generation using follower system
         generation_rates = self.follower_system.calculate_resource_generation(self.state)
         
-        # Update resources for each player
-        for player in self.state.players:
+        # Apply generation with caps for every player in one array operation
+        players = self.state.players
+        current = np.array(
+            [[player.resources.get(column, 0) for column in RESOURCE_COLUMNS] for player in players],
+            np.int64
+        ).reshape(len(players), len(RESOURCE_COLUMNS))
+        new_amounts = np.minimum(current + generation_rates, RESOURCE_CAP)
+        
+        # Write back to each player
+        for player, new_row, row in zip(players, new_amounts.tolist(), generation_rates.tolist()):
             if player.is_eliminated:
                 continue
                 
-            generation = generation_rates.get(player.id, {"gold": 0, "food": 0, "faith": 0})
-            
-            # Apply generation with caps
-            for resource_type, amount in generation.items():
-                current = player.resources.get(resource_type, 0)
-                new_amount = min(current + amount, 500)  # Cap at 500
-                player.resources[resource_type] = new_amount
+            player.resources.update(zip(RESOURCE_COLUMNS, new_row))
             
             # Log resource update
-            print(f"Player {player.id} resources updated: {player.resources} (gen: {generation})")
+            logger.debug("Player %d resources updated: %s (gen: %s)", player.id, player.resources, row)
+        
+        self._state_dirty = True
         
         # Broadcast resource updates to all clients
         self._broadcast_resource_update()
@@ -1297,212 +1378,212 @@ class Room:
             "timestamp": datetime.now().timestamp()
         }
         
+        message_bytes = orjson.dumps(message)
+        
         # Send to all connected players
-        for player_id, connection in self.connections.items():
-            try:
-                import orjson
-                message_str = orjson.dumps(message).decode()
-                asyncio.create_task(connection.send_text(message_str))
-            except Exception as e:
-                print(f"Failed to send follower recall complete to {player_id}: {e}")
+        self._enqueue_to_all(message_bytes)
     
     def _broadcast_resource_update(self):
-        """Broadcast resource updates to all connected clients."""
+        """Broadcast the resources of players whose resources changed since the last update."""
         if not self.state or not self.state.players:
             return
             
-        # Prepare resource data for all players
-        resource_data = {}
+        sent = self._sent_resources
+        changed = {}
         for player in self.state.players:
-            resource_data[str(player.id)] = player.resources
+            resources = player.resources
+            current = tuple(resources.get(column, 0) for column in RESOURCE_COLUMNS)
+            if sent.get(player.id) != current:
+                sent[player.id] = current
+                changed[str(player.id)] = resources
+        if not changed:
+            return
         
-        # Create message payload
-        message = {
+        message_bytes = orjson.dumps({
             "type": "state",
             "payload": {
-                "resources": resource_data
+                "resources": changed
             }
-        }
+        })
         
-        # Broadcast to all clients in the room
-        for player_id, connection in self.connections.items():
-            try:
-                import orjson
-                message_str = orjson.dumps(message).decode()
-                asyncio.create_task(connection.send_text(message_str))
-            except Exception as e:
-                print(f"Failed to send resource update to {player_id}: {e}")
+        # Each update only carries changes, so updates are queued in order rather than coalesced
+        self._enqueue_to_all(message_bytes)
         
-        print(f"Broadcast resource update to {len(self.connections)} clients")
+        logger.debug("Broadcast resource update for %d players to %d clients", len(changed), len(self.connections))
     
-    def _calculate_player_resource_generation(self, player_id: int) -> dict:
-        """Calculate resource generation for a specific player based on their tiles."""
-        total_resources = {"gold": 0, "food": 0, "faith": 0}
-        
-        # Get all tiles owned by this player
-        player_tiles = [tile for tile in self.state.tiles if tile.owner == player_id]
-        
-        # Group connected tiles by type for additive resource generation
-        visited_tiles = set()
-        
-        for tile in player_tiles:
-            if tile.id in visited_tiles:
-                continue
-                
-            # Find connected component of same type
-            connected_tiles = self._find_connected_tiles_of_type(tile, player_tiles, visited_tiles)
-            
-            # Calculate resources for this connected component
-            component_resources = self._calculate_component_resources(connected_tiles)
-            
-            # Add to total resources
-            total_resources["gold"] += component_resources["gold"]
-            total_resources["food"] += component_resources["food"]
-            total_resources["faith"] += component_resources["faith"]
-            
-        return total_resources
-        
-    def _find_connected_tiles_of_type(self, start_tile, player_tiles, visited_tiles):
-        """Find all tiles of the same type connected to the start tile."""
-        from .models.tile import TileType
-        
-        connected = []
-        queue = [start_tile]
-        component_visited = set()
-        
-        while queue:
-            current = queue.pop(0)
-            
-            if current.id in component_visited:
-                continue
-                
-            component_visited.add(current.id)
-            visited_tiles.add(current.id)
-            connected.append(current)
-            
-            # Find adjacent tiles of the same type
-            for tile in player_tiles:
-                if (tile.id not in component_visited and 
-                    tile.type == current.type and
-                    self._are_tiles_adjacent(current, tile)):
-                    queue.append(tile)
-                    
-        return connected
-        
-    def _are_tiles_adjacent(self, tile1, tile2):
-        """Check if two tiles are adjacent (orthogonally connected)."""
-        dx = abs(tile1.x - tile2.x)
-        dy = abs(tile1.y - tile2.y)
-        return (dx == 1 and dy == 0) or (dx == 0 and dy == 1)
-        
-    def _calculate_component_resources(self, connected_tiles):
-        """Calculate resources for a connected component of tiles."""
-        component_resources = {"gold": 0, "food": 0, "faith": 0}
-        has_worker = False
-        
-        # Check if any tile in the component has a worker
-        for tile in connected_tiles:
-            if tile.worker is not None:
-                has_worker = True
-                break
-                
-        # Only generate resources if component has a worker (except for resource tiles)
-        if has_worker or self._is_resource_tile(connected_tiles[0]):
-            for tile in connected_tiles:
-                # Base resource generation from tile
-                component_resources["gold"] += tile.resources.gold
-                component_resources["food"] += tile.resources.food
-                component_resources["faith"] += tile.resources.faith
-                
-                # Additional bonus from worker if present
-                if tile.worker is not None:
-                    worker_bonus = self._get_worker_bonus(tile.worker.type)
-                    component_resources["gold"] += worker_bonus["gold"]
-                    component_resources["food"] += worker_bonus["food"]
-                    component_resources["faith"] += worker_bonus["faith"]
-                    
-        return component_resources
-        
     def _is_resource_tile(self, tile):
         """Check if a tile is a resource tile that doesn't need workers."""
-        from .models.tile import TileType
-        
-        resource_tiles = [TileType.MINE, TileType.ORCHARD]
-        return tile.type in resource_tiles
-        
-    def _get_worker_bonus(self, worker_type):
-        """Get resource bonus provided by a worker type."""
-        from .models.tile import WorkerType
+        return tile.type in _RESOURCE_TILE_TYPES
         
-        worker_bonuses = {
-            WorkerType.MAGISTRATE: {"gold": 2, "food": 0, "faith": 0},
-            WorkerType.FARMER: {"gold": 0, "food": 3, "faith": 0},
-            WorkerType.MONK: {"gold": 0, "food": 0, "faith": 2},
-            WorkerType.SCOUT: {"gold": 1, "food": 1, "faith": 0}
-        }
-        
-        return worker_bonuses.get(worker_type, {"gold": 0, "food": 0, "faith": 0})
-    
     async def _broadcast_state(self):
-        """Broadcast current game state to all connected players."""
+        """Broadcast the game state, with any events queued since the last broadcast, to all connected players.
+        
+        Every KEYFRAME_INTERVAL ticks the full state is sent; in between only
+        the changes since the previous broadcast go out as a state_delta.
+        Frames are queued on each client's outbox and written by its writer task.
+        """
+        pending_events, self._pending_events = self._pending_events, []
+        self._state_dirty = False
+        # A full state update supersedes any pending deltas
+        self._dirty_units.clear()
+        self._dirty_tiles.clear()
         if not self.connections or self.state is None:
             return
             
+        # Serialize the state once with its compiled serializer; the parsed copy
+        # is what the next broadcast diffs against
+        state_json = _model_json(self.state)
+        snapshot = orjson.loads(state_json)
+        previous, self._last_sent = self._last_sent, snapshot
+        if previous is None or self.tick - self._last_keyframe_tick >= KEYFRAME_INTERVAL:
+            self._last_keyframe_tick = self.tick
+            message_type = "state"
+            if ormsgpack is None:
+                # Embed the serializer's bytes as they are, splicing in the tick events
+                if pending_events:
+                    state_json = b"".join((state_json[:-1], b',"tickEvents":', orjson.dumps(pending_events), b"}"))
+                payload = orjson.Fragment(state_json)
+            else:
+                payload = dict(snapshot)
+        else:
+            message_type, payload = "state_delta", _state_delta(previous, snapshot)
+        if pending_events and not isinstance(payload, orjson.Fragment):
+            payload["tickEvents"] = pending_events
+        
         message = {
-            "type": "state",
-            "payload": self.state.model_dump(),
+            "type": message_type,
+            "payload": payload,
             "timestamp": datetime.now().isoformat(),
             "tick": self.tick
         }
         
-        import orjson
-        message_str = orjson.dumps(message).decode()
+        # Queue rather than await the sends so slow sockets never hold up the game loop
+        self._enqueue_to_all(_compress_frame(_pack_state(message)))
+
+    def _tick_message(self, kind: str, build: Callable[[], Dict]) -> bytes:
+        """Encode a snapshot message once per tick.
+        
+        Repeated broadcasts of the same kind within a tick reuse the bytes
+        instead of rebuilding and re-encoding the payload.
+        """
+        key = (self.tick, kind)
+        message_bytes = self._serial_cache.get(key)
+        if message_bytes is None:
+            message_bytes = self._serial_cache[key] = orjson.dumps(build())
+        return message_bytes
+
+    def _enqueue_message(self, player_id: str, message_bytes: bytes, coalesce_key: Optional[str] = None):
+        """Queue an encoded message for a client without waiting for the send.
+        
+        Each client gets a bounded queue drained by its own writer task; when a
+        slow client's queue is full the oldest message is dropped. Messages
+        given a coalesce_key are full snapshots: one still waiting in the queue
+        is replaced by the newer one, keeping its place in line.
+        """
+        outbox = self._outboxes.get(player_id)
+        if outbox is None:
+            outbox = self._outboxes[player_id] = asyncio.Queue(maxsize=OUTBOX_SIZE)
+            pending = self._coalesced[player_id] = {}
+            self._writers[player_id] = asyncio.create_task(self._write_outbox(player_id, outbox, pending))
+        else:
+            pending = self._coalesced[player_id]
+        
+        item = message_bytes
+        if coalesce_key is not None:
+            queued = coalesce_key in pending
+            pending[coalesce_key] = message_bytes
+            if queued:
+                return
+            item = coalesce_key
+        
+        if outbox.full():
+            dropped = outbox.get_nowait()
+            if isinstance(dropped, str):
+                pending.pop(dropped, None)
+            # The dropped message may have been a state or resource delta, so
+            # resync everyone with full updates on the next broadcasts
+            self._last_sent = None
+            self._sent_resources.clear()
+            logger.warning("Outbox full for %s; dropped oldest message", player_id)
+        outbox.put_nowait(item)
+    
+    async def _write_outbox(self, player_id: str, outbox: asyncio.Queue, pending: Dict[str, bytes]):
+        """Send queued messages to a client in order; a failed send disconnects the player."""
+        while True:
+            item = await outbox.get()
+            message_bytes = pending.pop(item) if isinstance(item, str) else item
+            # Look the connection up per message so a reconnected client keeps its queue
+            connection = self.connections.get(player_id)
+            if connection is None:
+                continue
+            try:
+                await connection.send_bytes(message_bytes)
+            except Exception as e:
+                logger.warning("Failed to send to player %s: %s", player_id, e)
+                break
+        
+        self._outboxes.pop(player_id, None)
+        self._writers.pop(player_id, None)
+        self._coalesced.pop(player_id, None)
+        # Drop the dead socket now rather than on the next broadcast, unless
+        # the player has already reconnected on a new one; they stay in the game
+        if self.connections.get(player_id) is connection:
+            self.disconnect_player(player_id)
+    
+    def _enqueue_to_all(self, message_bytes: bytes, coalesce_key: Optional[str] = None):
+        """Queue an encoded message for every connected client."""
+        enqueue = self._enqueue_message
+        for player_id in self.connections:
+            enqueue(player_id, message_bytes, coalesce_key)
+    
+    def _close_outbox(self, player_id: str):
+        """Stop a client's writer task and discard its queued messages."""
+        self._outboxes.pop(player_id, None)
+        self._coalesced.pop(player_id, None)
+        writer = self._writers.pop(player_id, None)
+        if writer is not None and not writer.done():
+            writer.cancel()
+
+    async def _send_to_all(self, message_bytes: bytes):
+        """Send an encoded message to all connected players concurrently, dropping any that fail.
+        
+        Messages go out as binary frames of UTF-8 JSON, so the payload is encoded
+        once for the whole room rather than once per client. Large messages are
+        also compressed once here; per-message deflate is turned off on the
+        server so each connection does not compress them again.
+        """
+        message_bytes = _compress_frame(message_bytes)
         
-        # Send to all connected players
         disconnected = []
+        live = []
         for player_id, connection in self.connections.items():
             # Check if connection is still open before sending
             if connection.client_state.name != "CONNECTED":
-                print(f"Skipping broadcast to {player_id} - connection closed")
+                logger.debug("Skipping broadcast to %s - connection closed", player_id)
                 disconnected.append(player_id)
-                continue
-                
-            try:
-                await connection.send_text(message_str)
-            except Exception as e:
-                print(f"Failed to send to player {player_id}: {e}")
+            else:
+                live.append((player_id, connection))
+        
+        # One slow client no longer holds up the others
+        results = await asyncio.gather(
+            *(connection.send_bytes(message_bytes) for _, connection in live),
+            return_exceptions=True
+        )
+        for (player_id, _), result in zip(live, results):
+            if isinstance(result, Exception):
+                logger.warning("Failed to send to player %s: %s", player_id, result)
                 disconnected.append(player_id)
         
-        # Remove disconnected players
+        # Drop disconnected connections; the players can still reconnect
         for player_id in disconnected:
-            self.remove_player(player_id)
+            self.disconnect_player(player_id)
 
     async def _broadcast_message(self, message):
         """Broadcast a custom message to all connected players."""
         if not self.connections:
             return
             
-        import orjson
-        message_str = orjson.dumps(message).decode()
-        
-        # Send to all connected players
-        disconnected = []
-        for player_id, connection in self.connections.items():
-            # Check if connection is still open before sending
-            if connection.client_state.name != "CONNECTED":
-                print(f"Skipping broadcast to {player_id} - connection closed")
-                disconnected.append(player_id)
-                continue
-                
-            try:
-                await connection.send_text(message_str)
-            except Exception as e:
-                print(f"Failed to send to player {player_id}: {e}")
-                disconnected.append(player_id)
-        
-        # Remove disconnected players
-        for player_id in disconnected:
-            self.remove_player(player_id)
+        await self._send_to_all(orjson.dumps(message))
 
 
 class RoomManager:
@@ -1562,13 +1643,13 @@ class RoomManager:
                         rooms_to_remove.append(room_id)
                 
                 for room_id in rooms_to_remove:
-                    print(f"Cleaning up inactive room: {room_id}")
+                    logger.info("Cleaning up inactive room: %s", room_id)
                     self.remove_room(room_id)
                     
         except asyncio.CancelledError:
             pass
-        except Exception as e:
-            print(f"Error in cleanup loop: {e}")
+        except Exception:
+            logger.exception("Error in cleanup loop")
 
 
 # Global room manager instance
@@ -12,11 +12,14 @@ import uvicorn
 import logging
 from threading import Lock
 import time
+import random
 
 from .game_room import room_manager, Room
 from .models.websocket_message import WebSocketMessage, MessageType
-from .models.tile import Tile, TileType
-from .models.unit import Unit, UnitType, Position, UnitStatus
+from .models.tile import Tile, TileType, Resources, TileMetadata
+from .models.unit import Unit, UnitType, UnitCost, Position, UnitStatus
+from .models.follower import FollowerType
+from .models.tech_tree import TechLevel
 from .pathfinding import Pathfinder
 
 # Configure logging
@@ -44,7 +47,6 @@ app.add_middleware(
 # Helper functions
 def generate_tile_options(available_tiles: List) -> List[str]:
     """Generate 3 random tile options from available tiles."""
-    import random
     
     # Get all tile types that still have count > 0
     available_types = [tile.type for tile in available_tiles if tile.count > 0]
@@ -64,7 +66,6 @@ def find_player_by_name(players: List, name: str):
 
 def get_unit_cost(unit_type: UnitType):
     """Get the cost to train a unit type."""
-    from .models.unit import UnitCost
     
     costs = {
         UnitType.INFANTRY: UnitCost(gold=50, food=25, faith=0),
@@ -86,7 +87,6 @@ def get_unit_training_time(unit_type: UnitType) -> float:
 
 def get_worker_cost(worker_type):
     """Get the cost to place a worker type."""
-    from .models.unit import UnitCost
     from .models.tile import WorkerType
     
     costs = {
@@ -127,7 +127,7 @@ async def send_error_response(websocket: WebSocket, message: str, error_code: st
             },
             "timestamp": datetime.now().isoformat()
         }
-        await websocket.send_text(orjson.dumps(error_response).decode())
+        await websocket.send_bytes(orjson.dumps(error_response))
     except Exception as e:
         logger.error(f"Failed to send error response: {e}")
 
@@ -246,11 +246,11 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str, player_id: str)
     
     # Add player to room
     if not room.add_player(player_id, websocket):
-        await websocket.send_text(orjson.dumps({
+        await websocket.send_bytes(orjson.dumps({
             "type": "error",
             "payload": {"message": "Room is full"},
             "timestamp": datetime.now().isoformat()
-        }).decode())
+        }))
         await websocket.close()
         return
     
@@ -266,7 +266,7 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str, player_id: str)
                 break
         
         # Send player identity first
-        await websocket.send_text(orjson.dumps({
+        await websocket.send_bytes(orjson.dumps({
             "type": "player_identity",
             "payload": {
                 "player_id": player_numeric_id,
@@ -274,15 +274,15 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str, player_id: str)
                 "room_id": room_id
             },
             "timestamp": datetime.now().isoformat()
-        }).decode())
+        }))
         
         # Send initial game state
         initial_payload = room.state.model_dump() if room.state else {}
-        await websocket.send_text(orjson.dumps({
+        await websocket.send_bytes(orjson.dumps({
             "type": "game_state",
             "payload": initial_payload,
             "timestamp": datetime.now().isoformat()
-        }).decode())
+        }))
         
         # If it's this player's turn and tile offers exist, send them the tile offers
         if room.state and player_numeric_id is not None and room.state.current_player == player_numeric_id:
@@ -304,7 +304,11 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str, player_id: str)
                     logger.info(f"WebSocket for player {player_id} is no longer connected")
                     break
                 
-                data = await websocket.receive_text()
+                # Accept both text and binary frames; orjson parses either directly
+                frame = await websocket.receive()
+                if frame["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(frame.get("code", 1000))
+                data = frame.get("bytes") or frame.get("text") or ""
                 
                 # Validate message size (prevent DoS attacks)
                 if len(data) > 10000:  # 10KB limit
@@ -338,18 +342,23 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str, player_id: str)
             
     except WebSocketDisconnect:
         logger.info(f"Player {player_id} disconnected from room {room_id}")
-        room.remove_player(player_id)
-            
-        # Notify other players
-        await broadcast_to_others(room, player_id, {
-            "type": "player_disconnected",
-            "payload": {"player_id": player_id, "player_count": len(room.get_active_players())},
-            "timestamp": datetime.now().isoformat()
-        })
+    finally:
+        # Drop the socket as soon as its receive loop ends, however it ended, so
+        # broadcasts never pay for a dead connection; skip if a reconnect replaced it.
+        # The player stays in the game and can reconnect
+        if room.connections.get(player_id) is websocket:
+            room.disconnect_player(player_id)
+                
+            # Notify other players
+            await broadcast_to_others(room, player_id, {
+                "type": "player_disconnected",
+                "payload": {"player_id": player_id, "player_count": len(room.get_active_players())},
+                "timestamp": datetime.now().isoformat()
+            })
 
-        # Clean up empty room
-        if room.is_empty():
-            room.stop_game_loop()
+            # Clean up empty room
+            if room.is_empty():
+                room.stop_game_loop()
 
 async def handle_message(room: Room, player_id: str, message: dict, websocket: WebSocket):
     """Handle incoming WebSocket messages"""
@@ -390,38 +399,26 @@ async def handle_message(room: Room, player_id: str, message: dict, websocket: W
         logger.debug(f"Handling message type {message_type} from player {player_id} in room {room.room_id}")
         
         if message_type == "cmd":
-            action = payload.get("action")
-            if not action:
-                await send_error_response(websocket, "Missing action in command", "MISSING_ACTION")
+            await handle_command(room, player_id, payload, websocket)
+        
+        elif message_type == "cmd_batch":
+            # Several commands packed into one frame; each entry is a regular "cmd" message
+            commands = message.get("cmds")
+            if not isinstance(commands, list):
+                await send_error_response(websocket, "Invalid command batch: expected list of commands", "INVALID_FORMAT")
                 return
             
-            data = payload.get("data", {})
-            
-            # Command routing with better error handling
-            command_handlers = {
-                "placeTile": handle_place_tile,
-                "moveUnit": handle_move_unit,
-                "trainUnit": handle_train_unit,
-                "placeFollower": handle_place_follower,
-                "recallFollower": handle_recall_follower,
-                "raidTile": handle_raid_tile,
-                "attackTile": handle_attack_tile,
-                "advanceTechLevel": handle_advance_tech_level,
-                "purchaseTechUpgrade": handle_purchase_tech_upgrade,
-                "useSpecialAbility": handle_use_special_ability
-            }
-            
-            handler = command_handlers.get(action)
-            if handler:
-                await handler(room, player_id, data, websocket)
-            else:
-                await send_error_response(websocket, f"Unknown action: {action}", "UNKNOWN_ACTION")
+            for command in commands:
+                if not isinstance(command, dict) or command.get("type") != "cmd":
+                    await send_error_response(websocket, "Invalid command in batch", "INVALID_FORMAT")
+                    continue
+                await handle_command(room, player_id, command.get("payload", {}), websocket)
         
         elif message_type == "ping":
-            await websocket.send_text(orjson.dumps({
+            await websocket.send_bytes(orjson.dumps({
                 "type": "pong",
                 "timestamp": datetime.now().isoformat()
-            }).decode())
+            }))
         
         else:
             await send_error_response(websocket, f"Unknown message type: {message_type}", "UNKNOWN_MESSAGE_TYPE")
@@ -430,6 +427,36 @@ async def handle_message(room: Room, player_id: str, message: dict, websocket: W
         logger.error(f"Unexpected error handling message from {player_id}: {e}")
         await send_error_response(websocket, "Internal server error", "INTERNAL_ERROR")
 
+async def handle_command(room: Room, player_id: str, payload: dict, websocket: WebSocket):
+    """Route a single command payload to its action handler"""
+    action = payload.get("action")
+    if not action:
+        await send_error_response(websocket, "Missing action in command", "MISSING_ACTION")
+        return
+    
+    data = payload.get("data", {})
+    
+    # Command routing with better error handling
+    command_handlers = {
+        "placeTile": handle_place_tile,
+        "moveUnit": handle_move_unit,
+        "trainUnit": handle_train_unit,
+        "placeFollower": handle_place_follower,
+        "recallFollower": handle_recall_follower,
+        "raidTile": handle_raid_tile,
+        "attackTile": handle_attack_tile,
+        "advanceTechLevel": handle_advance_tech_level,
+        "purchaseTechUpgrade": handle_purchase_tech_upgrade,
+        "useSpecialAbility": handle_use_special_ability
+    }
+    
+    handler = command_handlers.get(action)
+    if handler:
+        # Handlers mark the room dirty themselves, only when the command changed state
+        await handler(room, player_id, data, websocket)
+    else:
+        await send_error_response(websocket, f"Unknown action: {action}", "UNKNOWN_ACTION")
+
 async def handle_place_tile(room: Room, player_id: str, data: dict, websocket: WebSocket):
     """Handle tile placement command from a player - TURN-BASED according to GDD"""
     try:
@@ -466,17 +493,16 @@ async def handle_place_tile(room: Room, player_id: str, data: dict, websocket: W
         is_current_turn = (room.state.current_player == current_player.id)
 
         # Check if position is already occupied
-        if any(tile.x == x and tile.y == y for tile in room.state.tiles):
+        if (x, y) in room.state.tiles_by_coord:
             await send_error_response(websocket, "Position already occupied", "POSITION_OCCUPIED")
             return
 
         # Check adjacency (must touch at least one tile owned by the player)
-        if not _has_adjacent_player_tile(x, y, room.state.tiles, current_player.id):
+        if not _has_adjacent_player_tile(x, y, room.state, current_player.id):
             await send_error_response(websocket, "Tile must be adjacent to your territory", "NOT_ADJACENT_TO_TERRITORY")
             return
 
         # Validate tile type is a valid game tile type
-        from .models.tile import TileType
         try:
             tile_type_enum = TileType(tile_type)
         except ValueError:
@@ -503,8 +529,9 @@ async def handle_place_tile(room: Room, player_id: str, data: dict, websocket: W
         )
 
         # Add to game state
-        room.state.tiles.append(new_tile)
+        room.state.add_tile(new_tile)
         room.state.last_update = datetime.now().timestamp()
+        room.mark_state_dirty()
 
         # Update current player's stats
         current_player.stats.tiles_placed += 1
@@ -546,7 +573,8 @@ async def handle_place_tile(room: Room, player_id: str, data: dict, websocket: W
             "timestamp": datetime.now().isoformat()
         })
         
-        # Broadcast updated tiles to all clients
+        # Broadcast the placed tile to all clients
+        room.mark_tile_dirty(new_tile.id)
         room._broadcast_tiles_update()
         
         logger.info(f"Tile placed by {player_id} at ({x}, {y}) during their turn")
@@ -555,44 +583,32 @@ async def handle_place_tile(room: Room, player_id: str, data: dict, websocket: W
         logger.error(f"Error placing tile: {e}")
         await send_error_response(websocket, f"Tile placement failed: {str(e)}", "TILE_PLACEMENT_ERROR")
 
-def _has_adjacent_tile(x: int, y: int, tiles) -> bool:
+def _adjacent_positions(x: int, y: int):
+    """Get the west, east, north and south neighbours of a position."""
+    return ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1))
+
+def _has_adjacent_tile(x: int, y: int, tiles_by_coord) -> bool:
     """Check if position has at least one adjacent tile."""
-    if not tiles:  # First tile can be placed anywhere
+    if not tiles_by_coord:  # First tile can be placed anywhere
         return True
         
-    adjacent_positions = [
-        (x - 1, y),  # West
-        (x + 1, y),  # East
-        (x, y - 1),  # North
-        (x, y + 1)   # South
-    ]
-    
-    for tile in tiles:
-        if (tile.x, tile.y) in adjacent_positions:
-            return True
-    return False
+    return any(position in tiles_by_coord for position in _adjacent_positions(x, y))
 
-def _has_adjacent_player_tile(x: int, y: int, tiles, player_id: int) -> bool:
+def _has_adjacent_player_tile(x: int, y: int, state, player_id: int) -> bool:
     """Check if position has at least one adjacent tile owned by the player."""
-    if not tiles:  # First tile can be placed anywhere
+    tiles_by_coord = state.tiles_by_coord
+    if not tiles_by_coord:  # First tile can be placed anywhere
         return True
         
     # Check if player has any tiles at all
-    player_has_tiles = any(tile.owner == player_id for tile in tiles)
-    if not player_has_tiles:
+    if not state.tiles_by_owner.get(player_id):
         # Player has no tiles yet, allow placement anywhere with adjacency
-        return _has_adjacent_tile(x, y, tiles)
-        
-    adjacent_positions = [
-        (x - 1, y),  # West
-        (x + 1, y),  # East
-        (x, y - 1),  # North
-        (x, y + 1)   # South
-    ]
+        return _has_adjacent_tile(x, y, tiles_by_coord)
     
     # Check if any adjacent tile is owned by the player
-    for tile in tiles:
-        if tile.owner == player_id and (tile.x, tile.y) in adjacent_positions:
+    for position in _adjacent_positions(x, y):
+        tile = tiles_by_coord.get(position)
+        if tile is not None and tile.owner == player_id:
             return True
     return False
 
@@ -619,7 +635,6 @@ def _can_afford_tile(player, cost: dict) -> bool:
 
 def _get_tile_properties(tile_type: str) -> dict:
     """Get the properties for a tile type."""
-    from .models.tile import Resources, TileMetadata
     
     properties = {
         "field": {
@@ -688,11 +703,7 @@ async def handle_place_follower(room: Room, player_id: str, data: dict, websocke
             raise ValueError("Game not started yet")
         
         # Find the tile by ID
-        tile = None
-        for t in room.state.tiles:
-            if t.id == tile_id:
-                tile = t
-                break
+        tile = room.state.tiles_by_id.get(tile_id)
         
         if not tile:
             raise ValueError(f"Tile {tile_id} not found")
@@ -703,7 +714,6 @@ async def handle_place_follower(room: Room, player_id: str, data: dict, websocke
             raise ValueError("You don't own this tile")
         
         # Validate follower type
-        from .models.follower import FollowerType
         try:
             follower_type_enum = FollowerType(follower_type)
         except ValueError:
@@ -725,6 +735,7 @@ async def handle_place_follower(room: Room, player_id: str, data: dict, websocke
             raise ValueError(error_msg)
         
         room.state.last_update = datetime.now().timestamp()
+        room.mark_state_dirty()
         
         # Broadcast to all players in room
         await broadcast_to_room(room, {
@@ -744,11 +755,11 @@ async def handle_place_follower(room: Room, player_id: str, data: dict, websocke
         
     except Exception as e:
         logger.error(f"Error placing worker: {e}")
-        await websocket.send_text(orjson.dumps({
+        await websocket.send_bytes(orjson.dumps({
             "type": "error",
             "payload": {"message": f"Follower placement failed: {str(e)}"},
             "timestamp": datetime.now().isoformat()
-        }).decode())
+        }))
 
 async def handle_recall_follower(room: Room, player_id: str, data: dict, websocket: WebSocket):
     """Handle follower recall"""
@@ -772,6 +783,7 @@ async def handle_recall_follower(room: Room, player_id: str, data: dict, websock
             raise ValueError("Failed to start follower recall")
         
         room.state.last_update = datetime.now().timestamp()
+        room.mark_state_dirty()
         
         # Broadcast to all players in room
         await broadcast_to_room(room, {
@@ -789,11 +801,11 @@ async def handle_recall_follower(room: Room, player_id: str, data: dict, websock
         
     except Exception as e:
         logger.error(f"Error recalling follower: {e}")
-        await websocket.send_text(orjson.dumps({
+        await websocket.send_bytes(orjson.dumps({
             "type": "error",
             "payload": {"message": f"Follower recall failed: {str(e)}"},
             "timestamp": datetime.now().isoformat()
-        }).decode())
+        }))
 
 async def handle_raid_tile(room: Room, player_id: str, data: dict, websocket: WebSocket):
     """Handle tile raiding command from a player"""
@@ -826,11 +838,7 @@ async def handle_raid_tile(room: Room, player_id: str, data: dict, websocket: We
             return
         
         # Find the target tile
-        target_tile = None
-        for tile in room.state.tiles:
-            if tile.id == target_tile_id:
-                target_tile = tile
-                break
+        target_tile = room.state.tiles_by_id.get(target_tile_id)
         
         if not target_tile:
             await send_error_response(websocket, "Target tile not found", "TILE_NOT_FOUND")
@@ -842,7 +850,6 @@ async def handle_raid_tile(room: Room, player_id: str, data: dict, websocket: We
             return
         
         # Execute the raid
-        import time
         current_time = time.time()
         raid_result = room.conquest_system.execute_raid(unit, target_tile, current_time)
         
@@ -857,6 +864,7 @@ async def handle_raid_tile(room: Room, player_id: str, data: dict, websocket: We
             
             # Update game state
             room.state.last_update = current_time
+            room.mark_state_dirty()
             
             # Broadcast raid event to all players
             await room.broadcast_to_all({
@@ -872,7 +880,7 @@ async def handle_raid_tile(room: Room, player_id: str, data: dict, websocket: We
             })
             
             # Send success response
-            await websocket.send_text(orjson.dumps({
+            await websocket.send_bytes(orjson.dumps({
                 "type": "raid_success",
                 "payload": {
                     "unit_id": unit_id,
@@ -880,7 +888,7 @@ async def handle_raid_tile(room: Room, player_id: str, data: dict, websocket: We
                     "resources_stolen": raid_result.resources_stolen
                 },
                 "timestamp": datetime.now().isoformat()
-            }).decode())
+            }))
             
             logger.info(f"Raid executed by {player_id}: unit {unit_id} raided tile {target_tile_id}")
         else:
@@ -921,11 +929,7 @@ async def handle_attack_tile(room: Room, player_id: str, data: dict, websocket:
             return
         
         # Find the target tile
-        target_tile = None
-        for tile in room.state.tiles:
-            if tile.id == target_tile_id:
-                target_tile = tile
-                break
+        target_tile = room.state.tiles_by_id.get(target_tile_id)
         
         if not target_tile:
             await send_error_response(websocket, "Target tile not found", "TILE_NOT_FOUND")
@@ -968,12 +972,12 @@ async def handle_attack_tile(room: Room, player_id: str, data: dict, websocket:
         
         # If tile is destroyed, make it neutral (no owner)
         if tile_destroyed:
-            target_tile.owner = None
+            room.state.set_tile_owner(target_tile, None)
         
         # Update game state
-        import time
         current_time = time.time()
         room.state.last_update = current_time
+        room.mark_state_dirty()
         
         # Update unit status
         unit.status = UnitStatus.ATTACKING
@@ -996,7 +1000,7 @@ async def handle_attack_tile(room: Room, player_id: str, data: dict, websocket:
         })
         
         # Send success response
-        await websocket.send_text(orjson.dumps({
+        await websocket.send_bytes(orjson.dumps({
             "type": "attack_success",
             "payload": {
                 "unit_id": unit_id,
@@ -1006,7 +1010,7 @@ async def handle_attack_tile(room: Room, player_id: str, data: dict, websocket:
                 "tile_destroyed": tile_destroyed
             },
             "timestamp": datetime.now().isoformat()
-        }).decode())
+        }))
         
         logger.info(f"Tile attack by {player_id}: unit {unit_id} attacked tile {target_tile_id} for {damage} damage")
         
@@ -1045,11 +1049,7 @@ async def handle_train_unit(room: Room, player_id: str, data: dict, websocket: W
             return
 
         # Find the tile
-        tile = None
-        for t in room.state.tiles:
-            if t.id == tile_id:
-                tile = t
-                break
+        tile = room.state.tiles_by_id.get(tile_id)
         
         if not tile:
             await send_error_response(websocket, "Tile not found", "TILE_NOT_FOUND")
@@ -1099,21 +1099,23 @@ async def handle_train_unit(room: Room, player_id: str, data: dict, websocket: W
             training_time *= 0.5  # 50% faster training (0.5x multiplier)
             
         new_unit.metadata.training_time = training_time
-        new_unit.metadata.training_started = datetime.now().timestamp()
+        new_unit.metadata.training_started = time.time()
         
         # Add unit to game state
-        room.state.units.append(new_unit)
+        room.add_training_unit(new_unit)
         room.state.last_update = datetime.now().timestamp()
+        room.mark_state_dirty()
         
         # Add unit to unit system for pathfinding and movement
         room.unit_system.add_unit(new_unit)
         
-        print(f"DEBUG: Added unit {new_unit.id} to state. Total units: {len(room.state.units)}")
+        logger.debug("Added unit %s to state. Total units: %d", new_unit.id, len(room.state.units))
 
         # Update player stats
         player.stats.units_created += 1
 
         # Broadcast unit update to all clients
+        room.mark_unit_dirty(new_unit.id)
         room._broadcast_unit_update()
 
         # Broadcast to all players in room
@@ -1269,11 +1271,7 @@ async def handle_move_unit(room: Room, player_id: str, data: dict, websocket: We
             return
 
         # Check tile ownership - units can only move to neutral tiles or tiles owned by their player
-        target_tile = None
-        for tile in room.state.tiles:
-            if tile.x == target_x and tile.y == target_y:
-                target_tile = tile
-                break
+        target_tile = room.state.tiles_by_coord.get((target_x, target_y))
         
         if target_tile:
             # Cannot move to tiles owned by other players
@@ -1307,8 +1305,10 @@ async def handle_move_unit(room: Room, player_id: str, data: dict, websocket: We
         
         # Update last update time
         room.state.last_update = datetime.now().timestamp()
+        room.mark_state_dirty()
 
         # Broadcast unit update to all clients
+        room.mark_unit_dirty(unit_id)
         room._broadcast_unit_update()
 
         # Broadcast movement command to all players (unit will move step-by-step via game loop)
@@ -1365,26 +1365,26 @@ async def broadcast_to_room(room: Room, message: dict):
     if not room.connections:
         return
         
-    message_str = orjson.dumps(message).decode()
+    message_bytes = orjson.dumps(message)
     disconnected = []
         
     for player_id, connection in room.connections.items():
         try:
-            await connection.send_text(message_str)
+            await connection.send_bytes(message_bytes)
         except Exception as e:
             logger.warning(f"Failed to send message to {player_id}: {e}")
             disconnected.append(player_id)
         
-    # Remove disconnected connections
+    # Drop disconnected connections; the players can still reconnect
     for player_id in disconnected:
-        room.remove_player(player_id)
+        room.disconnect_player(player_id)
 
 async def broadcast_to_others(room: Room, exclude_player_id: str, message: dict):
     """Broadcast message to all connections in a room except the specified player"""
     if not room.connections:
         return
         
-    message_str = orjson.dumps(message).decode()
+    message_bytes = orjson.dumps(message)
     disconnected = []
     
     for player_id, connection in room.connections.items():
@@ -1398,14 +1398,14 @@ async def broadcast_to_others(room: Room, exclude_player_id: str, message: dict)
             continue
             
         try:
-            await connection.send_text(message_str)
+            await connection.send_bytes(message_bytes)
         except Exception as e:
             logger.warning(f"Failed to send message to {player_id}: {e}")
             disconnected.append(player_id)
     
-    # Remove disconnected connections
+    # Drop disconnected connections; the players can still reconnect
     for player_id in disconnected:
-        room.remove_player(player_id)
+        room.disconnect_player(player_id)
 
 async def handle_advance_tech_level(room: Room, player_id: str, data: dict, websocket: WebSocket):
     """Handle tech level advancement"""
@@ -1421,8 +1421,6 @@ async def handle_advance_tech_level(room: Room, player_id: str, data: dict, webs
             await send_error_response(websocket, "Player not found", "PLAYER_NOT_FOUND")
             return
         
-        # Import TechLevel enum
-        from .models.tech_tree import TechLevel
         try:
             tech_level_enum = TechLevel(target_level)
         except ValueError:
@@ -1433,6 +1431,8 @@ async def handle_advance_tech_level(room: Room, player_id: str, data: dict, webs
         success, message = room.tech_tree_system.advance_tech_level(room.state, player.id, tech_level_enum)
         
         if success:
+            room.mark_state_dirty()
+            
             # Broadcast to all players
             await broadcast_to_room(room, {
                 "type": "tech_level_advanced",
@@ -1471,6 +1471,8 @@ async def handle_purchase_tech_upgrade(room: Room, player_id: str, data: dict, w
         success, message = room.tech_tree_system.purchase_upgrade(room.state, player.id, upgrade_id)
         
         if success:
+            room.mark_state_dirty()
+            
             # Broadcast to all players
             await broadcast_to_room(room, {
                 "type": "tech_upgrade_purchased",
@@ -1509,6 +1511,8 @@ async def handle_use_special_ability(room: Room, player_id: str, data: dict, web
         success, message = room.tech_tree_system.use_special_ability(room.state, player.id, ability_id)
         
         if success:
+            room.mark_state_dirty()
+            
             # Broadcast to all players
             await broadcast_to_room(room, {
                 "type": "special_ability_used",
@@ -1533,6 +1537,7 @@ async def handle_use_special_ability(room: Room, player_id: str, data: dict, web
 async def startup_event():
     """Start background tasks"""
     logger.info("Starting Carcassonne: War of Ages backend server")
+    logger.info(f"Event loop: {type(asyncio.get_running_loop()).__module__}")
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -1542,4 +1547,11 @@ async def shutdown_event():
         room.stop_game_loop()
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    try:
+        import uvloop  # Installed with uvicorn[standard] on Linux/macOS
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+    
+    # Room broadcasts are compressed once by the room, so skip per-connection deflate
+    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True, ws_per_message_deflate=False, loop=loop) 
\ No newline at end of file
@@ -10,7 +10,7 @@ class FollowerType(str, Enum):
 
 class Follower(BaseModel):
     id: str
-    player_id: str
+    player_id: int
     type: FollowerType
     tile_id: Optional[str] = None  # None if follower is in player's pool
     is_recalling: bool = False
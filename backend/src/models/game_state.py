@@ -2,9 +2,10 @@
 Game state model for Carcassonne: War of Ages.
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set, Tuple
 from enum import Enum
-from pydantic import BaseModel, Field
+import numpy as np
+from pydantic import BaseModel, Field, PrivateAttr
 from .tile import Tile, TileType
 from .unit import Unit, Position
 from .follower import Follower
@@ -84,6 +85,7 @@ class GameState(BaseModel):
     turn_time_remaining: float = Field(ge=0, description="Time remaining for current turn in seconds")
     game_start_time: float = Field(description="Timestamp when game started")
     last_update: float = Field(description="Timestamp of last state update")
+    tick_time: float = Field(default=0.0, exclude=True, description="Monotonic clock reading sampled once at the start of the current server tick")
     players: List[Player] = Field(min_length=2, max_length=4, description="Array of players in the game")
     tiles: List[Tile] = Field(description="Array of all tiles placed on the board")
     units: List[Unit] = Field(description="Array of all units on the board")
@@ -94,6 +96,173 @@ class GameState(BaseModel):
     game_settings: Optional[GameSettings] = Field(default=None, description="Game configuration settings")
     events: Optional[List[GameEvent]] = Field(default=None, description="Recent game events for replay/logging")
 
+    # Lookup indexes over tiles, players and followers. The lists may still be
+    # appended to directly, so an index is rebuilt whenever its size drifts
+    # from the list it covers.
+    _tiles_by_id: Dict[str, Tile] = PrivateAttr(default_factory=dict)
+    _tiles_by_coord: Dict[Tuple[int, int], Tile] = PrivateAttr(default_factory=dict)
+    _tiles_by_owner: Dict[Optional[int], List[Tile]] = PrivateAttr(default_factory=dict)
+    _tiles_by_owner_count: int = PrivateAttr(default=0)
+    _players_by_id: Dict[int, Player] = PrivateAttr(default_factory=dict)
+    _followers_by_id: Dict[str, Follower] = PrivateAttr(default_factory=dict)
+
+    # Follower resource generation from the last calculation, reused until a
+    # tile, follower or player change marks it dirty.
+    _resource_cache: Optional[Any] = PrivateAttr(default=None)  # (players, 3) rates array
+    _resource_dirty: bool = PrivateAttr(default=True)
+
+    # Bumped whenever tiles are added or change owner; connected tile groups
+    # are cached per player against it as (revision, groups).
+    _tile_revision: int = PrivateAttr(default=0)
+    _group_cache: Dict[int, Tuple[int, List[List[Tile]]]] = PrivateAttr(default_factory=dict)
+
+    # Tile x, y and owner columns for vectorized board queries, cached against
+    # the tile revision as (revision, (xs, ys, owners)).
+    _tile_columns: Optional[Tuple[int, Tuple[np.ndarray, np.ndarray, np.ndarray]]] = PrivateAttr(default=None)
+
+    # Pending follower recalls as a min-heap of (expires_at, follower_id)
+    _recall_heap: List[Tuple[float, str]] = PrivateAttr(default_factory=list)
+
+    # Last follower sequence number handed out by next_follower_id
+    _follower_seq: int = PrivateAttr(default=0)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        # Replacing an indexed list invalidates its index
+        if name == "tiles":
+            self._tiles_by_id.clear()
+            self._tiles_by_coord.clear()
+            self._tiles_by_owner.clear()
+            self._tiles_by_owner_count = 0
+            self._resource_dirty = True
+        elif name == "players":
+            self._players_by_id.clear()
+            self._resource_dirty = True
+        elif name == "followers":
+            self._followers_by_id.clear()
+            self._resource_dirty = True
+
+    @property
+    def tiles_by_id(self) -> Dict[str, Tile]:
+        """Tiles keyed by tile ID."""
+        if len(self._tiles_by_id) != len(self.tiles):
+            self._reindex_tiles()
+        return self._tiles_by_id
+
+    @property
+    def tiles_by_coord(self) -> Dict[Tuple[int, int], Tile]:
+        """Tiles keyed by (x, y) board position."""
+        if len(self._tiles_by_coord) != len(self.tiles):
+            self._reindex_tiles()
+        return self._tiles_by_coord
+
+    @property
+    def tiles_by_owner(self) -> Dict[Optional[int], List[Tile]]:
+        """Tiles grouped by owning player ID (None for neutral tiles)."""
+        if self._tiles_by_owner_count != len(self.tiles):
+            tiles_by_owner: Dict[Optional[int], List[Tile]] = {}
+            for tile in self.tiles:
+                tiles_by_owner.setdefault(tile.owner, []).append(tile)
+            self._tiles_by_owner = tiles_by_owner
+            self._tiles_by_owner_count = len(self.tiles)
+            self._tile_revision += 1
+        return self._tiles_by_owner
+
+    @property
+    def tile_revision(self) -> int:
+        """Counter that changes whenever the board's tiles or their owners change."""
+        return self._tile_revision
+
+    @property
+    def tile_columns(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Tile x, y and owner (-1 for neutral) as parallel int32 arrays in tile list order."""
+        self.tiles_by_owner  # Picks up tiles appended to the list directly
+        cached = self._tile_columns
+        if cached is None or cached[0] != self._tile_revision:
+            tiles = self.tiles
+            count = len(tiles)
+            xs = np.fromiter((t.x for t in tiles), np.int32, count)
+            ys = np.fromiter((t.y for t in tiles), np.int32, count)
+            owners = np.fromiter((-1 if t.owner is None else t.owner for t in tiles), np.int32, count)
+            cached = self._tile_columns = (self._tile_revision, (xs, ys, owners))
+        return cached[1]
+
+    @property
+    def players_by_id(self) -> Dict[int, Player]:
+        """Players keyed by player ID."""
+        if len(self._players_by_id) != len(self.players):
+            self._players_by_id = {p.id: p for p in self.players}
+        return self._players_by_id
+
+    @property
+    def followers_by_id(self) -> Dict[str, Follower]:
+        """Followers keyed by follower ID."""
+        if len(self._followers_by_id) != len(self.followers):
+            self._followers_by_id = {f.id: f for f in self.followers}
+        return self._followers_by_id
+
+    def _reindex_tiles(self) -> None:
+        """Rebuild both tile indexes from the tile list."""
+        self._tiles_by_id = {t.id: t for t in self.tiles}
+        self._tiles_by_coord = {(t.x, t.y): t for t in self.tiles}
+
+    def add_tile(self, tile: Tile) -> None:
+        """Add a tile to the board and its indexes."""
+        tiles_by_id = self.tiles_by_id
+        tiles_by_coord = self.tiles_by_coord
+        tiles_by_owner = self.tiles_by_owner
+        self.tiles.append(tile)
+        tiles_by_id[tile.id] = tile
+        tiles_by_coord[(tile.x, tile.y)] = tile
+        tiles_by_owner.setdefault(tile.owner, []).append(tile)
+        self._tiles_by_owner_count += 1
+        self._tile_revision += 1
+        self._resource_dirty = True
+
+    def set_tile_owner(self, tile: Tile, owner: Optional[int]) -> None:
+        """Change a tile's owner, keeping the owner index and resource cache current."""
+        if tile.owner == owner:
+            return
+        tiles_by_owner = self.tiles_by_owner
+        owned = tiles_by_owner.get(tile.owner)
+        if owned is not None and tile in owned:
+            owned.remove(tile)
+        tile.owner = owner
+        tiles_by_owner.setdefault(owner, []).append(tile)
+        self._tile_revision += 1
+        self._resource_dirty = True
+
+    def next_follower_id(self) -> str:
+        """Allocate a follower ID that is unique within this game."""
+        followers_by_id = self.followers_by_id
+        while True:
+            # Skip IDs already in use, e.g. by followers restored from a saved state
+            self._follower_seq += 1
+            follower_id = f"follower_{self._follower_seq}"
+            if follower_id not in followers_by_id:
+                return follower_id
+
+    def add_follower(self, follower: Follower) -> None:
+        """Add a follower to the game and its index."""
+        followers_by_id = self.followers_by_id
+        self.followers.append(follower)
+        followers_by_id[follower.id] = follower
+
+    def remove_follower(self, follower: Follower) -> None:
+        """Remove a follower from the game and its index."""
+        self.followers.remove(follower)
+        self._followers_by_id.pop(follower.id, None)
+
+    def remove_followers(self, follower_ids: Set[str]) -> None:
+        """Remove several followers in one pass over the follower list."""
+        self.followers[:] = [f for f in self.followers if f.id not in follower_ids]
+        for follower_id in follower_ids:
+            self._followers_by_id.pop(follower_id, None)
+
+    def mark_resources_dirty(self) -> None:
+        """Force resource generation to be recalculated on the next tick."""
+        self._resource_dirty = True
+
     class Config:
         """Pydantic configuration."""
         use_enum_values = True
@@ -68,6 +68,43 @@ class UnitMetadata(BaseModel):
     effectiveness: Optional[CombatEffectiveness] = Field(default=None, description="Combat effectiveness against different unit types")
 
 
+# Default unit stats (matching game design document)
+UNIT_STATS = {
+    UnitType.INFANTRY: {
+        "hp": 100, "attack": 20, "defense": 15, "speed": 1.0, "range": 1,
+        "cost": UnitCost(gold=50, food=20),
+        "training_time": 10.0,
+        "effectiveness": CombatEffectiveness(
+            infantry=1.0, archer=1.5, knight=0.5, siege=1.5
+        )
+    },
+    UnitType.ARCHER: {
+        "hp": 75, "attack": 25, "defense": 10, "speed": 1.2, "range": 2,
+        "cost": UnitCost(gold=60, food=30),
+        "training_time": 12.0,
+        "effectiveness": CombatEffectiveness(
+            infantry=0.5, archer=1.0, knight=1.5, siege=1.2
+        )
+    },
+    UnitType.KNIGHT: {
+        "hp": 150, "attack": 30, "defense": 20, "speed": 0.8, "range": 1,
+        "cost": UnitCost(gold=100, food=50),
+        "training_time": 15.0,
+        "effectiveness": CombatEffectiveness(
+            infantry=1.5, archer=0.5, knight=1.0, siege=1.0
+        )
+    },
+    UnitType.SIEGE: {
+        "hp": 120, "attack": 50, "defense": 5, "speed": 0.3, "range": 2,
+        "cost": UnitCost(gold=200, food=0),
+        "training_time": 20.0,
+        "effectiveness": CombatEffectiveness(
+            infantry=0.5, archer=0.8, knight=1.0, siege=1.0, building=2.0
+        )
+    }
+}
+
+
 class Unit(BaseModel):
     """A unit in the Carcassonne: War of Ages game."""
     id: str = Field(description="Unique identifier for the unit")
@@ -124,43 +161,7 @@ class Unit(BaseModel):
         """Create a new unit with default stats based on type."""
         global _next_unit_id
         
-        # Default unit stats (matching game design document)
-        unit_stats = {
-            UnitType.INFANTRY: {
-                "hp": 100, "attack": 20, "defense": 15, "speed": 1.0, "range": 1,
-                "cost": UnitCost(gold=50, food=20),
-                "training_time": 10.0,
-                "effectiveness": CombatEffectiveness(
-                    infantry=1.0, archer=1.5, knight=0.5, siege=1.5
-                )
-            },
-            UnitType.ARCHER: {
-                "hp": 75, "attack": 25, "defense": 10, "speed": 1.2, "range": 2,
-                "cost": UnitCost(gold=60, food=30),
-                "training_time": 12.0,
-                "effectiveness": CombatEffectiveness(
-                    infantry=0.5, archer=1.0, knight=1.5, siege=1.2
-                )
-            },
-            UnitType.KNIGHT: {
-                "hp": 150, "attack": 30, "defense": 20, "speed": 0.8, "range": 1,
-                "cost": UnitCost(gold=100, food=50),
-                "training_time": 15.0,
-                "effectiveness": CombatEffectiveness(
-                    infantry=1.5, archer=0.5, knight=1.0, siege=1.0
-                )
-            },
-            UnitType.SIEGE: {
-                "hp": 120, "attack": 50, "defense": 5, "speed": 0.3, "range": 2,
-                "cost": UnitCost(gold=200, food=0),
-                "training_time": 20.0,
-                "effectiveness": CombatEffectiveness(
-                    infantry=0.5, archer=0.8, knight=1.0, siege=1.0, building=2.0
-                )
-            }
-        }
-        
-        stats = unit_stats[unit_type]
+        stats = UNIT_STATS[unit_type]
         
         # Generate simple integer ID
         unit_id = str(_next_unit_id)
@@ -181,8 +182,9 @@ class Unit(BaseModel):
             created_at=time.time(),
             metadata=UnitMetadata(
                 training_time=stats["training_time"],
-                cost=stats["cost"],
-                effectiveness=stats["effectiveness"]
+                # Copies, so changes to one unit's stats never reach the shared table
+                cost=stats["cost"].model_copy(),
+                effectiveness=stats["effectiveness"].model_copy()
             )
         )
 
@@ -311,13 +313,13 @@ class UnitSystem:
         
         return completed_units
     
-    def process_combat(self, current_time: float, all_tiles: List = None, conquest_system=None) -> List[Dict]:
+    def process_combat(self, current_time: float, all_tiles: List = None, conquest_system=None, tile_columns=None) -> List[Dict]:
         """Process combat between units using spatial hash. Returns combat events."""
         # Update spatial hash with current positions
         self.combat_system.update_spatial_hash(self.units)
         
         # Process combat tick with tiles support
-        combat_events = self.combat_system.process_combat_tick(self.units, current_time, all_tiles, conquest_system)
+        combat_events = self.combat_system.process_combat_tick(self.units, current_time, all_tiles, conquest_system, tile_columns)
         
         # Convert CombatEvent dataclasses to dictionaries for WebSocket serialization
         serialized_events = []
@@ -372,8 +374,10 @@ class UnitSystem:
         
         return False
     
-    def update_unit_movement(self, delta_time: float) -> List[Dict]:
-        """Update all unit movement. Returns movement events."""
+    def update_unit_movement(self, delta_time: float, current_time: Optional[float] = None) -> List[Dict]:
+        """Update all unit movement. Returns movement events, stamped with current_time (default: now)."""
+        if current_time is None:
+            current_time = time.time()
         movement_events = []
         
         for unit in self.units.values():
@@ -396,7 +400,7 @@ class UnitSystem:
                         "unit_id": unit.id,
                         "old_position": {"x": old_position.x, "y": old_position.y},
                         "new_position": {"x": new_position.x, "y": new_position.y},
-                        "timestamp": time.time()
+                        "timestamp": current_time
                     }
                     movement_events.append(movement_event)
                     
@@ -410,7 +414,7 @@ class UnitSystem:
                             "type": "arrival",
                             "unit_id": unit.id,
                             "position": {"x": new_position.x, "y": new_position.y},
-                            "timestamp": time.time()
+                            "timestamp": current_time
                         }
                         movement_events.append(arrival_event)
         
@@ -464,7 +468,7 @@ class UnitSystem:
         
         return DamageCalculator.calculate_combat_outcome(unit1, unit2)
     
-    def update_units(self, delta_time: float, all_tiles: List = None, conquest_system=None) -> Dict[str, List]:
+    def update_units(self, delta_time: float, all_tiles: List = None, conquest_system=None, tile_columns=None) -> Dict[str, List]:
         """Update all unit systems. Returns events for each update type."""
         events = {
             "training_completed": [],
@@ -478,11 +482,11 @@ class UnitSystem:
         events["training_completed"] = completed_units
         
         # Update movement
-        movement_events = self.update_unit_movement(delta_time)
+        movement_events = self.update_unit_movement(delta_time, current_time)
         events["movement_events"] = movement_events
         
         # Update combat with tiles support
-        combat_events = self.process_combat(current_time, all_tiles, conquest_system)
+        combat_events = self.process_combat(current_time, all_tiles, conquest_system, tile_columns)
         events["combat_events"] = combat_events
         
         return events 
\ No newline at end of file
@@ -8,7 +8,10 @@ import os
 import time
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from src.combat_system import SpatialHash, CombatSystem, DamageCalculator
+from src.combat_system import (
+    SpatialHash, CombatSystem, DamageCalculator,
+    _first_enemy_in_range_loop, _first_enemy_in_range_numpy
+)
 from src.models.unit import Unit, UnitType, UnitStatus, Position, UnitSystem
 
 
@@ -67,6 +70,91 @@ class TestSpatialHash:
         units_nearby = spatial_hash.get_units_in_radius(Position(x=10, y=10), 1)
         assert "unit1" in units_nearby
     
+    def test_remove_keeps_bucket_mates(self):
+        """Test that removing a unit leaves the rest of its cell intact."""
+        spatial_hash = SpatialHash(cell_size=4)
+        
+        for i in range(3):
+            spatial_hash.add_unit(f"unit{i}", Position(x=i, y=0))
+        
+        spatial_hash.remove_unit("unit0")
+        spatial_hash.update_unit_position("unit2", Position(x=3, y=1))  # Same cell
+        
+        assert spatial_hash.get_units_in_radius(Position(x=0, y=0), 4) == {"unit1", "unit2"}
+        assert len(spatial_hash.grid) == 1
+    
+    def test_has_enemies_near(self):
+        """Test the per-cell owner counts used to skip idle units."""
+        spatial_hash = SpatialHash(cell_size=4)
+        
+        spatial_hash.add_unit("friend", Position(x=1, y=1), owner=1)
+        spatial_hash.add_unit("enemy", Position(x=13, y=13), owner=2)
+        
+        assert not spatial_hash.has_enemies_near(Position(x=1, y=1), 2, owner=1)
+        
+        spatial_hash.update_unit_position("enemy", Position(x=2, y=2))
+        assert spatial_hash.has_enemies_near(Position(x=1, y=1), 2, owner=1)
+        
+        spatial_hash.remove_unit("enemy")
+        assert not spatial_hash.has_enemies_near(Position(x=1, y=1), 2, owner=1)
+    
+    def test_first_enemy_kernels_agree(self):
+        """Test that the compiled-loop and NumPy target scans pick the same row."""
+        spatial_hash = SpatialHash(cell_size=4)
+        spatial_hash.add_unit("friend", Position(x=5, y=5), owner=1)
+        spatial_hash.add_unit("far_enemy", Position(x=7, y=7), owner=2)
+        spatial_hash.add_unit("near_enemy", Position(x=5, y=6), owner=2)
+        
+        rows = spatial_hash.get_candidate_rows(Position(x=5, y=5), 1)
+        args = (spatial_hash.xs, spatial_hash.ys, spatial_hash.owners, 5, 5, 1, 1)
+        
+        for start in range(len(rows) + 1):
+            assert _first_enemy_in_range_loop(rows, start, *args) == _first_enemy_in_range_numpy(rows, start, *args)
+        
+        i = _first_enemy_in_range_numpy(rows, 0, *args)
+        assert spatial_hash.ids[rows[i]] == "near_enemy"
+    
+    def test_rebuild_matches_incremental_adds(self):
+        """Test that a bulk rebuild produces the same buckets as adding units one by one."""
+        positions = [Position(x=x, y=y) for x, y in [(1, 1), (2, 3), (5, 5), (9, 1), (3, 0), (6, 7)]]
+        unit_ids = [f"unit{i}" for i in range(len(positions))]
+        owners = [i % 2 for i in range(len(positions))]
+        
+        incremental = SpatialHash(cell_size=4)
+        for unit_id, position, owner in zip(unit_ids, positions, owners):
+            incremental.add_unit(unit_id, position, owner)
+        
+        bulk = SpatialHash(cell_size=4, capacity=2)
+        bulk.add_unit("stale", Position(x=0, y=0), 3)
+        bulk.rebuild(unit_ids, positions, owners)
+        
+        assert bulk.grid == incremental.grid
+        assert bulk.cell_owner_counts == incremental.cell_owner_counts
+        assert bulk.unit_positions == incremental.unit_positions
+        
+        # Incremental updates keep working after a rebuild
+        bulk.remove_unit("unit0")
+        incremental.remove_unit("unit0")
+        assert bulk.get_units_in_radius(Position(x=2, y=2), 3) == incremental.get_units_in_radius(Position(x=2, y=2), 3)
+    
+    def test_pruned_cell_offsets_find_every_unit(self):
+        """Test that pruned neighbor cells still cover the full Manhattan radius."""
+        spatial_hash = SpatialHash(cell_size=4)
+        positions = [Position(x=x, y=y) for x in range(12) for y in range(12)]
+        for position in positions:
+            spatial_hash.add_unit(f"{position.x},{position.y}", position)
+        
+        # Radius 1 never reaches diagonal cells
+        assert len(spatial_hash._get_cell_offsets(1)) == 5
+        
+        for radius in range(1, 7):
+            for center in positions:
+                expected = {
+                    f"{p.x},{p.y}" for p in positions
+                    if abs(p.x - center.x) + abs(p.y - center.y) <= radius
+                }
+                assert spatial_hash.get_units_in_radius(center, radius) == expected
+    
     def test_cell_partitioning(self):
         """Test that spatial hash partitions space correctly."""
         spatial_hash = SpatialHash(cell_size=4)
@@ -149,6 +237,22 @@ class TestCombatSystem:
         
         assert len(targets) == 1
         assert targets[0].id == enemy1.id  # Only enemy1 is in range
+
+    def test_first_target_skips_ally_entered_without_owner(self):
+        """Test that a friendly unit the spatial hash holds with owner -1 is not targeted."""
+        combat_system = CombatSystem()
+        attacker = Unit.create_unit(UnitType.ARCHER, owner=1, position=Position(x=10, y=10))
+        ally = Unit.create_unit(UnitType.INFANTRY, owner=1, position=Position(x=11, y=10))
+        enemy = Unit.create_unit(UnitType.INFANTRY, owner=2, position=Position(x=10, y=11))
+        combat_system.add_unit(attacker)
+        combat_system.spatial_hash.add_unit(ally.id, ally.position)
+        all_units = {unit.id: unit for unit in (attacker, ally)}
+
+        assert combat_system.find_first_target(attacker, all_units) is None
+
+        combat_system.add_unit(enemy)
+        all_units[enemy.id] = enemy
+        assert combat_system.find_first_target(attacker, all_units) is enemy
     
     def test_combat_tick(self):
         """Test combat tick processing."""
@@ -258,6 +362,27 @@ class TestCombatSystem:
         # Unit should be in attacking status
         assert attacker.status == UnitStatus.ATTACKING
 
+    def test_enemy_tile_columns_match_tile_loop(self):
+        """Test that the vectorized tile range check finds the same tiles as the per-tile loop."""
+        from src.models.tile import Tile, TileType, Resources
+        import numpy as np
+        combat_system = CombatSystem()
+        attacker = Unit.create_unit(UnitType.ARCHER, owner=1, position=Position(x=5, y=5))
+        tiles = [
+            Tile(id=f"{x},{y}", type=TileType.FIELD, x=x, y=y, edges=["field"] * 4, hp=50, max_hp=50,
+                 owner=owner, resources=Resources(gold=0, food=0, faith=0), placed_at=time.time())
+            for x, y, owner in [(5, 6, 2), (7, 5, 1), (8, 5, None), (3, 5, 0), (9, 9, 2), (5, 3, 3), (3, 4, 2)]
+        ]
+        columns = (
+            np.array([t.x for t in tiles], np.int32),
+            np.array([t.y for t in tiles], np.int32),
+            np.array([-1 if t.owner is None else t.owner for t in tiles], np.int32),
+        )
+
+        expected = combat_system.find_enemy_tiles_in_range(attacker, tiles)
+        assert [t.id for t in expected] == ["5,6", "3,5", "5,3"]
+        assert combat_system.find_enemy_tiles_in_range(attacker, tiles, columns) == expected
+
 
 class TestDamageCalculator:
     """Test damage calculation utilities."""
@@ -272,6 +397,17 @@ class TestDamageCalculator:
         # Infantry does 1.5x damage to archer (20 * 1.5 = 30)
         assert dps == 30.0
     
+    def test_damage_matches_unit_methods(self):
+        """Test that calculated damage agrees with per-unit damage math, including per-unit effectiveness."""
+        units = [Unit.create_unit(unit_type, owner=1, position=Position(x=0, y=0)) for unit_type in UnitType]
+        units[0].metadata.effectiveness.archer = 3.0
+        
+        for attacker in units:
+            assert DamageCalculator.calculate_damage(attacker, "building") == attacker.calculate_building_damage()
+            for target in units:
+                assert DamageCalculator.calculate_damage(attacker, target.type) == attacker.calculate_damage(target)
+        assert DamageCalculator.calculate_damage(units[0], "archer") == units[0].attack * 3
+    
     def test_calculate_time_to_kill(self):
         """Test time to kill calculation."""
         attacker = Unit.create_unit(UnitType.INFANTRY, owner=1, position=Position(x=10, y=10))
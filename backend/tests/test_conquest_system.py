@@ -82,6 +82,34 @@ class TestConquestSystem:
         multiplier = conquest_system.get_defense_multiplier(enemy_unit)
         assert multiplier == 1.0
 
+    def test_auras_rebuilt_only_on_new_revision(self):
+        """Test that auras are reused until the tile revision changes."""
+        conquest_system = ConquestSystem()
+        
+        watchtower = Tile(
+            id="10,10",
+            type=TileType.WATCHTOWER,
+            x=10,
+            y=10,
+            edges=["watchtower", "field", "watchtower", "field"],
+            hp=80,
+            max_hp=80,
+            owner=1,
+            resources=Resources(gold=0, food=0, faith=1),
+            placed_at=time.time(),
+            metadata=TileMetadata(aura_radius=2)
+        )
+        
+        conquest_system.update_auras([watchtower], {}, revision=1)
+        assert len(conquest_system.active_auras) == 1
+        
+        # Same revision: the board has not changed, so the auras are kept
+        conquest_system.update_auras([], {}, revision=1)
+        assert len(conquest_system.active_auras) == 1
+        
+        conquest_system.update_auras([], {}, revision=2)
+        assert conquest_system.active_auras == []
+
     def test_raid_execution_success(self):
         """Test successful raid execution."""
         conquest_system = ConquestSystem()
@@ -0,0 +1,322 @@
+"""
+Tests for follower placement, recall and resource generation.
+"""
+
+import pytest
+import random
+import time
+import numpy as np
+from src.follower_system import (
+    FollowerSystem, RECALL_DURATION, as_dict, _label_components_loop, _label_components_numpy,
+    _label_components_scipy
+)
+from src.models.follower import FollowerType
+from src.models.tile import Tile, TileType, Resources
+from src.models.game_state import GameState, Player, GameStatus, TechLevel
+
+
+def make_tile(x: int, y: int, tile_type: TileType, owner: int = 1) -> Tile:
+    """Create an owned tile at a board position."""
+    return Tile(
+        id=f"{x},{y}",
+        type=tile_type,
+        x=x,
+        y=y,
+        edges=["field", "field", "field", "field"],
+        hp=100,
+        max_hp=100,
+        owner=owner,
+        resources=Resources(gold=0, food=0, faith=0),
+        placed_at=time.time()
+    )
+
+
+def make_player(player_id: int) -> Player:
+    """Create a connected player with a full follower pool."""
+    return Player(
+        id=player_id,
+        name=f"Player {player_id}",
+        color="#FF0000",
+        is_connected=True,
+        is_eliminated=False,
+        resources={"gold": 100, "food": 100, "faith": 100},
+        tech_level=TechLevel.MANOR
+    )
+
+
+@pytest.fixture
+def system():
+    """A fresh follower system."""
+    return FollowerSystem()
+
+
+@pytest.fixture
+def game_state():
+    """Game state with two players and a small board for player 1."""
+    return GameState(
+        game_id="test_game",
+        status=GameStatus.PLAYING,
+        current_player=1,
+        players=[make_player(1), make_player(2)],
+        tiles=[
+            make_tile(5, 5, TileType.CITY),
+            make_tile(6, 5, TileType.CITY),
+            make_tile(7, 5, TileType.CITY),
+            make_tile(5, 6, TileType.FIELD),
+            make_tile(9, 9, TileType.MINE),
+            make_tile(12, 12, TileType.CITY, owner=2),
+        ],
+        units=[],
+        available_tiles=[],
+        turn_number=1,
+        turn_time_remaining=15.0,
+        game_start_time=time.time(),
+        last_update=time.time()
+    )
+
+
+class TestFollowerPlacement:
+    """Test placing followers on tiles."""
+
+    def test_place_follower(self, system, game_state):
+        """Test that placing a follower claims the tile and uses a follower from the pool."""
+        follower = system.place_follower(game_state, 1, "5,5", FollowerType.MAGISTRATE)
+
+        assert follower is not None
+        assert follower.player_id == 1
+        assert game_state.tiles_by_id["5,5"].follower_id == follower.id
+        assert game_state.followers_by_id[follower.id] is follower
+        assert game_state.players_by_id[1].followers_available == 7
+
+    def test_follower_ids_are_sequential(self, system, game_state):
+        """Test that follower IDs come from a per-game counter."""
+        first = system.place_follower(game_state, 1, "5,5", FollowerType.MAGISTRATE)
+        second = system.place_follower(game_state, 1, "5,6", FollowerType.FARMER)
+
+        assert (first.id, second.id) == ("follower_1", "follower_2")
+
+    def test_place_follower_on_enemy_tile(self, system, game_state):
+        """Test that followers cannot be placed on tiles owned by another player."""
+        assert system.place_follower(game_state, 1, "12,12", FollowerType.MAGISTRATE) is None
+        assert game_state.followers == []
+
+    def test_place_follower_on_unknown_tile(self, system, game_state):
+        """Test that placing on a missing tile fails."""
+        assert system.place_follower(game_state, 1, "0,0", FollowerType.SCOUT) is None
+
+
+class TestFollowerRecall:
+    """Test recalling followers back to the pool."""
+
+    def test_recall_completes_after_duration(self, system, game_state):
+        """Test that a recalled follower frees its tile and returns to the pool."""
+        follower = system.place_follower(game_state, 1, "5,5", FollowerType.MAGISTRATE)
+
+        assert system.start_recall(game_state, 1, follower.id)
+        assert system.complete_recalls(game_state) == []
+
+        # Move the tick clock past the recall duration
+        game_state.tick_time = time.monotonic() + RECALL_DURATION
+        completed = system.complete_recalls(game_state)
+
+        assert completed == [follower]
+        assert game_state.followers == []
+        assert follower.id not in game_state.followers_by_id
+        assert game_state.tiles_by_id["5,5"].follower_id is None
+        assert game_state.players_by_id[1].followers_available == 8
+
+    def test_recalls_complete_together(self, system, game_state):
+        """Test that several finished recalls are removed in the same tick, leaving the rest."""
+        first = system.place_follower(game_state, 1, "5,5", FollowerType.MAGISTRATE)
+        staying = system.place_follower(game_state, 1, "6,5", FollowerType.MAGISTRATE)
+        second = system.place_follower(game_state, 1, "5,6", FollowerType.FARMER)
+        game_state.tick_time = 1000.0
+
+        system.start_recall(game_state, 1, first.id)
+        system.start_recall(game_state, 1, second.id)
+        game_state.tick_time += RECALL_DURATION
+
+        completed = system.complete_recalls(game_state)
+
+        assert sorted(f.id for f in completed) == sorted([first.id, second.id])
+        assert game_state.followers == [staying]
+        assert list(game_state.followers_by_id) == [staying.id]
+        assert game_state.players_by_id[1].followers_available == 7
+
+    def test_recall_uses_tick_time(self, system, game_state):
+        """Test that recalls are timed against the tick clock and stamped with wall time for clients."""
+        follower = system.place_follower(game_state, 1, "5,5", FollowerType.MAGISTRATE)
+        game_state.tick_time = 1000.0
+
+        system.start_recall(game_state, 1, follower.id)
+        assert abs(follower.recall_started_at - time.time()) < 1
+
+        game_state.tick_time = 1000.0 + RECALL_DURATION - 0.1
+        assert system.complete_recalls(game_state) == []
+
+        game_state.tick_time = 1000.0 + RECALL_DURATION
+        assert system.complete_recalls(game_state) == [follower]
+
+    def test_recall_other_players_follower(self, system, game_state):
+        """Test that players cannot recall followers they do not own."""
+        follower = system.place_follower(game_state, 1, "5,5", FollowerType.MAGISTRATE)
+
+        assert not system.start_recall(game_state, 2, follower.id)
+
+
+class TestResourceGeneration:
+    """Test follower-based resource generation."""
+
+    def test_connected_group_with_follower(self, system, game_state):
+        """Test that one follower claims its whole connected group."""
+        system.place_follower(game_state, 1, "6,5", FollowerType.MAGISTRATE)
+
+        rates = as_dict(game_state, system.calculate_resource_generation(game_state))
+
+        # Three connected cities plus a mine, no farmer on the field
+        assert rates[1] == {"gold": 3 + 2, "food": 0, "faith": 0}
+        assert rates[2] == {"gold": 0, "food": 0, "faith": 0}
+
+    def test_wrong_follower_type_generates_nothing(self, system, game_state):
+        """Test that a scout on a city does not produce gold."""
+        system.place_follower(game_state, 1, "5,5", FollowerType.SCOUT)
+
+        rates = as_dict(game_state, system.calculate_resource_generation(game_state))
+
+        assert rates[1]["gold"] == 2  # Only the mine
+
+    def test_each_group_uses_its_own_rule(self, system, game_state):
+        """Test that city and field groups are paid out by their matching followers."""
+        system.place_follower(game_state, 1, "7,5", FollowerType.MAGISTRATE)
+        system.place_follower(game_state, 1, "5,6", FollowerType.FARMER)
+
+        rates = as_dict(game_state, system.calculate_resource_generation(game_state))
+
+        assert rates[1] == {"gold": 3 + 2, "food": 1, "faith": 0}
+
+    def test_players_without_followers_skip_grouping(self, system, game_state, monkeypatch):
+        """Test that tile grouping only runs for players with a follower on the board."""
+        system.place_follower(game_state, 1, "6,5", FollowerType.MAGISTRATE)
+        grouped = []
+        find_groups = system._find_connected_tile_groups
+
+        def recording_find_groups(state, player_id):
+            grouped.append(player_id)
+            return find_groups(state, player_id)
+
+        monkeypatch.setattr(system, "_find_connected_tile_groups", recording_find_groups)
+        rates = as_dict(game_state, system.calculate_resource_generation(game_state))
+
+        assert grouped == [1]
+        assert rates[1]["gold"] == 3 + 2
+
+    def test_rates_array_rows_follow_player_order(self, system, game_state):
+        """Test that rates come back as one read-only row per player, zeroed for eliminated players."""
+        system.place_follower(game_state, 1, "6,5", FollowerType.MAGISTRATE)
+        game_state.players[1].is_eliminated = True
+
+        rates = system.calculate_resource_generation(game_state)
+
+        assert rates.tolist() == [[3 + 2, 0, 0], [0, 0, 0]]
+        assert not rates.flags.writeable
+        assert list(as_dict(game_state, rates)) == [1]
+
+    def test_rates_cached_until_state_changes(self, system, game_state):
+        """Test that rates are reused on clean ticks and recalculated after a change."""
+        rates = system.calculate_resource_generation(game_state)
+        assert system.calculate_resource_generation(game_state) is rates
+
+        system.place_follower(game_state, 1, "5,5", FollowerType.MAGISTRATE)
+        rates = as_dict(game_state, system.calculate_resource_generation(game_state))
+        assert rates[1]["gold"] == 3 + 2
+
+        game_state.add_tile(make_tile(8, 5, TileType.CITY))
+        assert as_dict(game_state, system.calculate_resource_generation(game_state))[1]["gold"] == 4 + 2
+
+    def test_lost_tile_stops_generating(self, system, game_state):
+        """Test that a tile changing owner moves between owner groups and updates rates."""
+        system.place_follower(game_state, 1, "5,5", FollowerType.MAGISTRATE)
+        system.calculate_resource_generation(game_state)
+
+        game_state.set_tile_owner(game_state.tiles_by_id["9,9"], None)
+        rates = as_dict(game_state, system.calculate_resource_generation(game_state))
+
+        assert rates[1]["gold"] == 3
+        assert [t.id for t in game_state.tiles_by_owner[None]] == ["9,9"]
+        assert "9,9" not in [t.id for t in game_state.tiles_by_owner[1]]
+
+
+class TestPlacementRules:
+    """Test follower type and tile type compatibility."""
+
+    @pytest.mark.parametrize("follower_type,tile_id,allowed", [
+        (FollowerType.MAGISTRATE, "5,5", True),
+        (FollowerType.MAGISTRATE, "5,6", False),
+        (FollowerType.FARMER, "5,6", True),
+        (FollowerType.MONK, "5,5", False),
+        (FollowerType.SCOUT, "9,9", True),
+    ])
+    def test_can_place_follower(self, system, game_state, follower_type, tile_id, allowed):
+        """Test which follower types each tile type accepts."""
+        tile = game_state.tiles_by_id[tile_id]
+
+        can_place, message = system.can_place_follower(game_state, 1, tile, follower_type)
+
+        assert can_place == allowed
+        if not allowed:
+            assert message == f"{follower_type.value} cannot be placed on {tile.type} tiles"
+
+
+class TestConnectedGroups:
+    """Test grouping of connected same-type tiles."""
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_grid_labeling_matches_flood_fill(self, system, game_state, seed):
+        """Test that the NumPy grid path finds the same groups as the flood fill."""
+        rng = random.Random(seed)
+        tile_types = [TileType.CITY, TileType.FIELD, TileType.MONASTERY]
+        game_state.tiles = [
+            make_tile(x, y, rng.choice(tile_types))
+            for x in range(20) for y in range(20)
+            if rng.random() < 0.6
+        ]
+
+        def group_ids(groups):
+            return sorted(sorted(t.id for t in group) for group in groups)
+
+        player_tiles = game_state.tiles_by_owner[1]
+        grid_groups = system._find_connected_tile_groups_grid(player_tiles)
+        flood_groups = system._find_connected_tile_groups_flood(player_tiles)
+
+        assert group_ids(grid_groups) == group_ids(flood_groups)
+        assert all(len({t.type for t in group}) == 1 for group in grid_groups)
+
+    def test_groups_cached_until_board_changes(self, system, game_state):
+        """Test that groups are reused between board changes and recomputed after one."""
+        groups = system._find_connected_tile_groups(game_state, 1)
+        assert system._find_connected_tile_groups(game_state, 1) is groups
+
+        game_state.add_tile(make_tile(5, 4, TileType.CITY))
+        groups = system._find_connected_tile_groups(game_state, 1)
+        assert sorted(len(group) for group in groups) == [1, 1, 4]
+
+        game_state.set_tile_owner(game_state.tiles_by_id["6,5"], None)
+        groups = system._find_connected_tile_groups(game_state, 1)
+        assert sorted(len(group) for group in groups) == [1, 1, 1, 2]
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_label_kernels_agree(self, seed):
+        """Test that the compiled-loop and NumPy labelers give every cell the same label."""
+        rng = np.random.default_rng(seed)
+        grid = rng.integers(-1, 3, size=(12, 17)).astype(np.int8)
+
+        np.testing.assert_array_equal(_label_components_loop(grid), _label_components_numpy(grid))
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_scipy_labeler_agrees(self, seed):
+        """Test that the SciPy labeler gives every cell the same label as the NumPy one."""
+        pytest.importorskip("scipy")
+        rng = np.random.default_rng(seed)
+        grid = rng.integers(-1, 3, size=(12, 17)).astype(np.int8)
+
+        np.testing.assert_array_equal(_label_components_scipy(grid), _label_components_numpy(grid))
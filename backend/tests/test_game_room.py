@@ -0,0 +1,767 @@
+"""
+Tests for room map generation.
+"""
+
+import asyncio
+import orjson
+import pytest
+import time
+import zlib
+from unittest.mock import AsyncMock, MagicMock
+from src import game_room
+from src.game_room import Room, CAPITAL_POSITIONS
+from src.models.game_state import GameState, Player, GameStatus, GameSettings, TechLevel
+from src.models.tile import TileType
+from src.models.unit import Unit, UnitType, UnitStatus, Position
+
+
+def make_player(player_id: int) -> Player:
+    """Create a connected player."""
+    return Player(
+        id=player_id,
+        name=f"Player {player_id}",
+        color="#FF0000",
+        is_connected=True,
+        is_eliminated=False,
+        resources={"gold": 100, "food": 100, "faith": 100},
+        tech_level=TechLevel.MANOR
+    )
+
+
+def decode_frame(frame: bytes):
+    """Decode a broadcast frame, inflating it first if it was compressed."""
+    if frame[:1] == b"x":
+        frame = zlib.decompress(frame)
+    if frame[:1] != b"{":
+        return game_room.ormsgpack.unpackb(frame)
+    return orjson.loads(frame)
+
+
+async def flush_outboxes():
+    """Let the room's outbox writer tasks send everything queued so far."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def room():
+    """Room with an empty 20x20 board and two players."""
+    room = Room(room_id="test_room")
+    room.state = GameState(
+        game_id="test_room",
+        status=GameStatus.WAITING,
+        current_player=0,
+        players=[make_player(0), make_player(1)],
+        tiles=[],
+        units=[],
+        available_tiles=[],
+        turn_number=0,
+        turn_time_remaining=15.0,
+        game_start_time=time.time(),
+        last_update=time.time(),
+        game_settings=GameSettings(map_size=20)
+    )
+    return room
+
+
+class TestCapitalDistance:
+    """Test distance checks against the fixed capital positions."""
+
+    def test_min_distance_matches_brute_force(self, room):
+        """Test that precomputed distances match a direct Manhattan distance check."""
+        for x in range(20):
+            for y in range(20):
+                expected = min(abs(x - cx) + abs(y - cy) for cx, cy in CAPITAL_POSITIONS)
+                assert room._min_distance_from_capitals(x, y) == expected
+                assert room._is_near_capital(x, y) == (expected < 3)
+
+    def test_off_map_distance(self, room):
+        """Test that positions outside the map still get a distance."""
+        assert room._min_distance_from_capitals(-1, 5) == 6
+
+
+class TestMapGeneration:
+    """Test placement of the initial map tiles."""
+
+    def test_resource_and_marsh_tiles_respect_spacing(self, room):
+        """Test that generated tiles land on distinct cells at the required distance from capitals."""
+        room._initialize_game_map()
+
+        tiles = room.state.tiles
+        by_type = {}
+        for tile in tiles:
+            by_type.setdefault(tile.type, []).append(tile)
+
+        assert len({(t.x, t.y) for t in tiles}) == len(tiles)
+        assert len(by_type["mine"]) == 10
+        assert len(by_type["orchard"]) == 10
+        assert len(by_type["marsh"]) == 15
+        for tile in by_type["mine"] + by_type["orchard"]:
+            assert room._min_distance_from_capitals(tile.x, tile.y) >= 5
+        for tile in by_type["marsh"]:
+            assert room._min_distance_from_capitals(tile.x, tile.y) >= 3
+
+    def test_map_layout_is_seeded_by_room_id(self, room):
+        """Test that rooms with the same ID generate the same map."""
+        other = Room(room_id=room.room_id)
+        other.state = GameState(**room.state.model_dump())
+
+        room._initialize_game_map()
+        other._initialize_game_map()
+
+        assert [(t.type, t.x, t.y) for t in room.state.tiles] == [(t.type, t.x, t.y) for t in other.state.tiles]
+
+    def test_dev_mode_fills_free_cells(self, room):
+        """Test that dev mode covers every free cell exactly once."""
+        room._place_capital_cities()
+        room._place_dev_mode_tiles()
+
+        assert len(room.state.tiles) == 20 * 20
+        assert len({(t.x, t.y) for t in room.state.tiles}) == 20 * 20
+
+    def test_dev_mode_tile_properties(self, room):
+        """Test that dev mode tiles get their type's properties in models of their own."""
+        room._place_dev_mode_tiles()
+        first, second = room.state.tiles[:2]
+
+        assert first.type == "field"
+        assert (first.hp, first.resources.gold, first.resources.food) == (100, 1, 1)
+        assert first.metadata.worker_capacity == 1
+        assert first.resources is not second.resources
+        assert first.metadata is not second.metadata
+
+    def test_resource_tiles_do_not_share_models(self, room):
+        """Test that generated resource tiles get their own resource and metadata models."""
+        room._initialize_game_map()
+        mines = [t for t in room.state.tiles if t.type == "mine"]
+
+        mines[0].resources.gold += 5
+        assert mines[1].resources.gold == 2
+        assert mines[0].metadata is not mines[1].metadata
+        assert mines[0].edges == ["mine"] * 4
+        assert room._is_resource_tile(mines[0])
+        assert room._get_resource_tile_properties(TileType.MARSH)[2].speed_multiplier == 0.3
+
+
+class TestBroadcasts:
+    """Test batching of events into state broadcasts."""
+
+    @pytest.mark.asyncio
+    async def test_training_complete_sent_with_next_state(self, room):
+        """Test that finished training is queued and delivered inside one state message."""
+        unit = Unit.create_unit(UnitType.INFANTRY, owner=0, position=Position(x=5, y=5))
+        unit.status = UnitStatus.TRAINING
+        unit.metadata.training_started = time.time() - 10.0
+        unit.metadata.training_time = 10.0
+        room.add_training_unit(unit)
+        connection = MagicMock()
+        connection.client_state.name = "CONNECTED"
+        connection.send_bytes = AsyncMock()
+        room.connections["player"] = connection
+
+        room._update_unit_training(time.monotonic())
+        connection.send_bytes.assert_not_called()
+
+        await room._broadcast_state()
+        await room._broadcast_state()
+        await flush_outboxes()
+
+        first, second = [decode_frame(call.args[0]) for call in connection.send_bytes.call_args_list]
+        assert first["payload"]["tickEvents"] == [{
+            "type": "unit_training_complete",
+            "payload": {"unit_id": unit.id, "unit_type": "infantry", "position": {"x": 5, "y": 5}, "owner": 0}
+        }]
+        assert first["payload"]["units"][0]["status"] == "idle"
+        assert "tickEvents" not in second["payload"]
+        room._close_outbox("player")
+
+    @pytest.mark.asyncio
+    async def test_state_broadcasts_skip_model_dump(self, room, monkeypatch):
+        """Test that keyframes and deltas are built from the compiled serializer's output."""
+        monkeypatch.setattr(game_room, "ormsgpack", None)
+        monkeypatch.setattr(type(room.state), "model_dump", MagicMock(side_effect=AssertionError))
+        connection = MagicMock()
+        connection.client_state.name = "CONNECTED"
+        connection.send_bytes = AsyncMock()
+        room.connections["player"] = connection
+        room._pending_events.append({"type": "test", "payload": {}})
+
+        await room._broadcast_state()
+        room.tick += 1
+        await room._broadcast_state()
+        await flush_outboxes()
+
+        keyframe, delta = [decode_frame(call.args[0]) for call in connection.send_bytes.call_args_list]
+        assert keyframe["payload"] == {**orjson.loads(room.state.model_dump_json()), "tickEvents": [{"type": "test", "payload": {}}]}
+        assert delta["type"] == "state_delta"
+        room._close_outbox("player")
+
+    @pytest.mark.asyncio
+    async def test_state_broadcasts_send_deltas_between_keyframes(self, room):
+        """Test that only changes are broadcast between full state keyframes."""
+        room._place_capital_cities()
+        unit = Unit.create_unit(UnitType.INFANTRY, owner=0, position=Position(x=5, y=5))
+        gone = Unit.create_unit(UnitType.ARCHER, owner=1, position=Position(x=14, y=14))
+        room.state.units = [unit, gone]
+        connection = MagicMock()
+        connection.client_state.name = "CONNECTED"
+        connection.send_bytes = AsyncMock()
+        room.connections["player"] = connection
+
+        async def sent():
+            await flush_outboxes()
+            return decode_frame(connection.send_bytes.call_args.args[0])
+
+        await room._broadcast_state()
+        keyframe = await sent()
+        assert keyframe["type"] == "state"
+        assert keyframe["payload"] == orjson.loads(orjson.dumps(room.state.model_dump()))
+
+        room.tick = 3
+        unit.position = Position(x=6, y=5)
+        room.state.units = [unit]
+        room.state.set_tile_owner(room.state.tiles[2], 1)
+        room.state.current_player = 1
+        await room._broadcast_state()
+        delta = await sent()
+        assert delta["type"] == "state_delta"
+        assert [(u["id"], u["x"]) for u in delta["payload"]["units"]] == [(unit.id, 6)]
+        assert delta["payload"]["removed_units"] == [gone.id]
+        assert [t["owner"] for t in delta["payload"]["tiles"]] == [1]
+        assert delta["payload"]["current_player"] == 1
+        assert "players" not in delta["payload"]
+
+        room.tick = game_room.KEYFRAME_INTERVAL
+        await room._broadcast_state()
+        assert (await sent())["type"] == "state"
+
+        # A message dropped from a full outbox forces the next broadcast to be a keyframe
+        room.tick += 3
+        for _ in range(game_room.OUTBOX_SIZE + 1):
+            room._enqueue_message("player", b"event")
+        await room._broadcast_state()
+        assert room._last_keyframe_tick == room.tick
+        room._close_outbox("player")
+
+    def test_training_registry_drops_finished_units(self, room):
+        """Test that only registered training units are checked and leave the registry once ready."""
+        quick = Unit.create_unit(UnitType.INFANTRY, owner=0, position=Position(x=5, y=5))
+        slow = Unit.create_unit(UnitType.ARCHER, owner=0, position=Position(x=5, y=6))
+        for unit, training_time in ((quick, 5.0), (slow, 50.0)):
+            unit.status = UnitStatus.TRAINING
+            unit.metadata.training_started = time.time()
+            unit.metadata.training_time = training_time
+            room.add_training_unit(unit)
+        now = time.monotonic()
+
+        room._update_unit_training(now + 10.0)
+
+        assert quick.status == "idle"
+        assert list(room._training_units) == [slow.id]
+        assert [unit_id for _, unit_id in room._training_heap] == [slow.id]
+        assert abs(room._training_heap[0][0] - (now + 50.0)) < 1
+        assert [event["payload"]["unit_id"] for event in room._pending_events] == [quick.id]
+
+    def test_training_completes_in_completion_order(self, room):
+        """Test that units finishing in the same tick are reported earliest first."""
+        units = []
+        for training_time in (8.0, 2.0, 5.0):
+            unit = Unit.create_unit(UnitType.INFANTRY, owner=0, position=Position(x=5, y=5))
+            unit.status = UnitStatus.TRAINING
+            unit.metadata.training_started = time.time()
+            unit.metadata.training_time = training_time
+            room.add_training_unit(unit)
+            units.append(unit)
+
+        room._update_unit_training(time.monotonic() + 10.0)
+
+        assert [event["payload"]["unit_id"] for event in room._pending_events] == [units[1].id, units[2].id, units[0].id]
+        assert not room._training_heap
+
+    @pytest.mark.asyncio
+    async def test_unit_update_sends_only_dirty_units(self, room):
+        """Test that unit broadcasts carry just the units marked dirty, then nothing until the next change."""
+        moved = Unit.create_unit(UnitType.INFANTRY, owner=0, position=Position(x=5, y=5))
+        idle = Unit.create_unit(UnitType.ARCHER, owner=1, position=Position(x=14, y=14))
+        room.state.units = [moved, idle]
+        connection = MagicMock()
+        connection.send_bytes = AsyncMock()
+        room.connections["player"] = connection
+
+        room.mark_unit_dirty(moved.id)
+        room.mark_unit_dirty("gone")
+        room._broadcast_unit_update()
+        room._broadcast_unit_update()
+        await asyncio.sleep(0)
+
+        connection.send_bytes.assert_called_once()
+        message = orjson.loads(connection.send_bytes.call_args.args[0])
+        assert message["type"] == "state_delta"
+        assert [unit["id"] for unit in message["payload"]["units"]] == [moved.id]
+        assert message["payload"]["removed_units"] == ["gone"]
+        room._close_outbox("player")
+        await asyncio.sleep(0)
+
+    @pytest.mark.asyncio
+    async def test_tile_update_sends_full_tile_models(self, room):
+        """Test that tile deltas carry the same tile fields as a full state message."""
+        room._place_capital_cities()
+        tile = room.state.tiles[0]
+        connection = MagicMock()
+        connection.send_bytes = AsyncMock()
+        room.connections["player"] = connection
+
+        room.mark_tile_dirty(tile.id)
+        room._broadcast_tiles_update()
+        await asyncio.sleep(0)
+
+        message = orjson.loads(connection.send_bytes.call_args.args[0])
+        assert message["payload"]["tiles"] == [orjson.loads(orjson.dumps(tile.model_dump()))]
+        room._close_outbox("player")
+        await asyncio.sleep(0)
+
+    @pytest.mark.asyncio
+    async def test_failed_send_drops_only_that_player(self, room):
+        """Test that a broadcast reaches every live client and disconnects clients whose send fails."""
+        healthy, broken = MagicMock(), MagicMock()
+        for connection in (healthy, broken):
+            connection.client_state.name = "CONNECTED"
+        healthy.send_bytes = AsyncMock()
+        broken.send_bytes = AsyncMock(side_effect=RuntimeError("socket closed"))
+        room.connections.update({"healthy": healthy, "broken": broken})
+        room.players.update({"healthy": make_player(0), "broken": make_player(1)})
+
+        await room._broadcast_message({"type": "ping"})
+
+        healthy.send_bytes.assert_awaited_once_with(b'{"type":"ping"}')
+        assert list(room.connections) == ["healthy"]
+        assert not room.players["broken"].is_connected
+        assert not room.players["broken"].is_eliminated
+
+    @pytest.mark.asyncio
+    async def test_failed_outbox_send_disconnects_player(self, room):
+        """Test that a queued message that cannot be sent disconnects the player, while others still receive it."""
+        healthy, broken = MagicMock(), MagicMock()
+        healthy.send_bytes = AsyncMock()
+        broken.send_bytes = AsyncMock(side_effect=RuntimeError("socket closed"))
+        room.connections.update({"healthy": healthy, "broken": broken})
+        room.players.update({"healthy": make_player(0), "broken": make_player(1)})
+
+        room._enqueue_to_all(b"update")
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+        healthy.send_bytes.assert_awaited_once_with(b"update")
+        assert list(room.connections) == ["healthy"]
+        assert not room.players["broken"].is_connected
+        assert not room.players["broken"].is_eliminated
+        assert "broken" not in room._writers
+        room._close_outbox("healthy")
+        await asyncio.sleep(0)
+
+    @pytest.mark.asyncio
+    async def test_full_outbox_drops_oldest_message(self, room, monkeypatch):
+        """Test that a slow client's queue keeps only the newest messages, in order."""
+        monkeypatch.setattr(game_room, "OUTBOX_SIZE", 2)
+        connection = MagicMock()
+        connection.send_bytes = AsyncMock()
+        room.connections["player"] = connection
+
+        for n in range(4):
+            room._enqueue_message("player", str(n).encode())
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+        assert [call.args[0] for call in connection.send_bytes.call_args_list] == [b"2", b"3"]
+        room._close_outbox("player")
+        await asyncio.sleep(0)
+
+    @pytest.mark.asyncio
+    async def test_queued_snapshots_coalesce(self, room, monkeypatch):
+        """Test that a newer snapshot replaces a queued one in place and a dropped snapshot can be queued again."""
+        monkeypatch.setattr(game_room, "OUTBOX_SIZE", 3)
+        connection = MagicMock()
+        connection.send_bytes = AsyncMock()
+        room.connections["player"] = connection
+
+        async def drain():
+            for _ in range(5):
+                await asyncio.sleep(0)
+            sent = [call.args[0] for call in connection.send_bytes.call_args_list]
+            connection.send_bytes.reset_mock()
+            return sent
+
+        room._enqueue_message("player", b"resources 1", "resources")
+        room._enqueue_message("player", b"delta")
+        room._enqueue_message("player", b"resources 2", "resources")
+        assert await drain() == [b"resources 2", b"delta"]
+
+        for message in (b"resources 3", b"turn", b"event", b"late"):
+            room._enqueue_message("player", message, "resources" if message == b"resources 3" else None)
+        room._enqueue_message("player", b"resources 4", "resources")
+        assert await drain() == [b"event", b"late", b"resources 4"]
+
+        room._close_outbox("player")
+        await asyncio.sleep(0)
+
+    @pytest.mark.asyncio
+    async def test_game_loop_skips_clean_state(self, room, monkeypatch):
+        """Test that the loop only broadcasts after something marks the state dirty."""
+        room.state.status = GameStatus.PLAYING
+        room.players["player"] = make_player(0)
+        room._broadcast_state = AsyncMock(side_effect=lambda: setattr(room, "_state_dirty", False))
+        monkeypatch.setattr(game_room.asyncio, "sleep", AsyncMock())
+
+        async def update():
+            if room.tick == 4:
+                room.mark_state_dirty()
+            if room.tick == 8:
+                room.players.clear()
+        room._update_game_state = update
+
+        await room._game_loop()
+
+        room._broadcast_state.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_game_loop_sleeps_until_deadline(self, room, monkeypatch):
+        """Test that tick work is taken out of the sleep and a long stall resets the schedule."""
+        clock = {"now": 0.0}
+        sleeps = []
+        loop = asyncio.get_running_loop()
+        monkeypatch.setattr(loop, "time", lambda: clock["now"])
+
+        async def fake_sleep(delay):
+            sleeps.append(round(delay, 3))
+            clock["now"] += delay
+        monkeypatch.setattr(game_room.asyncio, "sleep", fake_sleep)
+
+        work = {0: 0.03, 1: 0.25, 2: 2.0}
+        room.state.status = GameStatus.PLAYING
+        room.players["player"] = make_player(0)
+
+        async def update():
+            clock["now"] += work.get(room.tick, 0.0)
+            if room.tick == 3:
+                room.players.clear()
+        room._update_game_state = update
+
+        await room._game_loop()
+
+        assert sleeps == [0.07, 0.0, 0.1, 0.1]
+        assert room.tick == 4
+
+    @pytest.mark.asyncio
+    async def test_broadcast_put_off_while_behind(self, room, monkeypatch):
+        """Test that a tick overrunning its slot defers the broadcast until the loop catches up, within a bound."""
+        clock = {"now": 0.0}
+        loop = asyncio.get_running_loop()
+        monkeypatch.setattr(loop, "time", lambda: clock["now"])
+
+        async def fake_sleep(delay):
+            clock["now"] += delay
+        monkeypatch.setattr(game_room.asyncio, "sleep", fake_sleep)
+
+        broadcast_ticks = []
+        room._broadcast_state = AsyncMock(side_effect=lambda: broadcast_ticks.append(room.tick))
+        room.state.status = GameStatus.PLAYING
+        room.players["player"] = make_player(0)
+
+        # Ticks 2-3 overrun their slots; from tick 8 on every tick does
+        work = {2: 0.25, 3: 0.25}
+
+        async def update():
+            room._state_dirty = True
+            clock["now"] += work.get(room.tick, 0.3 if room.tick >= 8 else 0.0)
+            if room.tick == 16:
+                room.players.clear()
+        room._update_game_state = update
+
+        await room._game_loop()
+
+        # Held back while catching up, then every 6 ticks once every tick overruns
+        assert broadcast_ticks == [6, 12]
+
+    @pytest.mark.asyncio
+    async def test_idle_room_polls_slowly(self, room, monkeypatch):
+        """Test that a room that is not being played sleeps between polls without ticking."""
+        sleeps = []
+        room.players["player"] = make_player(0)
+        room._update_game_state = AsyncMock()
+
+        async def fake_sleep(delay):
+            sleeps.append(delay)
+            if len(sleeps) == 2:
+                room.mark_state_dirty()
+            if len(sleeps) == 3:
+                room.players.clear()
+        monkeypatch.setattr(game_room.asyncio, "sleep", fake_sleep)
+
+        await room._game_loop()
+
+        # Two idle polls, then one tick for the dirty state
+        assert sleeps[:2] == [game_room.IDLE_TICK_INTERVAL] * 2
+        room._update_game_state.assert_awaited_once()
+        assert room.tick == 1
+
+
+    @pytest.mark.asyncio
+    async def test_large_broadcasts_compressed_once(self, room):
+        """Test that large room broadcasts are compressed once and small ones go out as plain JSON."""
+        connections = []
+        for name in ("alice", "bob"):
+            connection = MagicMock()
+            connection.client_state.name = "CONNECTED"
+            connection.send_bytes = AsyncMock()
+            room.connections[name] = connection
+            connections.append(connection)
+        large = orjson.dumps({"type": "state", "payload": {"tiles": ["field"] * game_room.COMPRESS_MIN_BYTES}})
+
+        await room._send_to_all(large)
+        await room._send_to_all(b'{"type":"ping"}')
+
+        frames = [connection.send_bytes.call_args_list[0].args[0] for connection in connections]
+        assert frames[0] is frames[1]
+        assert len(frames[0]) < len(large)
+        assert decode_frame(frames[0]) == orjson.loads(large)
+        assert connections[0].send_bytes.call_args.args[0] == b'{"type":"ping"}'
+
+    def test_state_frames_use_messagepack_when_available(self, monkeypatch):
+        """Test that state frames are MessagePack with ormsgpack installed and JSON without it."""
+        message = {"type": "state", "payload": {"tiles": [], "current_player": 1}, "tick": 3}
+        ormsgpack = pytest.importorskip("ormsgpack")
+        frame = game_room._pack_state(message)
+        assert frame[0] & 0xf0 == 0x80
+        assert ormsgpack.unpackb(frame) == message
+
+        monkeypatch.setattr(game_room, "ormsgpack", None)
+        assert orjson.loads(game_room._pack_state(message)) == message
+
+    def test_resource_updates_only_carry_changes(self, room):
+        """Test that resource updates list only players whose resources changed, and are skipped otherwise."""
+        room._enqueue_to_all = MagicMock()
+
+        room._broadcast_resource_update()
+        room._broadcast_resource_update()
+        room.state.players[1].resources["food"] = 120
+        room._broadcast_resource_update()
+
+        messages = [orjson.loads(call.args[0]) for call in room._enqueue_to_all.call_args_list]
+        assert [sorted(m["payload"]["resources"]) for m in messages] == [["0", "1"], ["1"]]
+        assert messages[1]["payload"]["resources"]["1"]["food"] == 120
+
+    def test_tile_offers_reach_the_players_connection(self, room):
+        """Test that per-player messages find the connection by game player ID, including later joiners."""
+        room._enqueue_message = MagicMock()
+        for index, name in enumerate(("alice", "bob")):
+            room.players[name] = make_player(index)
+            room.connections[name] = MagicMock()
+
+        room._send_tile_offers_to_player(1, ["city"])
+        room.players["carol"] = make_player(2)
+        room._send_tile_offers_to_player(2, ["field"])
+        room._send_tile_offers_to_player(3, ["field"])
+
+        sent = [(call.args[0], orjson.loads(call.args[1])) for call in room._enqueue_message.call_args_list]
+        assert [name for name, _ in sent] == ["bob"]
+        assert sent[0][1]["payload"]["tileOffer"]["tiles"] == ["city"]
+
+        room.connections["carol"] = MagicMock()
+        room._send_tile_offers_to_player(2, ["field"])
+        assert room._enqueue_message.call_args.args[0] == "carol"
+
+    def test_snapshots_encoded_once_per_tick(self, room, monkeypatch):
+        """Test that repeated snapshot broadcasts within a tick reuse the encoded bytes."""
+        dumps = MagicMock(wraps=orjson.dumps)
+        monkeypatch.setattr(game_room.orjson, "dumps", dumps)
+        room.tick = 5
+
+        first = room._tick_message("resources", lambda: {"tick": room.tick})
+        assert room._tick_message("resources", lambda: {"tick": room.tick}) is first
+        assert dumps.call_count == 1
+
+        room.mark_state_dirty()
+        room._tick_message("resources", lambda: {"tick": room.tick})
+        room.tick = 6
+        assert orjson.loads(room._tick_message("resources", lambda: {"tick": room.tick})) == {"tick": 6}
+        assert dumps.call_count == 3
+
+
+class TestPlayers:
+    """Test players joining a room."""
+
+    def test_player_colors_follow_join_order(self, room):
+        """Test that each joining player gets the next fixed color."""
+        for name in ("alice", "bob", "carol"):
+            room.add_player(name, MagicMock())
+
+        assert [room.players[name].color for name in ("alice", "bob", "carol")] == list(game_room.PLAYER_COLORS[:3])
+
+    def test_turn_order_skips_eliminated_players(self, room):
+        """Test that turns rotate over active players and pick up eliminations."""
+        room.state.players.append(make_player(2))
+        room._generate_tile_offers_for_player = MagicMock()
+        room._broadcast_turn_change = MagicMock()
+
+        room._advance_turn()
+        assert room.state.current_player == 1
+
+        room.state.players[2].is_eliminated = True
+        room._invalidate_active_players()
+        room._advance_turn()
+        assert room.state.current_player == 0
+        assert room._turn_order == [0, 1]
+
+    @pytest.mark.asyncio
+    async def test_eliminated_current_player_passes_turn(self, room):
+        """Test that eliminating the player whose turn it is hands the turn to the next seat."""
+        room.state.players.extend([make_player(2), make_player(3)])
+        room._generate_tile_offers_for_player = MagicMock()
+        room._broadcast_turn_change = MagicMock()
+        room._advance_turn()
+        room.state.players[2].is_eliminated = True
+        room._invalidate_active_players()
+
+        await room._handle_player_elimination(1)
+
+        assert room.state.current_player == 3
+        assert room._get_next_players() == {0: 3, 1: 3, 2: 3, 3: 0}
+
+    def test_active_players_refresh_on_leave(self, room):
+        """Test that the cached active players drop a player who leaves."""
+        for name in ("alice", "bob"):
+            room.add_player(name, MagicMock())
+        assert len(room.get_active_players()) == 2
+
+        room.remove_player("bob")
+
+        assert [player.name for player in room.get_active_players()] == ["alice"]
+
+    def test_disconnected_player_rejoins_full_room(self, room):
+        """Test that a full room takes back a disconnected player but no newcomer."""
+        max_players = room.state.game_settings.max_players
+        names = [f"player{i}" for i in range(max_players)]
+        for name in names:
+            assert room.add_player(name, MagicMock())
+        assert not room.add_player("latecomer", MagicMock())
+
+        room.disconnect_player(names[0])
+        assert not room.add_player("latecomer", MagicMock())
+        assert room.add_player(names[0], MagicMock())
+
+        assert room.players[names[0]].is_connected
+        assert len(room.players) == max_players
+
+
+class TestGameTick:
+    """Test per-tick state updates."""
+
+    @pytest.mark.asyncio
+    async def test_tick_time_uses_monotonic_clock(self, room):
+        """Test that ticks time durations on the monotonic clock and stamp updates with wall time."""
+        await room._update_game_state()
+
+        assert abs(room.state.tick_time - time.monotonic()) < 1
+        assert abs(room.state.last_update - time.time()) < 1
+
+    @pytest.mark.asyncio
+    async def test_waiting_room_skips_tick_work(self, room):
+        """Test that nothing advances before the game is being played."""
+        room._update_resources = MagicMock()
+        room.tick = 10
+
+        await room._update_game_state()
+
+        room._update_resources.assert_not_called()
+        assert room.state.turn_time_remaining == 15.0
+
+    @pytest.mark.asyncio
+    async def test_training_units_skip_unit_system(self, room):
+        """Test that movement and combat are skipped while every unit is still training."""
+        room.state.status = GameStatus.PLAYING
+        unit = Unit.create_unit(UnitType.INFANTRY, owner=0, position=Position(x=5, y=5))
+        unit.status = UnitStatus.TRAINING
+        unit.metadata.training_started = time.time()
+        unit.metadata.training_time = 3600.0
+        room.add_training_unit(unit)
+        room.unit_system.add_unit(unit)
+        room.unit_system.update_units = MagicMock(return_value={})
+
+        await room._update_game_state()
+        room.unit_system.update_units.assert_not_called()
+
+        room._update_unit_training(time.monotonic() + 3600.0)
+        await room._update_game_state()
+        room.unit_system.update_units.assert_called_once()
+
+        room.unit_system.update_units.reset_mock()
+        room.unit_system.combat_system.remove_unit(unit.id)
+        await room._update_game_state()
+        room.unit_system.update_units.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_movement_events_update_unit_positions(self, room):
+        """Test that movement and arrival events move the matching units in the game state."""
+        room.state.status = GameStatus.PLAYING
+        units = [Unit.create_unit(UnitType.INFANTRY, owner=0, position=Position(x=5, y=i)) for i in range(3)]
+        room.state.units = units
+        for unit in units:
+            room.unit_system.add_unit(unit)
+        room.unit_system.update_units = MagicMock(return_value={"movement_events": [
+            {"type": "movement", "unit_id": units[2].id, "new_position": {"x": 7, "y": 2}},
+            {"type": "arrival", "unit_id": units[0].id, "position": {"x": 6, "y": 0}},
+            {"type": "movement", "unit_id": "gone", "new_position": {"x": 1, "y": 1}},
+        ]})
+
+        await room._update_game_state()
+
+        assert [(u.position.x, u.position.y) for u in units] == [(6, 0), (5, 1), (7, 2)]
+        assert room._state_dirty
+
+    def test_resource_update_caps_each_player(self, room):
+        """Test that generated resources are added and capped per player, skipping eliminated players."""
+        room._place_capital_cities()
+        field = room.state.tiles_by_coord[(5, 5)]
+        room.state.add_tile(field.model_copy(update={"id": "5,6", "y": 6, "type": "mine"}))
+        room.state.add_tile(field.model_copy(update={"id": "14,6", "x": 14, "y": 6, "type": "orchard", "owner": 1}))
+        first, second = room.state.players
+        first.resources = {"gold": 499, "food": 100, "faith": 100}
+        second.resources = {"gold": 100, "food": 600, "faith": 100}
+        second.is_eliminated = True
+
+        room._update_resources()
+
+        assert first.resources == {"gold": 500, "food": 100, "faith": 100}
+        assert second.resources == {"gold": 100, "food": 600, "faith": 100}
+
+
+class TestStartingTiles:
+    """Test capitals and the fields placed next to them."""
+
+    def test_capitals_and_fields_for_each_player(self, room):
+        """Test that every quadrant gets a capital and each player's capital gets an adjacent field."""
+        room._place_capital_cities()
+        room._place_field_tiles_around_capitals()
+
+        tiles = room.state.tiles_by_coord
+        for x, y in CAPITAL_POSITIONS:
+            assert tiles[(x, y)].type == "capital_city"
+        assert tiles[(5, 6)].owner == 0 and tiles[(5, 6)].type == "field"
+        assert tiles[(14, 6)].owner == 1 and tiles[(14, 6)].type == "field"
+        assert (5, 13) not in tiles
+        assert room.state.players[1].capital_city.x == 14
+
+    def test_tile_columns_follow_board_changes(self, room):
+        """Test that the tile coordinate and owner arrays track placements and owner changes."""
+        room._place_capital_cities()
+        xs, ys, owners = room.state.tile_columns
+        assert list(zip(xs, ys)) == list(CAPITAL_POSITIONS)
+        assert list(owners) == [0, 1, -1, -1]
+        assert room.state.tile_columns[0] is xs
+
+        room.state.set_tile_owner(room.state.tiles[0], None)
+        room._place_field_tiles_around_capitals()
+        xs, ys, owners = room.state.tile_columns
+
+        assert len(xs) == 6
+        assert list(owners) == [-1, 1, -1, -1, 0, 1]
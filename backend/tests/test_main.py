@@ -1,18 +1,26 @@
 """
 Basic tests for the FastAPI backend
 """
+import asyncio
+import time
 import pytest
+from unittest.mock import AsyncMock, MagicMock
 from fastapi.testclient import TestClient
-from src.main import app
+from src.game_room import Room
+from src.main import app, room_manager, handle_command, _has_adjacent_player_tile
+from src.models.game_state import GameState, GameStatus, Player, TechLevel
+from src.models.tile import Tile, TileType, Resources
 
 client = TestClient(app)
 
+
 def test_root_endpoint():
     """Test the root endpoint"""
     response = client.get("/")
     assert response.status_code == 200
     assert response.json() == {"message": "Carcassonne: War of Ages API", "version": "1.0.0"}
 
+
 def test_health_check():
     """Test the health check endpoint"""
     response = client.get("/health")
@@ -21,17 +29,19 @@ def test_health_check():
     assert data["status"] == "healthy"
     assert "timestamp" in data
 
+
 def test_docs_endpoint():
     """Test the docs endpoint"""
     response = client.get("/docs")
     assert response.status_code == 200
     assert "Carcassonne: War of Ages API" in response.text
 
+
 def test_websocket_connection():
     """Test WebSocket connection"""
     with client.websocket_connect("/ws/test-room/player1") as websocket:
         # Should receive initial game state
-        data = websocket.receive_json()
+        data = websocket.receive_json(mode="binary")
         assert data["type"] == "game_state"
         assert "payload" in data
         assert "timestamp" in data
@@ -40,19 +50,114 @@ def test_websocket_connection():
         websocket.send_json({"type": "ping"})
         
         # Should receive pong
-        data = websocket.receive_json()
+        data = websocket.receive_json(mode="binary")
         assert data["type"] == "pong"
 
+
 def test_invalid_websocket_message():
     """Test handling of invalid WebSocket messages"""
     with client.websocket_connect("/ws/test-room/player1") as websocket:
         # Skip initial game state message
-        websocket.receive_json()
+        websocket.receive_json(mode="binary")
         
         # Send invalid message
         websocket.send_json({"type": "invalid_message"})
         
         # Should receive error
-        data = websocket.receive_json()
+        data = websocket.receive_json(mode="binary")
+        assert data["type"] == "error"
+        assert "Unknown message type" in data["payload"]["message"] 
+
+
+def test_command_batch_routes_each_command():
+    """Test that every command in a cmd_batch frame is dispatched"""
+    with client.websocket_connect("/ws/batch-room/player1") as websocket:
+        # Skip player identity and initial game state messages
+        websocket.receive_json(mode="binary")
+        websocket.receive_json(mode="binary")
+        
+        websocket.send_json({
+            "type": "cmd_batch",
+            "cmds": [
+                {"type": "cmd", "payload": {"action": "notAnAction"}},
+                {"type": "cmd", "payload": {}}
+            ]
+        })
+        
+        data = websocket.receive_json(mode="binary")
+        assert data["type"] == "error"
+        assert "Unknown action" in data["payload"]["message"]
+        
+        data = websocket.receive_json(mode="binary")
         assert data["type"] == "error"
-        assert "Unknown message type" in data["payload"]["message"] 
\ No newline at end of file
+        assert data["payload"]["code"] == "MISSING_ACTION"
+
+
+def test_disconnect_removes_connection():
+    """Test that closing a WebSocket drops it from the room right away without eliminating the player"""
+    with client.websocket_connect("/ws/disconnect-room/player1") as websocket:
+        websocket.receive_json(mode="binary")
+    
+    room = room_manager.get_room("disconnect-room")
+    assert "player1" not in room.connections
+    assert not room.players["player1"].is_eliminated
+    assert not room.players["player1"].is_connected
+    
+    # Reconnecting picks the same player back up
+    with client.websocket_connect("/ws/disconnect-room/player1") as websocket:
+        websocket.receive_json(mode="binary")
+        assert room.players["player1"].is_connected
+
+
+def test_adjacent_player_tile_uses_board_index():
+    """Test tile placement adjacency against tiles looked up by position"""
+    def make_tile(x, y, owner):
+        return Tile(id=f"{x},{y}", type=TileType.FIELD, x=x, y=y, edges=["field"] * 4, hp=30, max_hp=30,
+                    owner=owner, resources=Resources(gold=0, food=0, faith=0), placed_at=time.time())
+    
+    players = [
+        Player(id=i, name=f"Player {i}", color="#FF0000", is_connected=True, is_eliminated=False,
+               resources={"gold": 100, "food": 100, "faith": 0}, tech_level=TechLevel.MANOR)
+        for i in range(3)
+    ]
+    state = GameState(game_id="adjacency", status=GameStatus.PLAYING, current_player=0, players=players, tiles=[],
+                      units=[], available_tiles=[], turn_number=1, turn_time_remaining=15.0,
+                      game_start_time=time.time(), last_update=time.time())
+    assert _has_adjacent_player_tile(0, 0, state, 0)
+    
+    state.add_tile(make_tile(5, 5, 0))
+    state.add_tile(make_tile(8, 5, 1))
+    assert _has_adjacent_player_tile(5, 6, state, 0)
+    assert not _has_adjacent_player_tile(7, 5, state, 0)
+    
+    # A player with no tiles yet may place next to any tile
+    assert _has_adjacent_player_tile(7, 5, state, 2)
+    assert not _has_adjacent_player_tile(0, 0, state, 2)
+
+
+def test_only_state_changing_commands_mark_room_dirty():
+    """Test that rejected commands leave the room clean so they trigger no state broadcast"""
+    players = [
+        Player(id=i, name=f"player{i + 1}", color="#FF0000", is_connected=True, is_eliminated=False,
+               resources={"gold": 100, "food": 100, "faith": 0}, tech_level=TechLevel.MANOR)
+        for i in range(2)
+    ]
+    room = Room(room_id="dirty-room")
+    room.state = GameState(game_id="dirty-room", status=GameStatus.PLAYING, current_player=0, players=players, tiles=[],
+                           units=[], available_tiles=[], turn_number=1, turn_time_remaining=15.0,
+                           game_start_time=time.time(), last_update=time.time())
+    room.tech_tree_system = MagicMock()
+    room.tech_tree_system.advance_tech_level.return_value = (False, "Not enough resources")
+    websocket = MagicMock()
+    websocket.send_bytes = AsyncMock()
+    
+    async def run(action, data):
+        await handle_command(room, "player1", {"action": action, "data": data}, websocket)
+    
+    asyncio.run(run("moveUnit", {}))
+    asyncio.run(run("advanceTechLevel", {"target_level": "kingdom"}))
+    assert not room._state_dirty
+    
+    room.tech_tree_system.advance_tech_level.return_value = (True, "Advanced")
+    asyncio.run(run("advanceTechLevel", {"target_level": "kingdom"}))
+    assert room._state_dirty
@@ -277,6 +277,19 @@ class TestUnitSystemMovement:
         assert movement_events[0]["type"] == "movement"
         assert movement_events[0]["unit_id"] == unit.id
     
+    def test_movement_events_share_tick_time(self):
+        """Test that every movement event of an update carries the time passed in."""
+        unit_system = UnitSystem()
+        
+        unit = Unit.create_unit(UnitType.INFANTRY, owner=1, position=Position(x=10, y=10))
+        unit_system.add_unit(unit)
+        unit_system.move_unit(unit.id, Position(x=11, y=10))
+        
+        movement_events = unit_system.update_unit_movement(2.0, 1234.5)
+        
+        assert [event["type"] for event in movement_events] == ["movement", "arrival"]
+        assert {event["timestamp"] for event in movement_events} == {1234.5}
+    
     def test_stop_unit_movement(self):
         """Test stopping unit movement."""
         unit_system = UnitSystem()
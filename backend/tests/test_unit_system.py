@@ -90,6 +90,17 @@ class TestUnitCombat:
         assert unit.hp == 0
         assert unit.status == UnitStatus.DEAD
 
+    def test_units_do_not_share_stat_models(self):
+        """Test that each unit gets its own cost and effectiveness models."""
+        first = Unit.create_unit(UnitType.INFANTRY, owner=1, position=Position(x=10, y=10))
+        second = Unit.create_unit(UnitType.INFANTRY, owner=2, position=Position(x=12, y=10))
+        
+        first.metadata.effectiveness.archer = 9.0
+        first.metadata.cost.gold = 1
+        
+        assert second.metadata.effectiveness.archer == 1.5
+        assert second.metadata.cost.gold == 50
+
 
 class TestUnitSystem:
     """Test unit system management."""
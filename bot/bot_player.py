@@ -8,10 +8,12 @@ import json
 import random
 import logging
 import os
+import zlib
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import aiohttp
+import ormsgpack
 import websockets
 
 logging.basicConfig(level=logging.INFO)
@@ -97,7 +99,14 @@ class BotPlayer:
         """Handle incoming WebSocket messages."""
         try:
             async for message in self.websocket:
-                data = json.loads(message)
+                # Large room broadcasts arrive as zlib-compressed binary frames,
+                # and state frames may be MessagePack instead of JSON
+                if isinstance(message, bytes) and message[:1] == b"x":
+                    message = zlib.decompress(message)
+                if isinstance(message, bytes) and message[:1] != b"{":
+                    data = ormsgpack.unpackb(message)
+                else:
+                    data = json.loads(message)
                 await self._process_message(data)
         except websockets.exceptions.ConnectionClosed:
             logger.info("WebSocket connection closed")
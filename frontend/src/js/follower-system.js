@@ -312,7 +312,7 @@ export class FollowerSystem {
         }
         
         // Update UI
-        const player = gameState.players.find(p => p.id === this.game.playerId);
+        const player = (gameState.players || []).find(p => p.id === this.game.playerId);
         if (player) {
             document.getElementById('followers-available').textContent = player.followers_available || 0;
         }
@@ -5,6 +5,7 @@ class Game {
         this.initialized = false;
         this.paused = false;
         this.gameState = null;
+        this.serverState = null;  // Last full state from the server, patched by state deltas
         this.renderer = null;
         this.tileSystem = null;
         this.resourceManager = null;
@@ -438,6 +439,9 @@ class Game {
         this.websocketClient.on('state', (payload) => {
             console.log('Received game state update:', payload);
             
+            // Keep the latest full state so state deltas can be applied to it
+            this.recordServerState(payload);
+            
             // Handle resource updates specifically
             if (payload.resources) {
                 this.handleResourceUpdate(payload.resources);
@@ -477,6 +481,11 @@ class Game {
             if (payload.playersAlive !== undefined) {
                 this.cycleTimer.updatePlayersAlive(payload.playersAlive);
             }
+
+            // Replay events the server batched into this state update
+            if (payload.tickEvents) {
+                payload.tickEvents.forEach(event => this.websocketClient.emit(event.type, event.payload));
+            }
             
             // Update debug overlay tick information
             if (this.debugOverlay && payload.tick !== undefined) {
@@ -498,6 +507,7 @@ class Game {
         // Handle initial game state (sent as "game_state" type)
         this.websocketClient.on('game_state', (gameState) => {
             console.log('Received initial game state from server');
+            this.recordServerState(gameState);
             this.handleGameStateUpdate(gameState);
         });
         
@@ -587,6 +597,11 @@ class Game {
             this.toastManager.showInfo(`${payload.player_id} started training ${payload.unit_type}`);
         });
 
+        // Handle partial updates carrying only changed units and tiles
+        this.websocketClient.on('state_delta', (payload) => {
+            this.handleStateDelta(payload);
+        });
+
         // Handle unit training completed
         this.websocketClient.on('unit_training_complete', (payload) => {
             console.log('Unit training complete:', payload);
@@ -748,11 +763,10 @@ class Game {
             // Get resources for our player
             const myResources = resourceData[this.myPlayerId.toString()];
             
+            // Updates only list players whose resources changed
             if (myResources) {
                 console.log(`Updating resources for Player ${this.myPlayerId}:`, myResources);
                 this.resourceManager.updateResources(myResources);
-            } else {
-                console.warn(`No resources found for player ${this.myPlayerId}`);
             }
         }
     }
@@ -857,6 +871,89 @@ class Game {
         }
     }
     
+    handleStateDelta(delta) {
+        if (!this.gameState) {
+            return;
+        }
+        
+        const { tiles, units, removed_tiles, removed_units, tickEvents, ...fields } = delta;
+        
+        // Keep the full server state current so state listeners never see a partial one
+        const state = this.serverState;
+        if (state) {
+            state.tiles = this.mergeEntities(state.tiles, tiles, removed_tiles);
+            state.units = this.mergeEntities(state.units, units, removed_units);
+        }
+        
+        // Patch changed and removed tiles into the board
+        if ((tiles && tiles.length) || removed_tiles) {
+            (tiles || []).forEach(tile => {
+                this.gameState.tiles.set(`${tile.x},${tile.y}`, tile);
+            });
+            if (removed_tiles) {
+                const removed = new Set(removed_tiles);
+                for (const [key, tile] of this.gameState.tiles) {
+                    if (removed.has(tile.id)) {
+                        this.gameState.tiles.delete(key);
+                    }
+                }
+            }
+            
+            if (this.renderer) {
+                this.renderer.renderTiles(this.gameState.tiles);
+            }
+        }
+        
+        // Patch changed and removed units
+        if (units || removed_units) {
+            (units || []).forEach(unit => this.gameState.units.set(unit.id, unit));
+            (removed_units || []).forEach(unitId => this.gameState.units.delete(unitId));
+            
+            const unitsArray = Array.from(this.gameState.units.values());
+            
+            if (this.renderer) {
+                this.renderer.renderUnits(unitsArray);
+            }
+            
+            // Notify training UI about server unit updates
+            window.dispatchEvent(new CustomEvent('server:unit:update', {
+                detail: { units: unitsArray }
+            }));
+        }
+        
+        // Other changed fields (players, turn) are merged into the full state,
+        // which then goes through the regular state listeners
+        if (state && Object.keys(fields).length) {
+            Object.assign(state, fields);
+            this.websocketClient.emit('state', state);
+        }
+        
+        // Replay events the server batched into this delta
+        if (tickEvents) {
+            tickEvents.forEach(event => this.websocketClient.emit(event.type, event.payload));
+        }
+    }
+    
+    recordServerState(payload) {
+        // Only full states carry the player list; partial updates are ignored
+        if (!Array.isArray(payload.players) || !Array.isArray(payload.tiles)) {
+            return;
+        }
+        const { tickEvents, ...state } = payload;
+        this.serverState = state;
+    }
+    
+    mergeEntities(current, changed, removedIds) {
+        // Apply id-keyed changes and removals to an entity list from the server
+        if (!changed && !removedIds) {
+            return current;
+        }
+        const byId = new Map((current || []).map(entity => [entity.id, entity]));
+        (changed || []).forEach(entity => byId.set(entity.id, entity));
+        (removedIds || []).forEach(id => byId.delete(id));
+        return Array.from(byId.values());
+    }
+    
     handleWorkerUpdate(workerData) {
         console.log('Handling worker update:', workerData);
         
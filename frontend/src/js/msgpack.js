@@ -0,0 +1,100 @@
+// MessagePack decoder for binary state frames - covers every format the server's encoder emits
+// (nil, booleans, integers, floats, strings, binary, arrays and maps); extension types are rejected
+const MessagePack = (() => {
+    const textDecoder = new TextDecoder();
+
+    class Decoder {
+        constructor(bytes) {
+            this.bytes = bytes;
+            this.view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+            this.pos = 0;
+        }
+
+        read() {
+            const byte = this.view.getUint8(this.pos++);
+
+            if (byte <= 0x7f) return byte;                          // positive fixint
+            if (byte >= 0xe0) return byte - 0x100;                  // negative fixint
+            if (byte <= 0x8f) return this.readMap(byte & 0x0f);     // fixmap
+            if (byte <= 0x9f) return this.readArray(byte & 0x0f);   // fixarray
+            if (byte <= 0xbf) return this.readString(byte & 0x1f);  // fixstr
+
+            switch (byte) {
+                case 0xc0: return null;
+                case 0xc2: return false;
+                case 0xc3: return true;
+                case 0xc4: return this.readBinary(this.readUint(1));
+                case 0xc5: return this.readBinary(this.readUint(2));
+                case 0xc6: return this.readBinary(this.readUint(4));
+                case 0xca: return this.advance(4, this.view.getFloat32(this.pos));
+                case 0xcb: return this.advance(8, this.view.getFloat64(this.pos));
+                case 0xcc: return this.readUint(1);
+                case 0xcd: return this.readUint(2);
+                case 0xce: return this.readUint(4);
+                case 0xcf: return this.advance(8, Number(this.view.getBigUint64(this.pos)));
+                case 0xd0: return this.advance(1, this.view.getInt8(this.pos));
+                case 0xd1: return this.advance(2, this.view.getInt16(this.pos));
+                case 0xd2: return this.advance(4, this.view.getInt32(this.pos));
+                case 0xd3: return this.advance(8, Number(this.view.getBigInt64(this.pos)));
+                case 0xd9: return this.readString(this.readUint(1));
+                case 0xda: return this.readString(this.readUint(2));
+                case 0xdb: return this.readString(this.readUint(4));
+                case 0xdc: return this.readArray(this.readUint(2));
+                case 0xdd: return this.readArray(this.readUint(4));
+                case 0xde: return this.readMap(this.readUint(2));
+                case 0xdf: return this.readMap(this.readUint(4));
+                default:
+                    throw new Error(`Unsupported MessagePack type 0x${byte.toString(16)} at byte ${this.pos - 1}`);
+            }
+        }
+
+        advance(size, value) {
+            this.pos += size;
+            return value;
+        }
+
+        readUint(size) {
+            const view = this.view;
+            const value = size === 1 ? view.getUint8(this.pos)
+                : size === 2 ? view.getUint16(this.pos)
+                : view.getUint32(this.pos);
+            return this.advance(size, value);
+        }
+
+        readString(length) {
+            return this.advance(length, textDecoder.decode(this.bytes.subarray(this.pos, this.pos + length)));
+        }
+
+        readBinary(length) {
+            return this.advance(length, this.bytes.slice(this.pos, this.pos + length));
+        }
+
+        readArray(length) {
+            const array = new Array(length);
+            for (let i = 0; i < length; i++) {
+                array[i] = this.read();
+            }
+            return array;
+        }
+
+        readMap(length) {
+            const map = {};
+            for (let i = 0; i < length; i++) {
+                const key = this.read();
+                map[key] = this.read();
+            }
+            return map;
+        }
+    }
+
+    return {
+        decode(bytes) {
+            const decoder = new Decoder(bytes);
+            const value = decoder.read();
+            if (decoder.pos !== bytes.byteLength) {
+                throw new Error(`Trailing bytes after MessagePack value at byte ${decoder.pos}`);
+            }
+            return value;
+        }
+    };
+})();
@@ -473,7 +473,7 @@ export class TechTreeUI {
     
     updateFromGameState(gameState) {
         // Update tech tree when game state changes
-        const player = gameState.players.find(p => p.id === this.game.playerId);
+        const player = (gameState.players || []).find(p => p.id === this.game.playerId);
         if (player) {
             this.currentLevel = player.tech_level || 'manor';
             this.techTree = player.tech_tree;
@@ -1,3 +1,11 @@
+// Large room broadcasts arrive zlib-compressed; zlib streams start with this byte, JSON never does
+const ZLIB_HEADER_BYTE = 0x78;
+
+// State frames may be MessagePack maps, which start with 0x80-0x8f (fixmap), 0xde or 0xdf
+function isMessagePackMap(firstByte) {
+    return (firstByte & 0xf0) === 0x80 || firstByte === 0xde || firstByte === 0xdf;
+}
+
 // WebSocket Client Class - Updated Implementation
 class WebSocketClient {
     constructor(roomId = null, playerId = null) {
@@ -8,6 +16,9 @@ class WebSocketClient {
         this.roomId = roomId;
         this.playerId = playerId;
         this.messageHandlers = new Map();
+        this.textDecoder = new TextDecoder();
+        // Inflating is asynchronous, so messages are chained to keep arrival order
+        this.inbound = Promise.resolve();
         
         console.log('WebSocketClient created', { roomId, playerId });
     }
@@ -30,6 +41,8 @@ class WebSocketClient {
             const url = `${EnvConfig.WS_URL}/ws/${this.roomId}/${this.playerId}`;
             console.log('Connecting to:', url);
             this.socket = new WebSocket(url);
+            // Room broadcasts arrive as binary frames of UTF-8 JSON
+            this.socket.binaryType = 'arraybuffer';
             
             this.socket.onopen = () => {
                 console.log('WebSocket connected');
@@ -141,16 +154,31 @@ class WebSocketClient {
     }
     
     handleMessage(data) {
-        try {
-            const message = JSON.parse(data);
-            console.log('WebSocket message received:', message);
-            
-            // Emit event based on message type
-            this.emit(message.type, message.payload);
-            
-        } catch (error) {
-            console.error('Error handling message:', error);
+        this.inbound = this.inbound
+            .then(() => this.decodeMessage(data))
+            .then(message => {
+                console.log('WebSocket message received:', message);
+                
+                // Emit event based on message type
+                this.emit(message.type, message.payload);
+            })
+            .catch(error => {
+                console.error('Error handling message:', error);
+            });
+    }
+    
+    async decodeMessage(data) {
+        if (!(data instanceof ArrayBuffer)) {
+            return JSON.parse(data);
+        }
+        if (data.byteLength && new Uint8Array(data, 0, 1)[0] === ZLIB_HEADER_BYTE) {
+            const stream = new Blob([data]).stream().pipeThrough(new DecompressionStream('deflate'));
+            data = await new Response(stream).arrayBuffer();
+        }
+        if (data.byteLength && isMessagePackMap(new Uint8Array(data, 0, 1)[0])) {
+            return MessagePack.decode(new Uint8Array(data));
         }
+        return JSON.parse(this.textDecoder.decode(data));
     }
     
     send(message) {